@@ -9,6 +9,8 @@ set -e
 #   ./run.sh serve     - Serve the frontend locally
 #   ./run.sh all       - Run update once, then serve frontend
 #   ./run.sh watch     - Run update every 30 min + serve frontend
+#   ./run.sh health    - Query the daemon health check
+#   ./run.sh metrics   - Show the daemon's OpenMetrics output
 #   ./run.sh kill      - Kill any running background server
 
 # Use /mnt/data for heavy storage if available (GCP data disk)
@@ -47,7 +49,9 @@ case "${1:-help}" in
     watch)
         echo "👀 Starting watch mode..."
         echo "   - Frontend: http://0.0.0.0:8000"
-        echo "   - Data updates every 30 minutes"
+        echo "   - Each source refreshes on its own schedule (resident daemon)"
+        echo "   - Health check: http://127.0.0.1:8765/healthz"
+        echo "   - Metrics: http://127.0.0.1:8765/metrics"
         echo "   Press Ctrl+C to stop"
         
         # Start frontend server in background
@@ -65,14 +69,17 @@ case "${1:-help}" in
         }
         trap cleanup INT TERM
         
-        # Run update loop
-        while true; do
-            echo ""
-            echo "🍕 [$(date '+%H:%M:%S')] Running data update..."
-            uv run python update_data.py
-            echo "✅ [$(date '+%H:%M:%S')] Update complete. Next update in 30 minutes."
-            sleep 1800
-        done
+        # Run the resident updater (keeps model, browser and connections warm)
+        uv run python update_data.py --daemon
+        cleanup
+        ;;
+    
+    health)
+        curl -fsS http://127.0.0.1:8765/healthz && echo || echo "Daemon unhealthy or not running"
+        ;;
+    
+    metrics)
+        curl -fsS -H "Accept: application/openmetrics-text" http://127.0.0.1:8765/metrics || echo "Daemon not running"
         ;;
     
     kill)
@@ -90,6 +97,8 @@ case "${1:-help}" in
         echo "  serve   - Serve the frontend locally at http://localhost:8000"
         echo "  all     - Run update once, then serve frontend"
         echo "  watch   - Run update every 30 min + serve frontend"
+        echo "  health  - Query the daemon health check"
+        echo "  metrics - Show the daemon's OpenMetrics output"
         echo "  kill    - Kill any running background server on port 8000"
         echo "  help    - Show this help message"
         echo ""
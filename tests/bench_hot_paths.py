@@ -0,0 +1,287 @@
+"""
+Benchmarks for the parsing and scoring hot paths. Not collected by pytest; run directly:
+
+    python tests/bench_hot_paths.py [--repeat N] [--json OUT] [--compare BASELINE]
+
+Each case runs over the recorded Fleet Tracker fixtures (or a synthetic input of
+typical size for sources without fixtures) and over the same input scaled 10x
+and 100x, reporting best-of-N wall time and the tracemalloc peak of one run.
+--json writes the results for comparison across commits; --compare reads such a
+file and exits non-zero if any case got slower or allocates more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+from update_data import FLEET_SCANNER
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "fleet_tracker_snapshots.json")
+SCALES = (1, 10, 100)
+# Fixed clock so the Polymarket near-term filter sees the same markets every run
+POLYMARKET_NOW = datetime(2026, 1, 20, 12, 0)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_allocation(fn):
+    """Peak bytes traced while fn runs once."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def scaled_trackers(fixtures, scale):
+    """Each fixture article with its body repeated `scale` times (scale x the sections and ships)."""
+    return [html * scale for html in fixtures.values()]
+
+
+def rss_feed(fixtures, scale):
+    """An RSS 2.0 document carrying the fixture articles as content:encoded items, `scale` times over."""
+    items = []
+    for i in range(scale):
+        for date, html in fixtures.items():
+            items.append(
+                f"<item><title>USNI News Fleet and Marine Tracker: {date}</title>"
+                f"<guid>https://news.usni.org/?p={i}-{date}</guid><pubDate>{date}</pubDate>"
+                f"<description>Fleet tracker</description>"
+                f"<content:encoded><![CDATA[{html}]]></content:encoded></item>"
+            )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+        + "".join(items)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def polymarket_events(count, rng):
+    """Search results shaped like gamma-api public-search events, a mix of target, strike and unrelated markets."""
+    templates = [
+        "Will US or Israel strike Iran by {date}?",
+        "US strikes Iran by {date}?",
+        "Iran nuclear deal by {date}?",
+        "Will Iran not attack Israel by {date}?",
+        "Israel military action against Iran by {date}?",
+        "Bitcoin above 100k on {date}?",
+    ]
+    events = []
+    for i in range(count):
+        date = (POLYMARKET_NOW + timedelta(days=rng.randint(-3, 30))).strftime("%B %-d")
+        title = rng.choice(templates).format(date=date)
+        markets = []
+        for j in range(rng.randint(1, 4)):
+            yes = rng.random()
+            markets.append({
+                "question": title if j == 0 else rng.choice(templates).format(date=date),
+                "outcomePrices": [str(round(yes, 3)), str(round(1 - yes, 3))],
+                "bestAsk": round(yes + 0.01, 3),
+                "lastTradePrice": round(yes, 3),
+            })
+        events.append({"id": str(i), "title": title, "markets": markets})
+    return events
+
+
+def opensky_states(count, rng):
+    """State vectors over the Middle East bbox: civil traffic, tankers, military hex ranges, on-ground."""
+    civil = ["IRA", "IRM", "QTR", "UAE", "THY", "FDB", "ETD", "SVA", "KAC", "PIA"]
+    tankers = ["IRON", "SHELL", "TEXAN", "ETHYL", "PEARL", "RRR", "NATO", "KC135"]
+    states = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            icao, callsign = f"{rng.randint(0xAE0000, 0xAE7FFF):06x}", f"{rng.choice(tankers)}{rng.randint(10, 99)} "
+        elif kind < 0.08:
+            icao, callsign = f"{rng.randint(0x43C000, 0x43CFFF):06x}", f"RFR{rng.randint(100, 999)}"
+        else:
+            icao, callsign = f"{rng.randint(0x700000, 0x7FFFFF):06x}", f"{rng.choice(civil)}{rng.randint(1, 9999)}"
+        lat = None if rng.random() < 0.02 else rng.uniform(12, 40)
+        lon = None if lat is None else rng.uniform(32, 65)
+        states.append([icao, callsign, "", 0, 0, lon, lat, 10000.0, rng.random() < 0.05] + [None] * 8)
+    return states
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def string_pattern_scan(sections):
+    """The per-section scan as it was before FleetScanner: string patterns and nested loops."""
+    for section in sections:
+        text, lower = section["text"], section["text"].lower()
+        region = section["region"].lower()
+        re.findall(update_data.HULL_PATTERN, text)
+        for prefix in ("VFA", "VMFA", "VAQ", "VAW"):
+            set(re.findall(prefix + r"[-\s]*\d+", text))
+        if not any(hr in region for hr in update_data.HIGH_RELEVANCE_REGIONS):
+            for cmr in update_data.CONDITIONAL_MEDIUM_REGIONS:
+                if cmr in region:
+                    if not any(re.search(tkw, lower) for tkw in update_data.TRANSIT_KEYWORDS_RE):
+                        any(skw in lower for skw in update_data.STATION_KEYWORDS)
+                    break
+
+
+def scanner_scan(sections):
+    for section in sections:
+        FLEET_SCANNER.hulls(section["text"])
+        FLEET_SCANNER.squadrons(section["text"])
+        FLEET_SCANNER.relevance(section["region"].lower(), section["text"].lower())
+
+
+def keyword_benchmarks(titles=2000, scale=10):
+    """Per-keyword `in` loops vs KeywordMatcher at today's vocabulary size and scale x larger."""
+    rng = random.Random(1)
+    base = list(update_data.ALERT_KEYWORDS) + list(update_data.AIR_PLATFORM_POINTS) + list(update_data.AIR_BASE_POINTS)
+    filler = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9))) for _ in range(len(base) * scale)]
+    headlines = [" ".join(rng.choice(base + filler) for _ in range(12)) for _ in range(titles)]
+
+    benchmarks = {}
+    for label, vocab in ((f"{len(base)} keywords", base), (f"{len(base) * scale} keywords", base + filler[len(base):])):
+        matcher = update_data.KeywordMatcher({"k": vocab})
+        benchmarks[f"headlines {label}: in-loops"] = (lambda v=vocab: [[k for k in v if k in h] for h in headlines], titles)
+        benchmarks[f"headlines {label}: KeywordMatcher"] = (lambda m=matcher: [m.scan(h) for h in headlines], titles)
+    return benchmarks
+
+
+def hot_path_benchmarks(fixtures, scales=SCALES):
+    """{name: (fn, items)} for every hot path at every scale."""
+    rng = random.Random(7)
+    benchmarks = {}
+    for scale in scales:
+        suffix = f" x{scale}"
+        articles = scaled_trackers(fixtures, scale)
+        parsed = [update_data._parse_fleet_sections(html) for html in articles]
+        sections = sum(len(s) for s in parsed)
+        feed = rss_feed(fixtures, scale)
+        events = polymarket_events(50 * scale, rng)
+        states = opensky_states(400 * scale, rng)
+
+        benchmarks.update({
+            "parse sections" + suffix: (lambda a=articles: [update_data._parse_fleet_sections(h) for h in a], sections),
+            "score_naval_force (parsed)" + suffix: (lambda p=parsed: [update_data.score_naval_force(None, s) for s in p], sections),
+            "_score_carrier_air (parsed)" + suffix: (lambda p=parsed: [update_data._score_carrier_air(s) for s in p], sections),
+            "end to end (parse + both scores)" + suffix: (lambda a=articles: [
+                (update_data.score_naval_force(None, s), update_data._score_carrier_air(s))
+                for s in map(update_data._parse_fleet_sections, a)
+            ], sections),
+            "scan: string patterns" + suffix: (lambda p=parsed: [string_pattern_scan(s) for s in p], sections),
+            "scan: FleetScanner" + suffix: (lambda p=parsed: [scanner_scan(s) for s in p], sections),
+            "RSS item parsing" + suffix: (lambda f=feed: update_data._parse_feed_items(f), len(fixtures) * scale),
+            "Polymarket event scan" + suffix: (lambda e=events: update_data._scan_polymarket_events(e, POLYMARKET_NOW), len(events)),
+            "OpenSky classification" + suffix: (lambda s=states: update_data._classify_opensky_states(s), len(states)),
+            "OpenSky classification: loop" + suffix: (lambda s=states: update_data._classify_opensky_states_python(s), len(states)),
+            "OpenSky classification: columnar" + suffix: (lambda s=states: update_data._classify_opensky_states_numpy(s), len(states)),
+        })
+    return benchmarks
+
+
+def run(benchmarks, repeat):
+    results = {}
+    for name, (fn, items) in benchmarks.items():
+        scale = int(name.rsplit(" x", 1)[1]) if " x" in name else 1
+        seconds = best_of(fn, max(1, repeat // scale) if scale > 1 else repeat)
+        results[name] = {
+            "ms": round(seconds * 1000, 3),
+            "items": items,
+            "us_per_item": round(seconds * 1e6 / items, 3) if items else None,
+            "peak_kb": round(peak_allocation(fn) / 1024, 1),
+        }
+        print(f"  {name:<46} {results[name]['ms']:10.2f} ms  {results[name]['us_per_item']:9.2f} us/item  {results[name]['peak_kb']:10.1f} KiB peak")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-case ratios against a saved run. Returns the names that regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline['meta'].get('commit')}), threshold {threshold:.2f}x")
+    regressed = []
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        time_ratio = result["ms"] / base["ms"] if base["ms"] else 1.0
+        alloc_ratio = result["peak_kb"] / base["peak_kb"] if base["peak_kb"] else 1.0
+        flag = ""
+        if time_ratio > threshold or alloc_ratio > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<46} time {time_ratio:5.2f}x  peak {alloc_ratio:5.2f}x{flag}")
+    return regressed
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this string")
+    parser.add_argument("--json", metavar="OUT", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a JSON file written by --json")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="time or peak-allocation ratio above which --compare reports a regression")
+    args = parser.parse_args()
+
+    with open(FIXTURES_PATH) as f:
+        fixtures = json.load(f)
+
+    benchmarks = hot_path_benchmarks(fixtures)
+    benchmarks.update(keyword_benchmarks())
+    benchmarks = {name: case for name, case in benchmarks.items() if args.filter in name}
+
+    print(f"{len(fixtures)} fixtures, HTML parser: {update_data._fleet_html_parser()}, best of {args.repeat} (fewer at x10/x100)")
+    results = run(benchmarks, args.repeat)
+
+    if args.json:
+        meta = {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "html_parser": update_data._fleet_html_parser(),
+            "repeat": args.repeat,
+        }
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.compare:
+        regressed = compare(results, args.compare, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} regression(s)")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
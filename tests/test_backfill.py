@@ -0,0 +1,51 @@
+"""
+Tests for the Fleet Tracker backfill: pool-scored rows match the live scorers,
+and a rerun only scores dates missing from the output.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "fleet_tracker_snapshots.json")
+
+
+@pytest.fixture
+def fixtures():
+    with open(FIXTURES_PATH) as f:
+        return json.load(f)
+
+
+class TestBackfill:
+
+    def test_rows_match_live_scoring(self, fixtures, tmp_path):
+        output = tmp_path / "series.json"
+        result = update_data.backfill_fleet_tracker(FIXTURES_PATH, str(output), workers=2)
+        assert result["scored"] == len(fixtures) and result["failed"] == 0
+
+        columns = json.loads(output.read_text())["columns"]
+        assert columns["date"] == sorted(fixtures)
+        for i, date in enumerate(columns["date"]):
+            naval = update_data.score_naval_force(fixtures[date])
+            carrier_air = update_data._score_carrier_air(update_data._parse_fleet_sections(fixtures[date]))
+            assert columns["force_risk"][i] == naval["force_risk"]
+            assert columns["total_weighted_points"][i] == naval["total_weighted_points"]
+            assert columns["carrier_air_risk"][i] == carrier_air["risk"]
+
+    def test_resumes_from_existing_output(self, fixtures, tmp_path):
+        snapshots = tmp_path / "snapshots"
+        snapshots.mkdir()
+        for date, html in sorted(fixtures.items())[:2]:
+            (snapshots / f"{date}.html").write_text(html)
+        output = str(tmp_path / "series.json")
+        assert update_data.backfill_fleet_tracker(str(snapshots), output, workers=1)["scored"] == 2
+
+        result = update_data.backfill_fleet_tracker(FIXTURES_PATH, output, workers=1)
+        assert result["scored"] == len(fixtures) - 2
+        assert result["skipped"] == 2
+        assert len(json.load(open(output))["columns"]["date"]) == len(fixtures)
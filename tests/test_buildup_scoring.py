@@ -100,3 +100,32 @@ class TestNavalBuildupScoring:
         r_jan = score_naval_force(fixtures["2026-01-20"])
         assert r_dec["carriers_in_centcom"] == 0
         assert r_jan["carriers_in_centcom"] == 0
+
+
+class TestFleetSections:
+
+    def test_sections_identical_across_parsers(self, fixtures, monkeypatch):
+        import update_data
+        pytest.importorskip("lxml")
+        for html in fixtures.values():
+            with_lxml = update_data._parse_fleet_sections(html)
+            monkeypatch.setattr(update_data, "_fleet_html_parser", lambda: "html.parser")
+            assert update_data._parse_fleet_sections(html) == with_lxml
+            monkeypatch.undo()
+
+    def test_prebuilt_sections_score_identically(self, fixtures):
+        import update_data
+        html = fixtures["2026-02-17"]
+        sections = update_data._parse_fleet_sections(html)
+        assert score_naval_force(html, sections) == score_naval_force(html)
+        assert {s["relevance"] for s in sections} >= {"high", "low"}
+
+    def test_scanner_relevance_and_squadrons(self):
+        from update_data import FLEET_SCANNER
+        assert FLEET_SCANNER.relevance("north arabian sea", "") == ("high", 1.0)
+        assert FLEET_SCANNER.relevance("mediterranean sea", "has now been ordered to the middle east") == ("medium-transit", 0.5)
+        assert FLEET_SCANNER.relevance("eastern mediterranean", "forward deployed in rota") == ("medium-station", 0.4)
+        assert FLEET_SCANNER.relevance("western pacific", "ordered to the middle east") == ("low", 0.0)
+
+        found = FLEET_SCANNER.squadrons("VFA-14, VFA 14, VMFA-314 and VAQ-133; VAW-117")
+        assert {k: len(v) for k, v in found.items()} == {"VFA": 2, "VMFA": 1, "VAQ": 1, "VAW": 1}
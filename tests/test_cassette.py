@@ -0,0 +1,124 @@
+"""
+Tests for record/replay cassettes: responses captured through make_request are
+served back offline in order, and replayed runs never touch the disk caches.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<item><title>Iran warns of strike</title><guid>abc</guid></item>
+</channel></rss>"""
+
+
+def response(status, body, headers=None):
+    r = requests.models.Response()
+    r.status_code = status
+    r._content = body
+    r.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    r.url = "https://example.com"
+    r.encoding = "utf-8"
+    return r
+
+
+class FakeSession:
+    def __init__(self, bodies):
+        self.bodies = list(bodies)
+
+    def get(self, url, **kwargs):
+        return response(200, self.bodies.pop(0), {"ETag": '"v1"'})
+
+
+@pytest.fixture
+def cassette_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(update_data, "HTTP_CACHE_DIR", str(tmp_path / "http"))
+    monkeypatch.setattr(update_data, "_cassette", None)
+    return str(tmp_path / "cycle.json")
+
+
+def record(path, monkeypatch, bodies, calls=()):
+    session = FakeSession(bodies)
+    monkeypatch.setattr(update_data, "_get_session", lambda: session)
+    update_data._cassette = update_data.Cassette(path, "record")
+    for _ in bodies:
+        update_data.make_request("https://example.com/rss", params={"q": "iran"})
+    for name, value in calls:
+        update_data._cassette_call(name, lambda: value)
+    update_data._cassette.save()
+    update_data._cassette = update_data.Cassette(path, "replay")
+
+
+class TestCassette:
+
+    def test_replays_responses_in_order_then_repeats_the_last(self, cassette_path, monkeypatch):
+        record(cassette_path, monkeypatch, [b"first", b"second"])
+        monkeypatch.setattr(update_data, "_get_session", lambda: pytest.fail("replay used the network"))
+
+        bodies = [update_data.make_request("https://example.com/rss", params={"q": "iran"}).content for _ in range(3)]
+        assert bodies == [b"first", b"second", b"second"]
+        replayed = update_data.make_request("https://example.com/rss", params={"q": "iran"})
+        assert replayed.ok and replayed.headers["etag"] == '"v1"' and replayed.text == "second"
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            update_data.make_request("https://example.com/other")
+
+    def test_recorded_calls_replay_including_none(self, cassette_path, monkeypatch):
+        record(cassette_path, monkeypatch, [], calls=[("busyness", {"Domino's": {"current": 40, "usual": 20}}), ("trends", None)])
+        assert update_data._cassette_call("busyness", pytest.fail) == {"Domino's": {"current": 40, "usual": 20}}
+        assert update_data._cassette_call("trends", pytest.fail) is None
+        assert update_data._cassette_now().timestamp() == pytest.approx(update_data._cassette.recorded_at)
+
+    def test_replay_bypasses_disk_caches(self, cassette_path, monkeypatch, tmp_path):
+        session = FakeSession([FEED])
+        monkeypatch.setattr(update_data, "_get_session", lambda: session)
+        update_data._cassette = update_data.Cassette(cassette_path, "record")
+        items, _ = update_data.fetch_feed_items("https://example.com/rss")
+        update_data._cassette.save()
+        update_data._cassette = update_data.Cassette(cassette_path, "replay")
+
+        replayed, not_modified = update_data.fetch_feed_items("https://example.com/rss")
+        assert replayed == items and not not_modified
+        assert not os.path.exists(tmp_path / "http")
+        assert update_data.escalation_cache_lookup([items[0]["title"]]) == {}
+
+    def test_replayed_cycles_are_identical_and_ignore_the_existing_history(self, cassette_path, monkeypatch, tmp_path):
+        output = tmp_path / "data.json"
+        output.write_text(json.dumps({"total_risk": {"history": [{"timestamp": 1, "risk": 99}]}}))
+        monkeypatch.setattr(update_data, "OUTPUT_FILE", str(output))
+        monkeypatch.setattr(update_data, "METRICS_TEXTFILE", None)
+        fetchers = {
+            "fetch_pentagon_data": {"risk_contribution": 2},
+            "fetch_polymarket_odds": {"odds": 20, "market": "m"},
+            "fetch_news_intel": {"total_count": 4, "alert_count": 1},
+            "fetch_oil_prices": {"risk": 30, "current_price": 70.0, "change_24h": 1.0},
+            "fetch_google_trends": {"risk": 10, "current_interest": 5, "peak_keyword": "k"},
+            "fetch_weather_data": {"clouds": 50, "description": "cloudy"},
+            "fetch_military_buildup": {"risk": 12, "detail": "d"},
+        }
+        for name, value in fetchers.items():
+            monkeypatch.setattr(update_data, name, lambda *a, v=value, **k: {**v, "timestamp": update_data._cycle_now().isoformat()})
+        monkeypatch.setattr(update_data, "fetch_opensky_data", lambda: (
+            {"aircraft_count": 40, "timestamp": update_data._cycle_now().isoformat()},
+            {"tanker_count": 1, "timestamp": update_data._cycle_now().isoformat()},
+        ))
+        update_data.Cassette(cassette_path, "record").save()
+        update_data._cassette = update_data.Cassette(cassette_path, "replay")
+
+        outputs = []
+        for _ in range(2):
+            assert update_data.update_data_file(sources=list(update_data.SOURCE_SCHEDULE))
+            outputs.append(output.read_text())
+            time.sleep(0.05)
+        assert outputs[0] == outputs[1]
+        data = json.loads(outputs[0])
+        assert [point["risk"] for point in data["total_risk"]["history"]] != [99]
+        assert data["last_updated"] == update_data._cassette_now().isoformat()
@@ -0,0 +1,126 @@
+"""
+Tests for daemon mode: /healthz turns 503 once no cycle has succeeded for
+DAEMON_STALE_AFTER, /tracks filters the OpenSky track store, and the scheduler
+loop keeps one warm Chrome driver across cycles and closes it on shutdown.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+
+@pytest.fixture
+def daemon_state(monkeypatch):
+    state = dict(update_data._daemon_state)
+    monkeypatch.setattr(update_data, "_daemon_state", state)
+    return state
+
+
+@pytest.fixture
+def health_server():
+    server = update_data._start_health_server(0)
+
+    def get(path):
+        url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    yield get
+    server.shutdown()
+    server.server_close()
+
+
+class FakeDriver:
+    quit_calls = 0
+    current_url = "about:blank"
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class TestHealthEndpoints:
+
+    def test_healthz_turns_stale_without_a_successful_cycle(self, daemon_state, health_server):
+        now = time.time()
+        daemon_state.update(started_at=now - 10, last_success=None)
+        status, body = health_server("/healthz")
+        assert status == 200 and body["status"] == "ok"
+
+        daemon_state.update(started_at=now - update_data.DAEMON_STALE_AFTER - 60, last_cycle_ok=False)
+        status, _ = health_server("/healthz")
+        assert status == 503
+        healthy, state = update_data._daemon_health()
+        assert not healthy and state["status"] == "stale"
+        assert state["seconds_since_success"] > update_data.DAEMON_STALE_AFTER
+
+        daemon_state.update(last_success=now - 5, last_cycle_ok=True)
+        assert health_server("/healthz/")[0] == 200
+        assert health_server("/nope")[0] == 404
+
+    def test_tracks_filters_the_track_store(self, monkeypatch, health_server):
+        store = update_data.TrackStore()
+        now = time.time()
+        store.observe("ae1234", "IRON41", 30.0, 52.0, update_data.TRACK_TANKER, now - 60)
+        store.observe("7301a2", "IRA712", 33.0, 51.0, update_data.TRACK_CIVIL, now - 60)
+        store.observe("7301a3", "IRA99", 33.0, 51.0, update_data.TRACK_CIVIL, now - 7200)
+        monkeypatch.setattr(update_data, "_track_store", store)
+
+        status, body = health_server("/tracks")
+        assert status == 200 and sorted(t["icao24"] for t in body["tracks"]) == ["7301a2", "ae1234"]
+        assert [t["icao24"] for t in health_server("/tracks?kind=tanker")[1]["tracks"]] == ["ae1234"]
+        assert [t["icao24"] for t in health_server("/tracks?minutes=180&icao24=7301a3")[1]["tracks"]] == ["7301a3"]
+        assert health_server("/tracks?minutes=soon")[0] == 400
+
+
+class TestRunDaemon:
+
+    def test_cycles_reuse_the_warm_driver(self, daemon_state, tmp_path, monkeypatch):
+        drivers = []
+
+        def new_driver():
+            drivers.append(FakeDriver())
+            return drivers[-1]
+
+        handlers = {}
+        cycles = []
+
+        def fake_cycle(sources, skip_unchanged):
+            with update_data._chrome_lock:
+                cycles.append(update_data._acquire_chrome_driver())
+            if len(cycles) == 2:
+                handlers[signal.SIGTERM](signal.SIGTERM, None)
+            return len(cycles) == 2
+
+        monkeypatch.setattr(update_data, "KEEP_BROWSER_WARM", False)
+        monkeypatch.setattr(update_data, "INFERENCE_WORKER", "inline")
+        monkeypatch.setattr(update_data, "ESCALATION_MODE", "full")
+        monkeypatch.setattr(update_data, "_get_escalation_scorer", lambda: None)
+        monkeypatch.setattr(update_data, "_chrome_driver", None)
+        monkeypatch.setattr(update_data, "_new_chrome_driver", new_driver)
+        monkeypatch.setattr(update_data, "OUTPUT_FILE", str(tmp_path / "data.json"))
+        monkeypatch.setattr(update_data, "SOURCE_SCHEDULE", {"opensky": (0, 0)})
+        monkeypatch.setattr(update_data, "DAEMON_MAX_SLEEP", 0.01)
+        monkeypatch.setattr(update_data, "update_data_file", fake_cycle)
+        monkeypatch.setattr(signal, "signal", lambda signum, handler: handlers.__setitem__(signum, handler))
+        monkeypatch.setattr(subprocess, "run", lambda *args, **kwargs: None)
+
+        update_data.run_daemon(health_port=0)
+
+        assert len(drivers) == 1 and cycles == [drivers[0], drivers[0]]
+        assert drivers[0].quit_calls == 1 and update_data._chrome_driver is None
+        assert daemon_state["cycles"] == 2 and daemon_state["last_cycle_ok"] is True
+        assert daemon_state["last_cycle_sources"] == ["opensky"] and not daemon_state["in_cycle"]
+        assert daemon_state["last_success"] == daemon_state["last_cycle_finished"]
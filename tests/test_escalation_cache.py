@@ -0,0 +1,98 @@
+"""
+Tests for the persistent escalation-score cache: only unseen headlines reach
+the classifier, and the cache is bounded by TTL and LRU eviction.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+from update_data import ESCALATION_LABELS
+
+
+@pytest.fixture
+def fake_classifier(tmp_path, monkeypatch):
+    monkeypatch.setattr(update_data, "ESCALATION_CACHE_FILE", str(tmp_path / "scores.json"))
+    monkeypatch.setattr(update_data, "_escalation_cache", None)
+    monkeypatch.setattr(update_data, "INFERENCE_WORKER", "inline")
+    seen = []
+
+    def scorer(titles):
+        seen.extend(titles)
+        return [0.5 + 0.01 * len(t) for t in titles]
+
+    monkeypatch.setattr(update_data, "_get_escalation_scorer", lambda: scorer)
+    return seen
+
+
+class TestEscalationCache:
+
+    def test_only_new_headlines_reach_the_model(self, fake_classifier):
+        first = update_data.classify_escalation(["Iran fires missiles", "Talks resume"])
+        second = update_data.classify_escalation(["Iran fires missiles", "Oil rises"])
+        assert fake_classifier == ["Iran fires missiles", "Talks resume", "Oil rises"]
+        assert second[0] == first[0]
+
+    def test_cache_survives_process_restart(self, fake_classifier, monkeypatch):
+        update_data.classify_escalation(["Iran fires missiles"])
+        monkeypatch.setattr(update_data, "_escalation_cache", None)
+        update_data.classify_escalation(["Iran  fires missiles"])
+        assert fake_classifier == ["Iran fires missiles"]
+
+    def test_key_depends_on_model_and_labels(self):
+        key = update_data._escalation_cache_key("Headline")
+        assert key != update_data._escalation_cache_key("Headline", model_id="other/model")
+        assert key != update_data._escalation_cache_key("Headline", labels=ESCALATION_LABELS[:2])
+
+    def test_lru_and_ttl_eviction(self, fake_classifier, monkeypatch):
+        monkeypatch.setattr(update_data, "ESCALATION_CACHE_MAX_ENTRIES", 2)
+        update_data.escalation_cache_store({"a": 0.1})
+        update_data.escalation_cache_store({"b": 0.2})
+        update_data.escalation_cache_lookup(["a"])
+        update_data.escalation_cache_store({"c": 0.3})
+        assert set(update_data.escalation_cache_lookup(["a", "b", "c"])) == {"a", "c"}
+
+        monkeypatch.setattr(update_data, "ESCALATION_CACHE_TTL", -1)
+        assert update_data.escalation_cache_lookup(["a", "c"]) == {}
+
+
+class TestEscalationCascade:
+
+    @pytest.fixture
+    def cascade(self, fake_classifier, monkeypatch):
+        monkeypatch.setattr(update_data, "ESCALATION_MODE", "cascade")
+        small = {
+            "Tehran hosts book fair": 0.05,          # routine, no alert keyword
+            "Iran fires missiles at bases": 0.95,     # escalatory, alert keyword
+            "Missile test reported": 0.05,            # alert keyword: never settled as routine
+            "Talks stall in Oman": 0.5,               # uncertain band
+        }
+        monkeypatch.setattr(update_data, "_get_cascade_scorer", lambda: lambda titles: [small[t] for t in titles])
+        return fake_classifier
+
+    def test_only_uncertain_headlines_reach_full_model(self, cascade):
+        titles = ["Tehran hosts book fair", "Iran fires missiles at bases", "Missile test reported", "Talks stall in Oman"]
+        stats = {}
+        scores = update_data.classify_escalation(titles, stats)
+
+        assert cascade == ["Missile test reported", "Talks stall in Oman"]
+        assert scores[:2] == [0.05, 0.95]
+        assert (stats["resolved_routine"], stats["resolved_escalatory"], stats["full_model"]) == (1, 1, 2)
+
+    def test_cascade_scores_cached_apart_from_full_model(self, cascade, monkeypatch):
+        cascade_key = update_data._escalation_cache_key("Headline")
+        monkeypatch.setattr(update_data, "ESCALATION_MODE", "full")
+        assert update_data._escalation_cache_key("Headline") != cascade_key
+
+    def test_alert_from_description_is_not_settled_as_routine(self, cascade):
+        # The news filter matched an alert term in this article's description
+        titles = ["Tehran hosts book fair", "Iran fires missiles at bases"]
+        stats = {}
+        update_data.classify_escalation(titles, stats, alerts={"Tehran hosts book fair"})
+
+        assert cascade == ["Tehran hosts book fair", "Iran fires missiles at bases"]
+        assert (stats["resolved_routine"], stats["resolved_escalatory"]) == (0, 0)
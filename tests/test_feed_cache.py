@@ -0,0 +1,64 @@
+"""
+Tests for the conditional-GET feed cache: validators are stored with the parsed
+items and a 304 response is served from the cache without re-parsing.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>
+<item><title>Iran warns of strike</title><description>Tehran</description>
+<content:encoded><![CDATA[<h2>Arabian Sea</h2>]]></content:encoded>
+<pubDate>Mon, 26 Jan 2026 18:00:00 GMT</pubDate><guid>abc</guid></item>
+</channel></rss>"""
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.ok = status_code < 400
+
+
+@pytest.fixture
+def fake_feed(tmp_path, monkeypatch):
+    monkeypatch.setattr(update_data, "HTTP_CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def fake_request(url, headers=None, **kwargs):
+        calls.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, FEED, {"ETag": '"v1"'})
+
+    monkeypatch.setattr(update_data, "make_request", fake_request)
+    return calls
+
+
+class TestFeedCache:
+
+    def test_first_fetch_parses_items(self, fake_feed):
+        items, not_modified = update_data.fetch_feed_items("https://example.com/rss")
+        assert not not_modified
+        assert items[0]["title"] == "Iran warns of strike"
+        assert items[0]["content"] == "<h2>Arabian Sea</h2>"
+        assert items[0]["guid"] == "abc"
+
+    def test_revalidation_returns_cached_items_on_304(self, fake_feed, monkeypatch):
+        first, _ = update_data.fetch_feed_items("https://example.com/rss")
+
+        def no_parse(content):
+            raise AssertionError("304 response must not be re-parsed")
+
+        monkeypatch.setattr(update_data, "_parse_feed_items", no_parse)
+        second, not_modified = update_data.fetch_feed_items("https://example.com/rss")
+        assert not_modified
+        assert second == first
+        assert fake_feed[1]["If-None-Match"] == '"v1"'
@@ -0,0 +1,57 @@
+"""
+Tests for the concurrent fetch orchestrator: sources run in parallel, and a
+source that misses its deadline falls back to its last known value.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from update_data import run_fetchers
+
+
+def _slow(value, seconds):
+    def fetch():
+        time.sleep(seconds)
+        return value
+    return fetch
+
+
+class TestRunFetchers:
+
+    def test_sources_run_concurrently(self):
+        jobs = {f"src{i}": _slow(i, 0.2) for i in range(4)}
+        start = time.monotonic()
+        results, stats = run_fetchers(jobs, max_workers=4, deadlines={})
+        elapsed = time.monotonic() - start
+        assert results == {"src0": 0, "src1": 1, "src2": 2, "src3": 3}
+        assert all(s["status"] == "ok" for s in stats.values())
+        assert elapsed < 0.6
+
+    def test_missed_deadline_uses_fallback(self):
+        jobs = {"fast": _slow("fresh", 0.01), "slow": _slow("fresh", 5)}
+        start = time.monotonic()
+        results, stats = run_fetchers(
+            jobs,
+            fallbacks={"slow": "last known"},
+            deadlines={"fast": 1, "slow": 0.2},
+        )
+        assert time.monotonic() - start < 1
+        assert results == {"fast": "fresh", "slow": "last known"}
+        assert stats["slow"]["status"] == "timeout"
+
+    def test_stuck_worker_is_replaced_for_queued_sources(self):
+        jobs = {"stuck": _slow("x", 5), "queued": _slow("done", 0.01)}
+        results, stats = run_fetchers(
+            jobs, max_workers=1, deadlines={"stuck": 0.1, "queued": 1}
+        )
+        assert results == {"stuck": None, "queued": "done"}
+        assert stats["queued"]["status"] == "ok"
+
+    def test_crashing_source_uses_fallback(self):
+        def boom():
+            raise RuntimeError("boom")
+        results, stats = run_fetchers({"bad": boom}, fallbacks={"bad": 7}, deadlines={})
+        assert results == {"bad": 7}
+        assert stats["bad"]["status"] == "error"
@@ -0,0 +1,64 @@
+"""
+Tests for the Fleet Tracker score store: an unchanged article is served from
+the store without parsing, and a changed one is rescored.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "fleet_tracker_snapshots.json")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(update_data, "FLEET_TRACKER_CACHE_FILE", str(tmp_path / "fleet_tracker.json"))
+    with open(FIXTURES_PATH) as f:
+        return json.load(f)
+
+
+def article(date, html):
+    return {"title": f"USNI News Fleet and Marine Tracker: {date}", "content": html,
+            "pub_date": date, "guid": f"https://news.usni.org/?p={date}"}
+
+
+class TestFleetTrackerStore:
+
+    def test_unchanged_article_skips_parsing(self, store, monkeypatch):
+        date, html = next(iter(store.items()))
+        first, from_store = update_data.score_fleet_tracker(article(date, html))
+        assert not from_store
+        assert first["naval"] == update_data.score_naval_force(html)
+
+        def fail(*args):
+            raise AssertionError("unchanged article was parsed")
+
+        monkeypatch.setattr(update_data, "_parse_fleet_sections", fail)
+        monkeypatch.setattr(update_data, "score_naval_force", fail)
+        second, from_store = update_data.score_fleet_tracker(article(date, html))
+        assert from_store
+        assert second == first
+
+    def test_changed_content_is_rescored_and_becomes_latest(self, store):
+        (date, html), (_, other) = list(store.items())[:2]
+        update_data.score_fleet_tracker(article(date, html))
+        entry, from_store = update_data.score_fleet_tracker(article(date, other))
+        assert not from_store
+        assert entry["naval"] == update_data.score_naval_force(other)
+        assert update_data.fleet_tracker_latest() == entry
+
+    def test_fallback_prefers_store_over_previous_data(self, store, monkeypatch):
+        date, html = next(iter(store.items()))
+        entry, _ = update_data.score_fleet_tracker(article(date, html))
+        monkeypatch.setattr(update_data, "fetch_feed_items", lambda *a, **k: (None, False))
+        monkeypatch.setattr(update_data, "make_request", lambda *a, **k: None)
+
+        previous = {"force_posture": {"force_risk": 1}, "carrier_air_risk": 0, "carrier_air_squadrons": 0}
+        result = update_data.fetch_military_buildup(previous)
+        assert result["force_posture"] == entry["naval"]
+        assert result["carrier_air_risk"] == entry["carrier_air"]["risk"]
@@ -0,0 +1,84 @@
+"""
+Tests for the shared HTTP session: one keep-alive session is reused across
+calls, a host whose certificate failed is remembered and skips verification
+from then on, and per-host request stats are accumulated and reset.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+
+class FakeResponse:
+    def __init__(self, content=b""):
+        self.content = content
+        self.status_code = 200
+        self.ok = True
+
+
+class FakeSession:
+    def __init__(self, bad_certs=(), down=()):
+        self.bad_certs = set(bad_certs)
+        self.down = set(down)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        host = update_data.urlsplit(url).hostname
+        self.calls.append((host, kwargs.get("verify", True)))
+        if host in self.down:
+            raise update_data.requests.exceptions.ConnectionError(host)
+        if host in self.bad_certs and kwargs.get("verify", True):
+            raise update_data.requests.exceptions.SSLError(host)
+        return FakeResponse(b"x" * 10)
+
+
+@pytest.fixture
+def http(monkeypatch):
+    monkeypatch.setattr(update_data, "_session", None)
+    monkeypatch.setattr(update_data, "_insecure_hosts", set())
+    monkeypatch.setattr(update_data, "HTTP_HOST_STATS", {})
+    monkeypatch.setattr(update_data, "_cassette", None)
+
+
+class TestHttpSession:
+
+    def test_session_is_created_once_and_pooled(self, http):
+        session = update_data._get_session()
+        assert update_data._get_session() is session
+        adapter = session.get_adapter("https://news.google.com/rss")
+        assert adapter is session.get_adapter("http://example.com/")
+        assert adapter._pool_connections == update_data.HTTP_POOL_HOSTS
+        assert adapter._pool_maxsize == update_data.HTTP_POOL_MAXSIZE
+
+    def test_failed_certificate_is_remembered_per_host(self, http, monkeypatch):
+        session = FakeSession(bad_certs={"proxy.example"})
+        monkeypatch.setattr(update_data, "_session", session)
+        update_data.make_request("https://proxy.example/a")
+        update_data.make_request("https://proxy.example/b")
+        update_data.make_request("https://api.example/c")
+        assert session.calls == [
+            ("proxy.example", True),
+            ("proxy.example", False),
+            ("proxy.example", False),  # no doomed handshake the second time
+            ("api.example", True),
+        ]
+        assert update_data._insecure_hosts == {"proxy.example"}
+
+    def test_stats_count_requests_bytes_and_errors(self, http, monkeypatch):
+        monkeypatch.setattr(update_data, "_session", FakeSession(down={"down.example"}))
+        update_data.make_request("https://api.example/a")
+        update_data.make_request("https://api.example/b")
+        with pytest.raises(update_data.requests.exceptions.ConnectionError):
+            update_data.make_request("https://down.example/")
+
+        stats = update_data.http_stats(reset=True)
+        assert {host: (s["requests"], s["errors"], s["bytes"]) for host, s in stats.items()} == {
+            "api.example": (2, 0, 20),
+            "down.example": (1, 1, 0),
+        }
+        assert all(s["seconds"] >= 0 for s in stats.values())
+        assert update_data.http_stats() == {}
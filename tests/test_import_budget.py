@@ -0,0 +1,48 @@
+"""
+Startup budget: importing update_data (as the scoring tests do) must stay cheap
+and must not pull in any dependency that only some sources need.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Generous enough for a cold CI runner that has to compile the module
+IMPORT_BUDGET_SECONDS = 0.5
+
+HEAVY_MODULES = ["requests", "urllib3", "bs4", "selenium", "pytrends", "numpy", "torch", "transformers", "onnxruntime"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import update_data
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def probe_import():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestImportBudget:
+
+    def test_import_stays_within_budget(self):
+        # Best of three runs to keep scheduler noise out of the measurement
+        seconds = min(probe_import()["seconds"] for _ in range(3))
+        assert seconds < IMPORT_BUDGET_SECONDS
+
+    def test_no_heavy_modules_loaded_at_import(self):
+        assert probe_import()["loaded"] == []
+
+    def test_scoring_helper_loads_only_the_html_parser(self):
+        probe = PROBE.replace(
+            "elapsed = ",
+            "update_data.score_naval_force('<h2>Arabian Sea</h2><p>USS Nimitz (CVN 68)</p>'); elapsed = ",
+        )
+        out = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        assert json.loads(out.stdout.strip().splitlines()[-1])["loaded"] == ["bs4"]
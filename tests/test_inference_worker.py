@@ -0,0 +1,76 @@
+"""
+Tests for the inference worker process: scoring happens out of process, the
+worker is recycled after N batches or above its memory ceiling, and a crashed
+worker is replaced on the next request.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+
+def fake_score(titles, stats, alerts=None):
+    if "crash" in titles:
+        os._exit(3)
+    stats["worker_pid"] = os.getpid()
+    return {t: len(t) / 100 for t in titles}
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(update_data, "INFERENCE_WORKER_MAX_BATCHES", 50)
+    monkeypatch.setattr(update_data, "INFERENCE_WORKER_MAX_RSS_MB", 10_000)
+    update_data.stop_inference_worker()
+    yield lambda: update_data.start_inference_worker(score_fn=fake_score)
+    update_data.stop_inference_worker()
+
+
+def score(titles):
+    stats = {}
+    return update_data.score_in_worker(titles, stats), stats
+
+
+class TestInferenceWorker:
+
+    def test_scores_out_of_process(self, worker):
+        worker()
+        scores, stats = score(["Iran fires missiles", "Talks resume"])
+        assert scores == {"Iran fires missiles": 0.19, "Talks resume": 0.12}
+        assert stats["worker_pid"] != os.getpid()
+        assert stats["worker_rss_mb"] > 0
+
+    def test_recycled_after_max_batches(self, worker, monkeypatch):
+        monkeypatch.setattr(update_data, "INFERENCE_WORKER_MAX_BATCHES", 2)
+        worker()
+        pids = [score(["a"])[1]["worker_pid"] for _ in range(4)]
+        assert pids[0] == pids[1] != pids[2] == pids[3]
+
+    def test_recycled_above_memory_ceiling(self, worker, monkeypatch):
+        monkeypatch.setattr(update_data, "INFERENCE_WORKER_MAX_RSS_MB", 1)
+        worker()
+        first, second = (score(["a"])[1]["worker_pid"] for _ in range(2))
+        assert first != second
+
+    def test_crashed_worker_is_replaced(self, worker):
+        worker()
+        with pytest.raises(RuntimeError, match="exit code 3"):
+            score(["crash"])
+        assert score(["a"])[0] == {"a": 0.01}
+
+    def test_rss_limit_is_skipped_without_a_current_reading(self, monkeypatch):
+        import queue
+
+        monkeypatch.setattr(update_data, "_rss_mb", lambda: None)
+        requests_q, responses_q = queue.Queue(), queue.Queue()
+        requests_q.put((["a"], {}, None))
+        requests_q.put(None)
+        update_data._inference_worker_main(requests_q, responses_q, {}, fake_score, max_rss_mb=0, max_batches=50)
+        reply = responses_q.get_nowait()
+        assert reply["rss_mb"] is None and not reply["retiring"]
+
+    def test_timeout_is_shorter_than_the_news_deadline(self):
+        assert update_data.INFERENCE_TIMEOUT < update_data.FETCH_DEADLINES["news"]
@@ -0,0 +1,45 @@
+"""
+Tests for the Aho-Corasick KeywordMatcher: it must find exactly what the
+per-keyword `in` checks found, plus word-boundary flags, in one pass.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from update_data import ALERT_KEYWORDS, NEWS_MATCHER, POLYMARKET_MATCHER, KeywordMatcher
+
+
+class TestKeywordMatcher:
+
+    def test_matches_substring_checks_on_random_text(self):
+        rng = random.Random(7)
+        vocab = {"a": ["ab", "abc", "bca", "c"], "b": ["cab", "abca", "b c", "ab"]}
+        matcher = KeywordMatcher(vocab)
+        for _ in range(500):
+            text = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 20)))
+            found = matcher.scan(text)
+            for category, keywords in vocab.items():
+                assert found[category] == [k for k in keywords if k in text]
+
+    def test_reports_every_occurrence_with_positions(self):
+        hits = KeywordMatcher({"k": ["he", "she", "hers"]}).hits("ushers")
+        assert sorted((kw, start, end) for _, kw, start, end, _ in hits) == [
+            ("he", 2, 4), ("hers", 2, 6), ("she", 1, 4),
+        ]
+
+    def test_word_boundaries(self):
+        # Substring semantics are kept ("war" in "warns"), the flag tells them apart
+        text = "iran warns of war"
+        hits = [(kw, whole) for _, kw, _, _, whole in NEWS_MATCHER.hits(text) if kw == "war"]
+        assert hits == [("war", False), ("war", True)]
+        assert NEWS_MATCHER.scan("tehran warns", whole_words=True)["alert"] == []
+        assert NEWS_MATCHER.scan("tehran warns")["alert"] == ["war"]
+
+    def test_vocabulary_order_and_shared_keywords(self):
+        found = NEWS_MATCHER.scan("troops and missile strike near tehran")
+        assert found["alert"] == [k for k in ALERT_KEYWORDS if k in ("troops", "missile", "strike")]
+        terms = POLYMARKET_MATCHER.scan("will us or israel strike iran by march 3?")
+        assert terms["target"] and terms["iran"] and terms["strike"] == ["strike"]
+        assert POLYMARKET_MATCHER.scan("iran will not strike")["negation"] == [" not ", "will not"]
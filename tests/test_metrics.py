@@ -0,0 +1,76 @@
+"""
+Tests for the OpenMetrics exporter: cumulative fetch histograms, result
+counters, signal freshness and the /metrics endpoint on the health server.
+"""
+
+import os
+import sys
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(update_data, "_metrics", update_data._empty_metrics())
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+class TestMetrics:
+
+    def test_histogram_counters_and_risk(self):
+        update_data.observe_fetch("news", 0.7, "success")
+        update_data.observe_fetch("news", 45.0, "timeout")
+        update_data.observe_classifier(40, 2.0, 10)
+        update_data.observe_cycle(12.5, 37, {"news": 20})
+        text = update_data.render_metrics()
+        metrics = samples(text)
+
+        assert metrics['aegis_fetch_duration_seconds_bucket{source="news",le="0.5"}'] == "0"
+        assert metrics['aegis_fetch_duration_seconds_bucket{source="news",le="1.0"}'] == "1"
+        assert metrics['aegis_fetch_duration_seconds_bucket{source="news",le="60.0"}'] == "2"
+        assert metrics['aegis_fetch_duration_seconds_count{source="news"}'] == "2"
+        assert metrics['aegis_fetch_total{source="news",result="timeout"}'] == "1"
+        assert metrics["aegis_total_risk"] == "37"
+        assert metrics['aegis_signal_risk{signal="news"}'] == "20"
+        assert metrics["aegis_classifier_headlines_total"] == "40"
+        assert "# TYPE aegis_fetch counter" in text and text.endswith("# EOF\n")
+
+        prometheus = update_data.render_metrics(openmetrics=False)
+        assert "# TYPE aegis_fetch_total counter" in prometheus and "# EOF" not in prometheus
+
+    def test_signal_age_uses_data_file_until_a_fetch_succeeds(self):
+        update_data.seed_signal_freshness({"opensky": ({"timestamp": "2026-01-01T00:00:00"}, None), "news": None})
+        seeded = update_data.datetime(2026, 1, 1).timestamp()
+        metrics = samples(update_data.render_metrics())
+        assert float(metrics['aegis_signal_last_success_timestamp_seconds{signal="tanker"}']) == pytest.approx(seeded)
+        assert 'aegis_signal_age_seconds{signal="news"}' not in metrics
+
+        update_data.observe_fetch("opensky", 1.0, "failure")
+        metrics = samples(update_data.render_metrics())
+        assert float(metrics['aegis_signal_last_success_timestamp_seconds{signal="flight"}']) == pytest.approx(seeded)
+        update_data.observe_fetch("opensky", 1.0, "success")
+        assert float(samples(update_data.render_metrics())['aegis_signal_age_seconds{signal="flight"}']) < 5
+
+    def test_health_server_serves_metrics(self, tmp_path):
+        update_data.observe_cycle(1.0, 12)
+        update_data.write_metrics_textfile(str(tmp_path / "aegis.prom"))
+        assert "aegis_total_risk 12" in (tmp_path / "aegis.prom").read_text()
+
+        server = update_data._start_health_server(0)
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.server_address[1]}/metrics",
+                headers={"Accept": "application/openmetrics-text; version=1.0.0"},
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+                assert samples(response.read().decode())["aegis_total_risk"] == "12"
+        finally:
+            server.shutdown()
@@ -0,0 +1,118 @@
+"""
+Tests for model bundles: a build publishes a checksummed read-only copy behind
+a symlink, the symlink is swapped to each new build, a bundle built for another
+revision is not used, and bundle weights are memory-mapped rather than copied.
+"""
+
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+transformers = pytest.importorskip("transformers")
+
+MODEL = "example/tiny-nli"
+SMALL_MODEL = "example/tiny-small"
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    """A tiny NLI model standing in for the hub, and a bundle root under tmp_path."""
+    hub_dir = tmp_path / "hub"
+    hub_dir.mkdir()
+    (hub_dir / "vocab.txt").write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "iran"]))
+    transformers.BertTokenizer(vocab_file=str(hub_dir / "vocab.txt")).save_pretrained(str(hub_dir))
+    labels = ["contradiction", "neutral", "entailment"]
+    config = transformers.BertConfig(
+        vocab_size=8, hidden_size=8, num_hidden_layers=1, num_attention_heads=1, intermediate_size=8,
+        max_position_embeddings=16, id2label=dict(enumerate(labels)), label2id={l: i for i, l in enumerate(labels)},
+    )
+    transformers.BertForSequenceClassification(config).save_pretrained(str(hub_dir), safe_serialization=True)
+
+    fetched = []
+
+    def from_hub(load):
+        def from_pretrained(name, revision=None, **kwargs):
+            if name not in (MODEL, SMALL_MODEL):
+                return load(name, **kwargs)
+            fetched.append(revision)
+            loaded = load(str(hub_dir))
+            if hasattr(loaded, "config"):
+                loaded.config._commit_hash = f"{revision}-0123456789abcdef"
+            return loaded
+        return from_pretrained
+
+    monkeypatch.setattr(transformers.AutoTokenizer, "from_pretrained", from_hub(transformers.AutoTokenizer.from_pretrained))
+    monkeypatch.setattr(
+        transformers.AutoModelForSequenceClassification,
+        "from_pretrained",
+        from_hub(transformers.AutoModelForSequenceClassification.from_pretrained),
+    )
+    monkeypatch.setattr(update_data, "MODEL_BUNDLE_ROOT", str(tmp_path / "models"))
+    monkeypatch.setattr(update_data, "MODEL_REVISIONS", {MODEL: "main", SMALL_MODEL: "main"})
+    monkeypatch.setattr(update_data, "USE_MODEL_BUNDLE", True)
+    return fetched
+
+
+class TestModelBundle:
+
+    def test_build_publishes_a_checksummed_read_only_bundle(self, hub):
+        manifest = update_data.build_model_bundle(MODEL)
+        link = update_data._model_bundle_dir(MODEL)
+        assert os.path.islink(link) and os.path.basename(os.readlink(link)).startswith("example--tiny-nli@main-")
+        assert manifest["revision"].startswith("main-") and manifest["requested_revision"] == "main"
+        assert "model.safetensors" in manifest["files"]
+        for name, entry in manifest["files"].items():
+            path = os.path.join(link, name)
+            assert update_data._sha256_file(path) == entry["sha256"]
+            assert not os.stat(path).st_mode & stat.S_IWUSR
+        with open(os.path.join(link, "manifest.json")) as f:
+            assert json.load(f) == manifest
+
+        assert update_data._model_source(MODEL) == (link, {"local_files_only": True, "low_cpu_mem_usage": True})
+        assert update_data.build_model_bundle(MODEL) == manifest and hub == ["main", "main"]
+
+    def test_rebuild_swaps_the_link_and_removes_the_old_build(self, hub):
+        update_data.build_model_bundle(MODEL)
+        link = update_data._model_bundle_dir(MODEL)
+        first = os.path.realpath(link)
+        update_data.build_model_bundle(MODEL, force=True)
+        assert os.path.realpath(link) != first and not os.path.exists(first)
+        assert sorted(os.listdir(update_data.MODEL_BUNDLE_ROOT)) == sorted(
+            [os.path.basename(link), os.path.basename(os.path.realpath(link))]
+        )
+
+    def test_bundle_for_another_revision_is_not_used(self, hub, monkeypatch):
+        update_data.build_model_bundle(MODEL)
+        monkeypatch.setitem(update_data.MODEL_REVISIONS, MODEL, "v2")
+        assert update_data._model_source(MODEL) == (MODEL, {"revision": "v2"})
+
+        manifest = update_data.build_model_bundle(MODEL)
+        assert manifest["requested_revision"] == "v2" and hub[-1] == "v2"
+        assert update_data._model_source(MODEL)[0] == update_data._model_bundle_dir(MODEL)
+
+    def test_each_model_is_pinned_separately(self, hub, monkeypatch):
+        update_data.build_model_bundle(SMALL_MODEL)
+        monkeypatch.setitem(update_data.MODEL_REVISIONS, MODEL, "0123abcd")
+        assert update_data._model_source(MODEL) == (MODEL, {"revision": "0123abcd"})
+
+        # The other model's bundle still matches its own revision and is not rebuilt
+        assert update_data._model_source(SMALL_MODEL)[0] == update_data._model_bundle_dir(SMALL_MODEL)
+        assert update_data.build_model_bundle(SMALL_MODEL)["requested_revision"] == "main"
+        assert update_data.build_model_bundle(MODEL)["requested_revision"] == "0123abcd"
+        assert hub == ["main", "main", "0123abcd", "0123abcd"]
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs /proc")
+    def test_bundle_weights_are_memory_mapped(self, hub):
+        update_data.build_model_bundle(MODEL)
+        source, kwargs = update_data._model_source(MODEL)
+        model = transformers.AutoModelForSequenceClassification.from_pretrained(source, **kwargs)
+        weights = os.path.realpath(os.path.join(source, "model.safetensors"))
+        with open("/proc/self/maps") as f:
+            assert any(line.rstrip("\n").endswith(weights) for line in f)
+        assert update_data._entailment_id(model.config) == 2
@@ -0,0 +1,92 @@
+"""
+Tests for the length-bucketed NLI scorer: pairs assembled from once-tokenized
+headlines must score exactly like per-pair tokenization, whatever the batching.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+from update_data import ESCALATION_HYPOTHESIS, ESCALATION_LABELS
+
+
+class WordTokenizer:
+    """[CLS] premise [SEP] hypothesis [SEP], one id per word, BERT-style segments."""
+
+    model_input_names = ["input_ids", "token_type_ids", "attention_mask"]
+    model_max_length = 512
+    pad_token_id = 0
+    CLS, SEP = 1, 2
+
+    def _ids(self, text):
+        return [3 + sum(map(ord, w)) % 997 for w in text.split()]
+
+    def __call__(self, text, text_pair=None, add_special_tokens=True, truncation=None, max_length=None):
+        if isinstance(text, list):
+            return {"input_ids": [self(t, add_special_tokens=add_special_tokens)["input_ids"] for t in text]}
+        a = self._ids(text)
+        if not add_special_tokens:
+            return {"input_ids": a}
+        b = self._ids(text_pair)
+        if max_length:
+            a = a[: max_length - len(b) - 3]
+        ids = [self.CLS] + a + [self.SEP] + b + [self.SEP]
+        return {"input_ids": ids, "token_type_ids": [0] * (len(a) + 2) + [1] * (len(b) + 1)}
+
+
+def fake_forward(batches):
+    def forward(inputs):
+        batches.append(inputs["input_ids"].shape)
+        ids = inputs["input_ids"] * inputs["attention_mask"]
+        weighted = (ids * (1 + inputs["token_type_ids"])).sum(axis=1) % 13 / 3.0
+        return np.stack([weighted, -weighted, np.zeros_like(weighted)], axis=1)
+    return forward
+
+
+def reference_scores(titles, tokenizer):
+    target = ESCALATION_LABELS.index("military escalation")
+    scores = []
+    for title in titles:
+        logits = []
+        for label in ESCALATION_LABELS:
+            enc = tokenizer(title, ESCALATION_HYPOTHESIS.format(label))
+            ids, types = np.array(enc["input_ids"]), np.array(enc["token_type_ids"])
+            logits.append((ids * (1 + types)).sum() % 13 / 3.0)
+        probs = np.exp(logits) / np.exp(logits).sum()
+        scores.append(float(probs[target]))
+    return scores
+
+
+TITLES = [
+    "Iran fires missiles",
+    "US carrier strike group enters the Gulf of Oman amid rising tensions",
+    "Talks resume",
+    "Oil prices climb as tanker traffic through the Strait of Hormuz slows",
+]
+
+
+class TestNliBatching:
+
+    def test_matches_per_pair_tokenization(self):
+        tokenizer = WordTokenizer()
+        scores = update_data._nli_escalation_scores(TITLES, tokenizer, fake_forward([]), entailment_id=0)
+        assert scores == pytest.approx(reference_scores(TITLES, tokenizer))
+
+    def test_batches_pack_pairs_across_headlines_by_length(self, monkeypatch):
+        monkeypatch.setattr(update_data, "NLI_MAX_BATCH_TOKENS", 200)
+        tokenizer = WordTokenizer()
+        batches = []
+        scores = update_data._nli_escalation_scores(TITLES, tokenizer, fake_forward(batches), entailment_id=0)
+
+        assert scores == pytest.approx(reference_scores(TITLES, tokenizer))
+        assert sum(rows for rows, _ in batches) == len(TITLES) * len(ESCALATION_LABELS)
+        assert all(rows * width <= 200 for rows, width in batches)
+        assert [width for _, width in batches] == sorted(width for _, width in batches)
+        assert max(rows for rows, _ in batches) > len(ESCALATION_LABELS)
+
+    def test_empty_input(self):
+        assert update_data._nli_escalation_scores([], WordTokenizer(), fake_forward([]), 0) == []
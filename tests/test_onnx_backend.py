@@ -0,0 +1,82 @@
+"""
+Tests for the ONNX escalation backend: a build outside tolerance is refused,
+the scorer falls back to PyTorch, and scores are cached under the backend that
+actually produced them.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+
+def write_build(model_dir, within_tolerance):
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, "model.int8.onnx"), "wb") as f:
+        f.write(b"")
+    with open(os.path.join(model_dir, "manifest.json"), "w") as f:
+        json.dump({"within_tolerance": within_tolerance, "max_abs_diff": 0.2}, f)
+
+
+def fake_scorer(score):
+    def scorer(titles):
+        return [score] * len(titles)
+
+    scorer.threads = 1
+    return scorer
+
+
+@pytest.fixture
+def onnx_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(update_data, "ESCALATION_BACKEND", "onnx")
+    monkeypatch.setattr(update_data, "ESCALATION_MODE", "full")
+    monkeypatch.setattr(update_data, "INFERENCE_WORKER", "inline")
+    monkeypatch.setattr(update_data, "ESCALATION_CACHE_FILE", str(tmp_path / "scores.json"))
+    monkeypatch.setattr(update_data, "_escalation_cache", None)
+    monkeypatch.setattr(update_data, "_escalation_scorer", None)
+    monkeypatch.setattr(update_data, "_escalation_backend", None)
+    monkeypatch.setattr(update_data, "_load_torch_scorer", lambda *args: fake_scorer(0.25))
+    return tmp_path
+
+
+class TestOnnxBackend:
+
+    def test_build_outside_tolerance_is_refused(self, onnx_config):
+        model_dir = str(onnx_config / "onnx")
+        write_build(model_dir, within_tolerance=False)
+        with pytest.raises(RuntimeError, match="deviates"):
+            update_data._load_onnx_scorer(model_dir)
+
+    def test_missing_manifest_triggers_a_build(self, onnx_config, monkeypatch):
+        model_dir = str(onnx_config / "onnx")
+        built = []
+        monkeypatch.setattr(update_data, "build_onnx_model", lambda d: built.append(d) or write_build(d, False))
+        with pytest.raises(RuntimeError):
+            update_data._load_onnx_scorer(model_dir)
+        assert built == [model_dir]
+
+    def test_fallback_scores_are_cached_as_torch(self, onnx_config, monkeypatch):
+        def refuse(*args, **kwargs):
+            raise RuntimeError("quantized model deviates")
+
+        monkeypatch.setattr(update_data, "_load_onnx_scorer", refuse)
+        stats = {}
+        assert update_data.classify_escalation(["Iran fires missiles"], stats) == [0.25]
+        assert stats["backend"] == "torch"
+        torch_id = update_data._escalation_model_id("torch")
+        onnx_id = update_data._escalation_model_id("onnx")
+        assert update_data.escalation_cache_lookup(["Iran fires missiles"], torch_id) == {"Iran fires missiles": 0.25}
+        assert update_data.escalation_cache_lookup(["Iran fires missiles"], onnx_id) == {}
+        # Later lookups use the backend that loaded, so the torch score is served again
+        assert update_data._escalation_model_id() == torch_id
+
+    def test_onnx_scores_are_cached_as_quantized(self, onnx_config, monkeypatch):
+        monkeypatch.setattr(update_data, "_load_onnx_scorer", lambda *args: fake_scorer(0.75))
+        assert update_data.classify_escalation(["Talks resume"]) == [0.75]
+        onnx_id = update_data._escalation_model_id("onnx")
+        assert onnx_id.endswith("+onnx-int8")
+        assert update_data.escalation_cache_lookup(["Talks resume"], onnx_id) == {"Talks resume": 0.75}
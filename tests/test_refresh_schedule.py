@@ -0,0 +1,118 @@
+"""
+Tests for the per-source refresh schedule: only due sources are fetched, the
+rest keep their last known value, and unchanged inputs skip the rewrite.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+from update_data import due_sources, SOURCE_SCHEDULE
+
+
+def _ts(seconds_ago):
+    return (datetime.now() - timedelta(seconds=seconds_ago)).isoformat()
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    monkeypatch.setattr(update_data, "OUTPUT_FILE", str(path))
+    calls = []
+
+    def fake(name, value):
+        def fetch(*args, **kwargs):
+            calls.append(name)
+            return value
+        return fetch
+
+    monkeypatch.setattr(update_data, "fetch_pentagon_data", fake("pentagon", {"risk_contribution": 2, "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_polymarket_odds", fake("polymarket", {"odds": 20, "market": "m", "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_news_intel", fake("news", {"total_count": 4, "alert_count": 1, "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_oil_prices", fake("oil", {"risk": 30, "current_price": 70.0, "change_24h": 1.0, "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_google_trends", fake("trends", {"risk": 10, "current_interest": 5, "peak_keyword": "k", "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_opensky_data", fake("opensky", ({"aircraft_count": 40, "timestamp": _ts(0)}, {"tanker_count": 1, "timestamp": _ts(0)})))
+    monkeypatch.setattr(update_data, "fetch_weather_data", fake("weather", {"clouds": 50, "description": "cloudy", "timestamp": _ts(0)}))
+    monkeypatch.setattr(update_data, "fetch_military_buildup", fake("buildup", {"risk": 12, "detail": "d", "timestamp": _ts(0)}))
+    return path, calls
+
+
+class TestDueSources:
+
+    def test_missing_values_are_due(self):
+        assert due_sources({}) == list(SOURCE_SCHEDULE)
+
+    def test_fresh_values_are_not_due(self):
+        last_known = {name: {"timestamp": _ts(10)} for name in SOURCE_SCHEDULE}
+        last_known["opensky"] = ({"timestamp": _ts(10)}, None)
+        assert due_sources(last_known) == []
+
+    def test_stale_values_are_due(self):
+        last_known = {name: {"timestamp": _ts(10)} for name in SOURCE_SCHEDULE}
+        last_known["opensky"] = ({"timestamp": _ts(10)}, None)
+        last_known["polymarket"] = {"timestamp": _ts(SOURCE_SCHEDULE["polymarket"][0])}
+        assert due_sources(last_known) == ["polymarket"]
+
+
+class TestScheduledUpdate:
+
+    def test_not_due_sources_keep_last_known_value(self, data_file):
+        path, calls = data_file
+        assert update_data.update_data_file()
+        assert sorted(calls) == sorted(SOURCE_SCHEDULE)
+
+        calls.clear()
+        assert update_data.update_data_file(sources=["polymarket"])
+        assert calls == ["polymarket"]
+        data = json.loads(path.read_text())
+        assert data["weather"]["raw_data"]["clouds"] == 50
+        assert data["oil"]["risk"] == 30
+        assert data["flight"]["raw_data"]["aircraft_count"] == 40
+
+    def test_refresh_within_history_interval_overwrites_latest_point(self, data_file):
+        path, _ = data_file
+        update_data.update_data_file()
+        update_data.update_data_file(sources=["polymarket"])
+        data = json.loads(path.read_text())
+        assert len(data["polymarket"]["history"]) == 1
+
+    def test_unchanged_inputs_skip_rewrite(self, data_file):
+        path, _ = data_file
+        update_data.update_data_file()
+        before = path.stat().st_mtime_ns
+        time.sleep(0.01)
+        assert update_data.update_data_file(sources=["weather"], skip_unchanged=True)
+        assert path.stat().st_mtime_ns == before
+
+    def test_slow_fetch_is_stamped_when_it_started(self, data_file, monkeypatch):
+        path, _ = data_file
+
+        def slow_news():
+            time.sleep(0.2)
+            return {"total_count": 4, "alert_count": 1, "timestamp": datetime.now().isoformat()}
+
+        monkeypatch.setattr(update_data, "fetch_news_intel", slow_news)
+        started = time.time()
+        update_data.update_data_file(sources=["news"])
+        data = json.loads(path.read_text())
+        fetched_at = datetime.fromisoformat(data["news"]["raw_data"]["timestamp"]).timestamp()
+        assert fetched_at - started < 0.2
+
+    def test_classifier_telemetry_is_not_a_change(self, data_file, monkeypatch):
+        path, _ = data_file
+        runs = iter([12.5, 40.1])
+        monkeypatch.setattr(update_data, "fetch_news_intel", lambda: {
+            "total_count": 4, "alert_count": 1, "timestamp": _ts(0),
+            "escalation_stages": {"full_model_ms": next(runs), "cached": 0},
+        })
+        update_data.update_data_file(sources=["news"])
+        before = path.stat().st_mtime_ns
+        time.sleep(0.01)
+        assert update_data.update_data_file(sources=["news"], skip_unchanged=True)
+        assert path.stat().st_mtime_ns == before
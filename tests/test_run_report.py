@@ -0,0 +1,70 @@
+"""
+Tests for per-stage spans and the run report written next to the data file.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+from update_data import Span
+
+
+class TestRunReport:
+
+    def test_spans_record_bytes_and_peak_memory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(update_data, "RUN_TRACE", True)
+        monkeypatch.setattr(update_data, "SPAN_TRACEMALLOC", True)
+        update_data.begin_run()
+        with Span("outer"):
+            update_data._span_add_bytes(100)
+            with Span("inner"):
+                update_data._span_add_bytes(50)
+                block = bytearray(4 * 1024 * 1024)
+            del block
+        report = update_data.write_run_report({"outer": {"seconds": 0.0, "status": "ok"}}, str(tmp_path))
+
+        spans = {s["name"]: s for s in report["spans"]}
+        assert spans["outer"]["bytes"] == 150 and spans["inner"]["bytes"] == 50
+        assert spans["inner"]["peak_traced_kb"] >= 4096
+        assert spans["outer"]["peak_traced_kb"] >= spans["inner"]["peak_traced_kb"]
+        assert spans["outer"]["wall_s"] >= spans["inner"]["wall_s"] >= 0
+
+        assert json.loads((tmp_path / "run_report.json").read_text())["spans"] == report["spans"]
+        trace = json.loads((tmp_path / "run_trace.json").read_text())["traceEvents"]
+        assert {e["name"] for e in trace if e["ph"] == "X"} == {"outer", "inner"}
+        assert not update_data.tracemalloc.is_tracing()
+
+    def test_fetchers_get_a_span_each(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(update_data, "SPAN_TRACEMALLOC", False)
+        update_data.begin_run()
+
+        def broken():
+            raise RuntimeError("down")
+
+        update_data.run_fetchers({"ok": lambda: 1, "broken": broken})
+        report = update_data.write_run_report(output_dir=str(tmp_path))
+        assert {(s["name"], s["status"]) for s in report["spans"]} == {("ok", "ok"), ("broken", "error")}
+        assert all(s["category"] == "fetch" and s["peak_traced_kb"] is None for s in report["spans"])
+
+    def test_fetch_bytes_roll_up_and_spans_finish_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(update_data, "SPAN_TRACEMALLOC", False)
+        update_data.begin_run()
+
+        def download():
+            update_data._span_add_bytes(300)
+            return 1
+
+        with Span("fetch", "cycle") as fetch_span:
+            update_data.run_fetchers({"a": download, "b": download}, span=fetch_span)
+        scoring = Span("score", "cycle").start()
+        scoring.finish("error")
+        scoring.finish()
+        report = update_data.write_run_report(output_dir=str(tmp_path))
+
+        spans = {s["name"]: s for s in report["spans"]}
+        assert spans["fetch"]["bytes"] == 600 and spans["a"]["bytes"] == 300
+        assert spans["score"]["status"] == "error"
+        assert [s["name"] for s in report["spans"]].count("score") == 1
+        assert not update_data._open_spans
@@ -0,0 +1,55 @@
+"""
+Stress test for Fleet Tracker section segmentation: synthetic trackers with
+thousands of sections and ships must score correctly and in linear time.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from update_data import _parse_fleet_sections, score_naval_force
+
+REGIONS = ["Arabian Sea", "Mediterranean Sea", "Western Pacific", "Red Sea"]
+
+
+def synthetic_tracker(sections):
+    parts = []
+    for i in range(sections):
+        parts.append(
+            f"<h2>{REGIONS[i % len(REGIONS)]}</h2>"
+            f"<p>Destroyer USS Ship{i} (DDG-{i + 1}) and cruiser USS Cruiser{i} (CG-{i + 1}) are operating.</p>"
+            f"<p>Carrier Air Wing squadrons VFA-{i + 1} and VAQ-{i + 1}.</p>"
+        )
+    return "".join(parts)
+
+
+def best_time(fn, arg, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class TestSectionScaling:
+
+    def test_thousands_of_sections_segment_correctly(self):
+        html = synthetic_tracker(2000)
+        sections = _parse_fleet_sections(html)
+        assert len(sections) == 2000
+        assert sections[1]["text"].startswith("Destroyer USS Ship1 (DDG-2)")
+        assert "Ship2 " not in sections[1]["text"]
+
+        result = score_naval_force(html)
+        assert result["total_ships_parsed"] == 4000
+        # Arabian Sea and Red Sea sections are high relevance: DDG 4 + CG 6 each
+        assert result["counted_ships"] == 2000
+        assert result["total_weighted_points"] == 1000 * (4 + 6)
+
+    def test_segmentation_scales_linearly(self):
+        small, large = synthetic_tracker(1000), synthetic_tracker(8000)
+        ratio = best_time(_parse_fleet_sections, large) / best_time(_parse_fleet_sections, small)
+        # 8x the sections: linear is ~8x, the old quadratic sibling scan was ~50x
+        assert ratio < 20
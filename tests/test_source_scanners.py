@@ -0,0 +1,104 @@
+"""
+Tests for the pure Polymarket and OpenSky scanners pulled out of their fetchers.
+"""
+
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+NOW = datetime(2026, 1, 20, 12, 0)
+
+
+def market(question, yes):
+    return {"question": question, "outcomePrices": [str(yes), str(round(1 - yes, 3))]}
+
+
+def state(icao, callsign, lat=30.0, lon=52.0, on_ground=False):
+    return [icao, callsign, "", 0, 0, lon, lat, 10000.0, on_ground] + [None] * 8
+
+
+class TestPolymarketScan:
+
+    def test_picks_highest_near_term_strike_market(self):
+        events = [
+            {"title": "Will US or Israel strike Iran by January 24?",
+             "markets": [market("Will US or Israel strike Iran by January 24?", 0.12)]},
+            {"title": "Middle East",
+             "markets": [market("Israel military action against Iran by January 22?", 0.31),
+                         market("US strikes Iran by March 1?", 0.8)]},
+        ]
+        assert update_data._scan_polymarket_events(events, NOW) == (31, "Israel military action against Iran by January 22?")
+
+    def test_negated_and_far_dated_markets_are_ignored(self):
+        events = [{"title": "Iran",
+                   "markets": [market("Will Iran not strike Israel by January 22?", 0.9),
+                               market("Iran strike by February 28?", 0.4)]}]
+        assert update_data._scan_polymarket_events(events, NOW) == (0, "")
+
+    def test_falls_back_to_any_near_term_iran_market(self):
+        events = [{"title": "Iran nuclear deal by January 25?", "markets": [market("Iran nuclear deal by January 25?", 0.07)]}]
+        assert update_data._scan_polymarket_events(events, NOW) == (7, "Iran nuclear deal by January 25?")
+
+
+class TestOpenSkyClassification:
+
+    def test_civil_tanker_and_military_split(self):
+        states = [
+            state("7301a2", "IRA712 "),
+            state("7301a3", "QTR8", lat=24.0),            # outside the Iran box
+            state("ae1234", "IRON41"),                     # USAF tanker
+            state("43c100", "RFR7001"),                    # RAF, not a tanker, not civil
+            state("7301a4", "KC135X", lat=21.0, lon=41.0), # tanker anywhere in the bbox
+            state("7301a5", "IRM33", on_ground=True),
+            state("7301a6", "IRA99"),
+        ]
+        assert update_data._classify_opensky_states(states) == {
+            "civil_count": 2,
+            "airlines": ["IRA"],
+            "tanker_count": 2,
+            "tanker_callsigns": ["IRON41", "KC135X"],
+            "region_counts": {"iraq": 0, "gulf_states": 1, "strait_of_hormuz": 0, "red_sea": 0},
+        }
+
+    def test_geofences_count_civil_traffic_per_region(self):
+        states = [
+            state("7301a2", "IAW211", lat=33.3, lon=44.4),   # Baghdad
+            state("7301a3", "KAC101", lat=29.4, lon=47.9),   # Kuwait
+            state("7301a4", "UAE9", lat=26.5, lon=56.3),     # Strait of Hormuz
+            state("7301a5", "SVA33", lat=21.5, lon=39.1),    # Jeddah
+            state("7301a6", "SVA34", lat=15.0, lon=42.0),    # southern Red Sea
+            state("7301a7", "THY5", lat=35.0, lon=51.4),     # Tehran: no geofence
+            state("ae0001", "RCH123", lat=33.0, lon=44.0),   # military, never civil
+        ]
+        counts = update_data._classify_opensky_states(states)
+        assert counts["region_counts"] == {"iraq": 1, "gulf_states": 1, "strait_of_hormuz": 1, "red_sea": 2}
+        assert counts["civil_count"] == 4  # the Iran rectangle also takes in Baghdad, Kuwait and Hormuz
+
+    def test_tankers_outside_the_original_bbox_are_not_counted(self):
+        states = [state("ae1234", "IRON41", lat=15.0, lon=42.0), state("ae1235", "SHELL2", lat=20.0, lon=40.0)]
+        counts = update_data._classify_opensky_states(states)
+        assert (counts["tanker_count"], counts["tanker_callsigns"]) == (1, ["SHELL2"])
+        assert counts["region_counts"]["red_sea"] == 0
+
+    def test_grid_index_only_tests_nearby_geofences(self):
+        index = update_data.GeofenceIndex({"square": [(0, 0), (2, 0), (2, 2), (0, 2)], "far": [(50, 50), (51, 50), (51, 51)]})
+        assert index.cells[(1, 1)] == [0]
+        assert [index.names[i] for i in index.locate(1.5, 0.5)] == ["square"]
+        assert index.locate(10.0, 10.0) == []
+
+    def test_columnar_path_matches_loop(self):
+        rng = random.Random(3)
+        callsigns = ["IRA712", " qtr8 ", "IRON41", "KC10", "RFR7001", "SHELL", "NAVY2", "TANKER1", "IR", "", None]
+        icaos = ["7301a2", "ae1234", "AE1234", "43c100", "adf7ff", " ae0001", "ae12", "zzzzzz", "", None]
+        states = [
+            state(rng.choice(icaos), rng.choice(callsigns),
+                  lat=rng.choice([None, 20, 25, 40, rng.uniform(12, 41)]), lon=rng.choice([None, 40, 44, 64, rng.uniform(32, 65)]),
+                  on_ground=rng.random() < 0.1)
+            for _ in range(600)
+        ]
+        assert update_data._classify_opensky_states_numpy(states) == update_data._classify_opensky_states_python(states)
+        assert update_data._classify_opensky_states(states[:3]) == update_data._classify_opensky_states_python(states[:3])
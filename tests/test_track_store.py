@@ -0,0 +1,107 @@
+"""
+Tests for the OpenSky track store: airframes are deduplicated by icao24 across
+polls, counts cover a sliding window, and memory stays bounded.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import update_data
+
+CIVIL, TANKER = update_data.TRACK_CIVIL, update_data.TRACK_TANKER
+
+
+def state(icao, callsign, lat=30.0, lon=52.0, on_ground=False):
+    return [icao, callsign, "", 0, 0, lon, lat, 10000.0, on_ground] + [None] * 8
+
+
+def poll(store, states, ts):
+    flags = update_data._classify_opensky_states(states, with_flags=True)["flags"]
+    store.observe_states(states, flags, ts)
+    return store.window_counts(ts)
+
+
+class TestTrackStore:
+
+    def test_airframe_seen_in_consecutive_polls_counts_once(self):
+        store = update_data.TrackStore()
+        first = poll(store, [state("ae1234", "IRON41"), state("7301a2", "IRA712")], 1000.0)
+        assert (first["civil_count"], first["tanker_count"]) == (1, 1)
+
+        second = poll(store, [state("ae1234", "IRON41", lat=31.0), state("7301a3", "IRA99")], 1900.0)
+        assert second == {"civil_count": 2, "tanker_count": 1, "tanker_callsigns": ["IRON41"]}
+
+        # Two polls later the first one has left the window
+        third = poll(store, [state("7301a3", "IRA99")], 3700.0)
+        assert (third["civil_count"], third["tanker_count"]) == (1, 0)
+
+    def test_single_poll_matches_snapshot_counts(self):
+        states = [state(f"7301{i:02x}", f"IRA{i}") for i in range(20)] + [state("ae0001", "SHELL1", on_ground=True)]
+        snapshot = update_data._classify_opensky_states(states)
+        window = poll(update_data.TrackStore(), states, 500.0)
+        assert (window["civil_count"], window["tanker_count"]) == (snapshot["civil_count"], snapshot["tanker_count"])
+
+    def test_ring_and_capacity_stay_bounded(self):
+        store = update_data.TrackStore(capacity=2, points=3)
+        for ts in range(10):
+            store.observe("ae1234", "IRON41", 30.0 + ts, 50.0, TANKER, float(ts))
+        track, = store.recent_tracks(icao24="ae1234")
+        assert [point[0] for point in track["points"]] == [7.0, 8.0, 9.0]
+        assert track["dwell_seconds"] == 9.0
+
+        store.observe("7301a2", "IRA1", 30.0, 50.0, CIVIL, 10.0)
+        store.observe("7301a3", "IRA2", 30.0, 50.0, CIVIL, 11.0)  # full: reuses the stalest slot
+        assert sorted(store.slots) == ["7301a2", "7301a3"]
+
+        store.evict(11.0 + update_data.TRACK_RETENTION_SECONDS - 0.5)
+        assert list(store.slots) == ["7301a3"]
+
+    def test_full_store_reuses_least_recently_seen_slot(self):
+        store = update_data.TrackStore(capacity=2, points=3)
+        store.observe("7301a1", "IRA1", 30.0, 50.0, CIVIL, 1.0)
+        store.observe("7301a2", "IRA2", 30.0, 50.0, CIVIL, 2.0)
+        store.observe("7301a1", "IRA1", 30.5, 50.0, CIVIL, 3.0)
+        store.observe("7301a3", "IRA3", 30.0, 50.0, CIVIL, 4.0)
+        assert list(store.slots) == ["7301a1", "7301a3"]
+        track, = store.recent_tracks(icao24="7301a3")
+        assert (track["first_seen"], len(track["points"])) == (4.0, 1)
+
+    def test_round_trips_through_json(self):
+        store = update_data.TrackStore()
+        poll(store, [state("ae1234", "IRON41", lat=None, lon=None), state("7301a2", "IRA712")], 1000.0)
+        poll(store, [state("7301a2", "IRA712", lat=31.0)], 1900.0)
+        restored = update_data.TrackStore.from_json(store.to_json())
+        assert restored.recent_tracks() == store.recent_tracks()
+        assert restored.window_counts(1900.0) == store.window_counts(1900.0)
+        assert [t["icao24"] for t in restored.recent_tracks(since=1500.0, flags=CIVIL)] == ["7301a2"]
+
+    def test_window_spans_exactly_one_previous_poll(self):
+        interval, jitter = update_data.SOURCE_SCHEDULE["opensky"]
+        assert interval + jitter < update_data.TRACK_WINDOW_SECONDS < 2 * (interval - jitter)
+
+    def test_risk_counts_stay_per_poll(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(update_data, "TRACK_STORE_FILE", str(tmp_path / "tracks.json"))
+        monkeypatch.setattr(update_data, "_track_store", update_data.TrackStore())
+        polls = [
+            (1000, [state("ae1234", "IRON41"), state("7301a2", "IRA712")]),
+            (1900, [state("ae5678", "SHELL2"), state("7301a3", "IRA99")]),
+        ]
+
+        class Response:
+            ok = True
+
+            def __init__(self, payload):
+                self.payload = payload
+
+            def json(self):
+                return self.payload
+
+        for ts, states in polls:
+            monkeypatch.setattr(update_data, "make_request", lambda *a, **k: Response({"time": ts, "states": states}))
+            aviation, tanker = update_data.fetch_opensky_data()
+        assert (aviation["aircraft_count"], aviation["window_count"]) == (1, 2)
+        assert (tanker["tanker_count"], tanker["window_count"]) == (1, 2)
+        assert len(tanker["callsigns"]) <= tanker["tanker_count"]
+        assert (tanker["callsigns"], tanker["window_callsigns"]) == (["SHELL2"], ["IRON41", "SHELL2"])
+        assert update_data.calculate_aviation_risk(aviation) == 25
@@ -6,44 +6,713 @@ REDESIGNED: Now fetches ALL API data (OpenSky, Weather, Polymarket, News, etc.)
 Frontend only reads the JSON - no direct API calls from browser
 """
 
+import base64
+import hashlib
+import importlib
 import json
 import os
+import random
 import re
+import sys
+import threading
 import time
-import ssl
-import urllib3
+import tracemalloc
+import unicodedata
 import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 
-import requests
-from bs4 import BeautifulSoup
 
-# Disable SSL warnings for corporate proxies with self-signed certs
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
 
-# Create a session that can handle SSL issues
-session = requests.Session()
-session.verify = os.environ.get("SSL_VERIFY", "true").lower() != "false"
+    def __init__(self, name):
+        self._name = name
+        self._module = None
 
-# If SSL_VERIFY is explicitly false, disable verification
-if not session.verify:
-    print("WARNING: SSL verification disabled")
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Third-party modules load only when a source actually uses them, so a run that
+# serves everything from cache (or just imports a scoring helper) skips them.
+# Heavier ones (selenium, pytrends, transformers, torch) are imported inside
+# the functions that need them.
+requests = _LazyModule("requests")
+urllib3 = _LazyModule("urllib3")
+bs4 = _LazyModule("bs4")
+
+SSL_VERIFY = os.environ.get("SSL_VERIFY", "true").lower() != "false"
+
+# Keep-alive connection pools. urllib3 keeps one pool per scheme/host/port, so
+# repeated calls to the same host (e.g. news.google.com) reuse an open TLS
+# connection; pool_maxsize lets concurrent fetchers share a host without queueing.
+HTTP_POOL_HOSTS = 32
+HTTP_POOL_MAXSIZE = 8
+
+_session = None
+_http_lock = threading.Lock()
+# Hosts whose certificate failed verification this process (corporate proxy);
+# later calls go straight to the unverified attempt instead of a doomed handshake.
+_insecure_hosts = set()
+# Per-host {"requests", "errors", "bytes", "seconds"} since the last reset
+HTTP_HOST_STATS = {}
+
+
+def _record_http(host, started, nbytes, error=False):
+    """Accumulate latency and payload size for one request to host."""
+    with _http_lock:
+        stats = HTTP_HOST_STATS.setdefault(
+            host, {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0}
+        )
+        stats["requests"] += 1
+        stats["errors"] += int(error)
+        stats["bytes"] += nbytes
+        stats["seconds"] += time.monotonic() - started
+
+
+def http_stats(reset=False):
+    """Snapshot of per-host HTTP stats; optionally clear them afterwards."""
+    with _http_lock:
+        snapshot = {host: dict(stats) for host, stats in HTTP_HOST_STATS.items()}
+        if reset:
+            HTTP_HOST_STATS.clear()
+    return snapshot
+
+
+def _get_session():
+    """The shared keep-alive session, created on first use."""
+    global _session
+    with _http_lock:
+        if _session is None:
+            # Disable SSL warnings for corporate proxies with self-signed certs
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+            # Create a session that can handle SSL issues
+            session = requests.Session()
+            session.verify = SSL_VERIFY
+            if not session.verify:
+                print("WARNING: SSL verification disabled")
+
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
 
 
 def make_request(url, **kwargs):
-    """Make HTTP request with SSL handling for corporate proxies"""
+    """Make HTTP GET through the shared keep-alive session, with SSL handling for corporate proxies"""
     # Default timeout
     kwargs.setdefault("timeout", 20)
-    
-    # Try with verification first, fall back to without if needed
+    host = urlsplit(url).hostname or ""
+
+    with _http_lock:
+        if host in _insecure_hosts:
+            kwargs.setdefault("verify", False)
+
+    if _cassette is not None and _cassette.replaying:
+        response = _cassette.replay_response(url, kwargs.get("params"))
+        _span_add_bytes(len(response.content))
+        return response
+
+    session = _get_session()
+    started = time.monotonic()
+    try:
+        # Try with verification first, fall back to without if needed
+        try:
+            response = session.get(url, **kwargs)
+        except requests.exceptions.SSLError:
+            # Retry without SSL verification for corporate proxies
+            print(f"  SSL error for {host}, retrying without verification...")
+            with _http_lock:
+                _insecure_hosts.add(host)
+            kwargs["verify"] = False
+            response = session.get(url, **kwargs)
+    except Exception:
+        _record_http(host, started, 0, error=True)
+        raise
+
+    _record_http(host, started, len(response.content))
+    _span_add_bytes(len(response.content))
+    if _cassette is not None:
+        _cassette.record_response(url, kwargs.get("params"), response)
+    return response
+
+
+# =============================================
+# RUN TELEMETRY (spans)
+# =============================================
+
+# Each update cycle records a span per fetcher, per expensive sub-stage and for
+# the scoring block, and writes them to RUN_REPORT_NAME next to OUTPUT_FILE.
+RUN_REPORT_NAME = "run_report.json"
+# Chrome trace-event file (chrome://tracing, Perfetto) written alongside when enabled
+RUN_TRACE_NAME = "run_trace.json"
+RUN_TRACE = os.environ.get("RUN_TRACE", "0") == "1"
+# Trace Python allocations during a cycle so spans can report peak traced memory.
+# Off by default: tracemalloc makes allocation-heavy stages (BeautifulSoup parsing)
+# several times slower. Without it peak_traced_kb is null.
+SPAN_TRACEMALLOC = os.environ.get("SPAN_TRACEMALLOC", "0") == "1"
+
+_span_lock = threading.Lock()
+_span_local = threading.local()
+_open_spans = set()
+_run_spans = []
+_run_started = None
+_run_owns_tracemalloc = False
+
+
+def _fold_traced_peak():
+    """
+    Credit the traced-memory peak since the last span event to every open span,
+    then reset the peak. The set of open spans is constant between events, so
+    each span sees exactly the peak reached while it was open (process-wide:
+    overlapping spans include each other's allocations). Caller holds _span_lock.
+    Returns the current traced size.
+    """
+    if not tracemalloc.is_tracing():
+        return 0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for open_span in _open_spans:
+        open_span.peak = max(open_span.peak, peak)
+    return current
+
+
+class Span:
+    """
+    Times a stage: wall time, CPU time of the running thread, bytes downloaded
+    through make_request on that thread, and peak traced memory above the level
+    at entry. Use as a context manager, or call start() and finish() on the same
+    thread around code that cannot be indented (finish() is a no-op the second
+    time). A span with a parent on another thread adds its bytes to the parent
+    when it finishes, so a stage that waits on worker threads reports theirs.
+    """
+
+    def __init__(self, name, category="stage", parent=None):
+        self.name = name
+        self.category = category
+        self.parent = parent
+
+    def start(self):
+        self.thread = threading.current_thread().name
+        self.thread_id = threading.get_ident()
+        self.bytes = 0
+        self.finished = False
+        with _span_lock:
+            self.traced = tracemalloc.is_tracing()
+            self.traced_at_start = _fold_traced_peak()
+            self.peak = self.traced_at_start
+            _open_spans.add(self)
+        self._stack().append(self)
+        self.cpu_started = time.thread_time()
+        self.started = time.perf_counter()
+        return self
+
+    def finish(self, status="ok"):
+        if self.finished:
+            return
+        self.finished = True
+        wall = time.perf_counter() - self.started
+        cpu = time.thread_time() - self.cpu_started
+        stack = self._stack()
+        if self in stack:
+            stack.remove(self)
+        with _span_lock:
+            _fold_traced_peak()
+            _open_spans.discard(self)
+            if self.parent is not None and self.parent.thread_id != self.thread_id:
+                self.parent.bytes += self.bytes
+            _run_spans.append({
+                "name": self.name,
+                "category": self.category,
+                "thread": self.thread,
+                "thread_id": self.thread_id,
+                "start_s": round(self.started - (_run_started or self.started), 4),
+                "wall_s": round(wall, 4),
+                "cpu_s": round(cpu, 4),
+                "bytes": self.bytes,
+                "peak_traced_kb": round((self.peak - self.traced_at_start) / 1024, 1) if self.traced else None,
+                "status": status,
+            })
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish("error" if exc_type else "ok")
+        return False
+
+    @staticmethod
+    def _stack():
+        if not hasattr(_span_local, "stack"):
+            _span_local.stack = []
+        return _span_local.stack
+
+
+def _span_add_bytes(nbytes):
+    """Attribute downloaded bytes to every span open on this thread."""
+    for open_span in getattr(_span_local, "stack", ()):
+        open_span.bytes += nbytes
+
+
+def begin_run():
+    """Start collecting spans for a new cycle (and start tracemalloc if enabled)."""
+    global _run_started, _run_owns_tracemalloc
+    with _span_lock:
+        _run_spans.clear()
+        _run_started = time.perf_counter()
+        if SPAN_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _run_owns_tracemalloc = True
+
+
+def write_run_report(sources=None, output_dir=None):
+    """
+    Write the spans of the current cycle to RUN_REPORT_NAME (and RUN_TRACE_NAME
+    if RUN_TRACE) in output_dir, default the directory of OUTPUT_FILE. sources
+    is the per-source status from run_fetchers. Stops tracemalloc if begin_run
+    started it. Returns the report.
+    """
+    global _run_owns_tracemalloc
+    with _span_lock:
+        spans = sorted(_run_spans, key=lambda s: s["start_s"])
+        wall = time.perf_counter() - (_run_started or time.perf_counter())
+        if _run_owns_tracemalloc:
+            tracemalloc.stop()
+            _run_owns_tracemalloc = False
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "wall_s": round(wall, 4),
+        "process_peak_rss_mb": _peak_rss_mb(),
+        "tracemalloc": SPAN_TRACEMALLOC,
+        "sources": sources or {},
+        "spans": spans,
+    }
+    output_dir = output_dir or os.path.dirname(OUTPUT_FILE) or "."
+    try:
+        _write_atomic(os.path.join(output_dir, RUN_REPORT_NAME), json.dumps(report, indent=2).encode("utf-8"))
+        if RUN_TRACE:
+            events = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in {s["thread_id"]: s["thread"] for s in spans}.items()
+            ]
+            events += [
+                {
+                    "name": s["name"], "cat": s["category"], "ph": "X",
+                    "ts": round(s["start_s"] * 1e6), "dur": round(s["wall_s"] * 1e6),
+                    "pid": os.getpid(), "tid": s["thread_id"],
+                    "args": {k: s[k] for k in ("cpu_s", "bytes", "peak_traced_kb", "status")},
+                }
+                for s in spans
+            ]
+            _write_atomic(
+                os.path.join(output_dir, RUN_TRACE_NAME),
+                json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}).encode("utf-8"),
+            )
+    except OSError as e:
+        print(f"Run report write failed: {e}")
+    return report
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unavailable)."""
     try:
-        response = requests.get(url, **kwargs)
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        return None
+    # ru_maxrss is in bytes on macOS and in KB everywhere else
+    return round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)
+
+
+def print_run_spans():
+    """Print the spans of the current cycle as a table."""
+    with _span_lock:
+        spans = sorted(_run_spans, key=lambda s: s["start_s"])
+    print("\n" + "=" * 50)
+    print("STAGE TIMINGS")
+    print("=" * 50)
+    for s in spans:
+        peak = "" if s["peak_traced_kb"] is None else f"  {s['peak_traced_kb']:9.1f} KB peak"
+        print(
+            f"  {s['name']:<22} {s['wall_s']:7.2f}s wall  {s['cpu_s']:7.2f}s cpu  "
+            f"{s['bytes'] / 1024:8.1f} KB{peak}  {s['status']}"
+        )
+
+
+# =============================================
+# RECORD / REPLAY CASSETTES
+# =============================================
+
+# A cassette holds every make_request response of one update cycle, plus the
+# sources that do not go through it (Selenium busyness, pytrends), so the cycle
+# can be replayed offline. Bump when the file layout changes.
+CASSETTE_VERSION = 1
+
+# The active Cassette while running with --record / --replay, else None
+_cassette = None
+
+
+class Cassette:
+    """
+    Recorded responses keyed by URL (+ query params) and recorded call results
+    keyed by name, served back in recording order. A replay that asks for a key
+    more often than it was recorded keeps getting the last recording.
+    """
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._cursors = {}
+        if mode == "replay":
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{path}: cassette version {data.get('version')}, expected {CASSETTE_VERSION}")
+            self.recorded_at = data["recorded_at"]
+            self.http = data["http"]
+            self.calls = data["calls"]
+        else:
+            self.recorded_at = time.time()
+            self.http = {}
+            self.calls = {}
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    @staticmethod
+    def _key(url, params=None):
+        if params:
+            url += "?" + "&".join(f"{k}={v}" for k, v in sorted(dict(params).items()))
+        return url
+
+    def _next(self, table, key):
+        with self._lock:
+            entries = table.get(key)
+            if not entries:
+                return None
+            i = self._cursors.get((id(table), key), 0)
+            self._cursors[(id(table), key)] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def record_response(self, url, params, response):
+        entry = {
+            "status": response.status_code,
+            "url": response.url,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        with self._lock:
+            self.http.setdefault(self._key(url, params), []).append(entry)
+
+    def replay_response(self, url, params):
+        key = self._key(url, params)
+        entry = self._next(self.http, key)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"no recorded response for {key}")
+        response = requests.models.Response()
+        response.status_code = entry["status"]
+        response.url = entry["url"]
+        response.headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = base64.b64decode(entry["body"])
         return response
-    except requests.exceptions.SSLError:
-        # Retry without SSL verification for corporate proxies
-        print(f"  SSL error, retrying without verification...")
-        kwargs["verify"] = False
-        return requests.get(url, **kwargs)
+
+    def call(self, name, fn, *args, encode=None, decode=None):
+        """Run fn(*args) and record its result, or return the recorded result when replaying."""
+        if self.replaying:
+            entry = self._next(self.calls, name)
+            if entry is None:
+                raise LookupError(f"no recorded result for {name}")
+            value = entry["value"]
+            return decode(value) if decode and value is not None else value
+        result = fn(*args)
+        value = encode(result) if encode and result is not None else result
+        with self._lock:
+            self.calls.setdefault(name, []).append({"value": value})
+        return result
+
+    def save(self):
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "recorded_at": self.recorded_at,
+                "http": self.http,
+                "calls": self.calls,
+            }
+        _write_atomic(self.path, json.dumps(data).encode("utf-8"))
+        print(f"Cassette: {sum(map(len, self.http.values()))} responses, "
+              f"{sum(map(len, self.calls.values()))} calls written to {self.path}")
+
+
+def _cassette_call(name, fn, *args, **codec):
+    """fn(*args), recorded or replayed through the active cassette if there is one."""
+    if _cassette is None:
+        return fn(*args)
+    return _cassette.call(name, fn, *args, **codec)
+
+
+def _cassette_now(tz=None):
+    """The recording time while replaying (so date-dependent logic is reproducible), else None."""
+    if _cassette is None or not _cassette.replaying:
+        return None
+    return datetime.fromtimestamp(_cassette.recorded_at, tz)
+
+
+def _cycle_now():
+    """
+    Wall clock for the values a cycle writes. Under a cassette it is the recording
+    time, so a recorded cycle and every replay of it write identical data.
+    """
+    if _cassette is None:
+        return datetime.now()
+    return datetime.fromtimestamp(_cassette.recorded_at)
+
+
+def _disk_caches_enabled():
+    """Record/replay runs bypass the on-disk caches so every cycle does the full work."""
+    return _cassette is None
+
+
+# =============================================
+# RSS FEED CACHE (conditional GET)
+# =============================================
+
+CACHE_DIR = os.environ.get("AEGIS_CACHE_DIR", ".cache")
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+
+# Bump when the shape of parsed feed items changes; cached items from an older
+# parser are re-derived from the stored body instead of being served as-is.
+FEED_PARSER_VERSION = 1
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+RSS_CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}encoded"
+
+
+def _parse_feed_items(content):
+    """Parse RSS 2.0 / Atom XML into a list of plain (JSON-serialisable) item dicts."""
+    root = ET.fromstring(content)
+
+    # Find all items (works for both RSS 2.0 and Atom)
+    items = root.findall(".//item")
+    if not items:
+        items = root.findall(f".//{ATOM_NS}entry")
+
+    def first_text(item, *tags):
+        for tag in tags:
+            elem = item.find(tag)
+            if elem is not None:
+                return elem.text
+        return None
+
+    return [
+        {
+            "title": first_text(item, "title", f"{ATOM_NS}title"),
+            "description": first_text(item, "description", f"{ATOM_NS}summary"),
+            "content": first_text(item, RSS_CONTENT_NS),
+            "pub_date": first_text(item, "pubDate", f"{ATOM_NS}updated"),
+            "guid": first_text(item, "guid", f"{ATOM_NS}id"),
+        }
+        for item in items
+    ]
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file + rename so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_feed_items(url, **kwargs):
+    """
+    Fetch and parse an RSS/Atom feed, revalidating against the on-disk cache.
+    Sends If-None-Match / If-Modified-Since from the last 200 response; on a 304
+    the previously parsed items are returned without downloading or parsing.
+
+    Returns (items, not_modified), or (None, False) if the feed could not be fetched.
+    """
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    meta_path = os.path.join(HTTP_CACHE_DIR, key + ".json")
+    body_path = os.path.join(HTTP_CACHE_DIR, key + ".xml")
+
+    entry = None
+    if _disk_caches_enabled():
+        try:
+            with open(meta_path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = make_request(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        if entry.get("parser_version") == FEED_PARSER_VERSION:
+            return entry["items"], True
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            body = None
+        if body is not None:
+            entry["items"] = _parse_feed_items(body)
+            entry["parser_version"] = FEED_PARSER_VERSION
+            _write_atomic(meta_path, json.dumps(entry).encode("utf-8"))
+            return entry["items"], True
+        # Validators without a body: refetch unconditionally
+        response = make_request(url, **kwargs)
+
+    if not response.ok:
+        print(f"    Feed fetch failed: HTTP {response.status_code}")
+        return None, False
+
+    items = _parse_feed_items(response.content)
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if (etag or last_modified) and _disk_caches_enabled():
+        try:
+            _write_atomic(body_path, response.content)
+            _write_atomic(
+                meta_path,
+                json.dumps(
+                    {
+                        "url": url,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                        "fetched_at": datetime.now().isoformat(),
+                        "parser_version": FEED_PARSER_VERSION,
+                        "items": items,
+                    }
+                ).encode("utf-8"),
+            )
+        except OSError as e:
+            print(f"    Feed cache write failed: {e}")
+
+    return items, False
+
+
+# =============================================
+# HEADLINE KEYWORD MATCHING
+# =============================================
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over one or more keyword vocabularies. A single pass
+    over a text reports every occurrence of every keyword, so the cost per text
+    stays flat as vocabularies grow. Matching is plain substring matching on the
+    text as given (callers lowercase it, like the `kw in text` checks this
+    replaces); each hit also says whether it falls on word boundaries.
+    """
+
+    def __init__(self, vocabularies):
+        # vocabularies: {category: iterable of keywords}; a keyword may appear in several
+        self.categories = list(vocabularies)
+        self._order = {}
+        goto, fail, out = [{}], [0], [[]]
+        for category, keywords in vocabularies.items():
+            for keyword in keywords:
+                self._order.setdefault((category, keyword), len(self._order))
+                node = 0
+                for ch in keyword:
+                    if ch not in goto[node]:
+                        goto[node][ch] = len(goto)
+                        goto.append({})
+                        fail.append(0)
+                        out.append([])
+                    node = goto[node][ch]
+                out[node].append((category, keyword))
+
+        # Breadth-first: failure links folded into a full transition table, so
+        # scanning is one dict lookup per character.
+        delta = [None] * len(goto)
+        delta[0] = goto[0]
+        queue = list(goto[0].values())
+        for node in queue:
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            for ch, child in goto[node].items():
+                fail[child] = delta[fail[node]].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]
+                queue.append(child)
+        self._delta = delta
+        self._out = out
+
+    def hits(self, text):
+        """[(category, keyword, start, end, whole_word)] for every occurrence, in text order."""
+        found = []
+        delta, out = self._delta, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            node = delta[node].get(ch, 0)
+            if out[node]:
+                end = i + 1
+                for category, keyword in out[node]:
+                    start = end - len(keyword)
+                    whole_word = (start == 0 or not text[start - 1].isalnum()) and (
+                        end == len(text) or not text[end].isalnum()
+                    )
+                    found.append((category, keyword, start, end, whole_word))
+        return found
+
+    def scan(self, text, whole_words=False):
+        """{category: [distinct keywords found]}, each list in vocabulary order."""
+        found = {category: set() for category in self.categories}
+        for category, keyword, _, _, whole_word in self.hits(text):
+            if whole_word or not whole_words:
+                found[category].add(keyword)
+        return {
+            category: sorted(keywords, key=lambda k: self._order[(category, k)])
+            for category, keywords in found.items()
+        }
+
+
+# Iran relevance filter and alert terms for news headlines
+IRAN_NEWS_TERMS = ["iran", "tehran", "persian gulf", "strait of hormuz"]
+ALERT_KEYWORDS = [
+    "strike",
+    "attack",
+    "military",
+    "bomb",
+    "missile",
+    "war",
+    "imminent",
+    "troops",
+    "forces",
+]
+NEWS_MATCHER = KeywordMatcher({"iran": IRAN_NEWS_TERMS, "alert": ALERT_KEYWORDS})
+
+# Polymarket market selection
+POLYMARKET_TARGET_EVENTS = ["will us or israel strike iran", "us strikes iran by"]
+POLYMARKET_STRIKE_KEYWORDS = ["strike", "attack", "bomb", "military action"]
+POLYMARKET_NEGATIONS = [" not ", "won't", "will not", "doesn't", "does not"]
+POLYMARKET_MATCHER = KeywordMatcher({
+    "target": POLYMARKET_TARGET_EVENTS,
+    "iran": ["iran"],
+    "strike": POLYMARKET_STRIKE_KEYWORDS,
+    "negation": POLYMARKET_NEGATIONS,
+})
 
 
 PIZZA_PLACES = [
@@ -58,24 +727,23 @@ PIZZA_PLACES = [
 OUTPUT_FILE = "frontend/data.json"
 
 
-def _scrape_live_busyness_batch(places):
-    """
-    Scrape live busyness from Google Maps using Selenium headless Chrome.
-    Opens each place's Google Maps short URL and reads the "Currently X% busy,
-    usually Y% busy" aria-label from the popular-times bar chart.
+# Headless Chrome is expensive to start; the daemon keeps one driver alive
+# across cycles, while one-shot runs quit it after each batch.
+KEEP_BROWSER_WARM = False
+_chrome_driver = None
+_chrome_lock = threading.Lock()
 
-    Returns dict of {place_name: {"current": int, "usual": int}} for places
-    with live data. Places that are closed or have no live reading are omitted.
-    """
+
+def _new_chrome_driver():
+    """Start a headless Chrome driver, or return None if selenium/Chrome is unavailable."""
     import uuid
 
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.common.by import By
     except ImportError:
         print("  selenium not installed, skipping live scrape")
-        return {}
+        return None
 
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
@@ -94,7 +762,6 @@ def _scrape_live_busyness_batch(places):
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
-    results = {}
     try:
         driver = webdriver.Chrome(options=chrome_options)
         driver.execute_cdp_cmd(
@@ -103,349 +770,1282 @@ def _scrape_live_busyness_batch(places):
         )
     except Exception as e:
         print(f"  Chrome driver init failed: {e}")
-        return {}
+        return None
+    return driver
 
-    try:
-        for place in places:
-            name = place["name"]
-            url = place["url"]
-            print(f"    {name}...", end=" ", flush=True)
-            try:
-                driver.get(url)
-                time.sleep(8)
-
-                found = False
-                all_aria = driver.find_elements(By.XPATH, "//*[@aria-label]")
-                for el in all_aria:
-                    label = el.get_attribute("aria-label") or ""
-                    m = re.search(r"Currently\s+(\d+)%.*usually\s+(\d+)%", label)
-                    if m:
-                        results[name] = {"current": int(m.group(1)), "usual": int(m.group(2))}
-                        print(f"{m.group(1)}% (usually {m.group(2)}%)")
-                        found = True
-                        break
-                    m = re.search(r"כרגע תפוסה של %(\d+).*תפוסה של %(\d+)", label)
-                    if m:
-                        results[name] = {"current": int(m.group(1)), "usual": int(m.group(2))}
-                        print(f"{m.group(1)}% (usually {m.group(2)}%)")
-                        found = True
-                        break
-                if not found:
-                    print("no live data")
-            except Exception as e:
-                print(f"error ({e})")
-    finally:
+
+def _acquire_chrome_driver():
+    """Return the warm driver if it is still responsive, otherwise start a new one. Caller holds _chrome_lock."""
+    global _chrome_driver
+    if _chrome_driver is not None:
+        try:
+            _chrome_driver.current_url
+            return _chrome_driver
+        except Exception:
+            print("  Warm Chrome driver is unresponsive, restarting")
+            _close_chrome_driver()
+    _chrome_driver = _new_chrome_driver()
+    return _chrome_driver
+
+
+def _close_chrome_driver():
+    """Quit the Chrome driver (if any) and reap leftover headless processes."""
+    global _chrome_driver
+    if _chrome_driver is not None:
         try:
-            driver.quit()
+            _chrome_driver.quit()
         except Exception:
             pass
-        import subprocess
-        subprocess.run(["pkill", "-f", "chromium.*--headless"], capture_output=True)
+        _chrome_driver = None
+    import subprocess
+    subprocess.run(["pkill", "-f", "chromium.*--headless"], capture_output=True)
+
+
+def _scrape_live_busyness_batch(places):
+    """
+    Scrape live busyness from Google Maps using Selenium headless Chrome.
+    Opens each place's Google Maps short URL and reads the "Currently X% busy,
+    usually Y% busy" aria-label from the popular-times bar chart.
+
+    Returns dict of {place_name: {"current": int, "usual": int}} for places
+    with live data. Places that are closed or have no live reading are omitted.
+    """
+    results = {}
+    with _chrome_lock:
+        driver = _acquire_chrome_driver()
+        if driver is None:
+            return {}
+        from selenium.webdriver.common.by import By
+
+        try:
+            for place in places:
+                name = place["name"]
+                url = place["url"]
+                print(f"    {name}...", end=" ", flush=True)
+                try:
+                    driver.get(url)
+                    time.sleep(8)
+
+                    found = False
+                    all_aria = driver.find_elements(By.XPATH, "//*[@aria-label]")
+                    for el in all_aria:
+                        label = el.get_attribute("aria-label") or ""
+                        m = re.search(r"Currently\s+(\d+)%.*usually\s+(\d+)%", label)
+                        if m:
+                            results[name] = {"current": int(m.group(1)), "usual": int(m.group(2))}
+                            print(f"{m.group(1)}% (usually {m.group(2)}%)")
+                            found = True
+                            break
+                        m = re.search(r"כרגע תפוסה של %(\d+).*תפוסה של %(\d+)", label)
+                        if m:
+                            results[name] = {"current": int(m.group(1)), "usual": int(m.group(2))}
+                            print(f"{m.group(1)}% (usually {m.group(2)}%)")
+                            found = True
+                            break
+                    if not found:
+                        print("no live data")
+                except Exception as e:
+                    print(f"error ({e})")
+        finally:
+            if not KEEP_BROWSER_WARM:
+                _close_chrome_driver()
+
+    return results
+
+
+def _pentagon_eastern_time():
+    """Return current time in US Eastern (Pentagon local), accounting for DST."""
+    from datetime import timezone
+
+    utc_now = _cassette_now(timezone.utc) or datetime.now(timezone.utc)
+    # US Eastern: UTC-5, EDT: UTC-4. Approximate DST (Mar second Sun – Nov first Sun).
+    month = utc_now.month
+    is_dst = 3 < month < 11 or (
+        month == 3 and utc_now.day >= 8
+    ) or (
+        month == 11 and utc_now.day < 1
+    )
+    offset = timedelta(hours=-4 if is_dst else -5)
+    return utc_now + offset
+
+
+POLYMARKET_NEAR_TERM_DAYS = 7
+_MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+_MONTH_DAY_RE = re.compile("(" + "|".join(_MONTH_NAMES) + r")\s+(\d{1,2})")
+
+
+def _polymarket_market_odds(market):
+    """Extract YES odds (0-99) from a market using multiple methods."""
+    odds = 0
+
+    # Method 1: outcomePrices (most common) - this is the YES price
+    prices = market.get("outcomePrices", [])
+    if prices and len(prices) > 0:
+        try:
+            # First price is YES, second is NO
+            yes_price_str = str(prices[0]) if prices[0] else "0"
+            yes_price = float(yes_price_str)
+
+            # Handle different formats: 0.5 (50%) or 50 (50%)
+            if yes_price > 1:
+                # Already in percentage format
+                odds = round(yes_price)
+            elif 0 < yes_price <= 1:
+                # Decimal format (0-1)
+                odds = round(yes_price * 100)
+
+            # Additional check: if we got exactly 100, might be parsing the NO price
+            # In that case, try the second element
+            if odds >= 100 and len(prices) > 1:
+                no_price = float(str(prices[1])) if prices[1] else 0
+                if 0 < no_price < 1:
+                    odds = round((1 - no_price) * 100)
+                elif no_price > 1:
+                    odds = 100 - round(no_price)
+
+        except (ValueError, TypeError):
+            pass
+
+    # Method 2: bestAsk, then Method 3: lastTradePrice
+    for field in ("bestAsk", "lastTradePrice"):
+        if odds == 0 or odds >= 100:
+            try:
+                price = float(market.get(field, 0) or 0)
+                if price > 1:
+                    odds = round(price)
+                elif 0 < price <= 1:
+                    odds = round(price * 100)
+            except (ValueError, TypeError):
+                pass
+
+    # Safety: Cap odds at 95% (if still 100%, likely bad data)
+    if odds >= 100:
+        return 0
+
+    return odds
+
+
+def _is_near_term_market(title, now):
+    """True if the title names a month/day within POLYMARKET_NEAR_TERM_DAYS of now."""
+    week_ahead = now + timedelta(days=POLYMARKET_NEAR_TERM_DAYS)
+    title_lower = title.lower()
+
+    # Look for date patterns like "by January 27" or "January 27, 2026"; the
+    # first day after each month name counts, in calendar order
+    first_day = {}
+    for month, day in _MONTH_DAY_RE.findall(title_lower):
+        first_day.setdefault(month, int(day))
+    for month in _MONTH_NAMES:
+        if month not in first_day:
+            continue
+        try:
+            # Assume current year if not specified; if the date is past, try next year
+            market_date = datetime(now.year, _MONTH_NAMES.index(month) + 1, first_day[month])
+            if market_date < now:
+                market_date = datetime(now.year + 1, _MONTH_NAMES.index(month) + 1, first_day[month])
+        except ValueError:
+            continue
+        if now <= market_date <= week_ahead:
+            return True
+    return False
+
+
+def _scan_polymarket_events(events, now=None):
+    """
+    Pick the highest-odds near-term Iran strike market from Polymarket search results.
+    Pure function of its inputs (now defaults to the current time).
+    Returns (odds, market_title); odds is 0 if nothing qualified.
+    """
+    now = now or datetime.now()
+    highest_odds = 0
+    market_title = ""
+
+    # First pass: Look for the specific "Will US or Israel strike Iran" market
+    for event in events:
+        event_title = (event.get("title") or "").lower()
+
+        # Look for the positive bet version (not negatives like "will not strike")
+        if POLYMARKET_MATCHER.scan(event_title)["target"]:
+            # Check if it's a near-term market (within 7 days)
+            if not _is_near_term_market(event.get("title", ""), now):
+                continue
+
+            for market in event.get("markets", []):
+                market_name = market.get("question") or event.get("title") or ""
+                odds = _polymarket_market_odds(market)
+                if odds > highest_odds:
+                    highest_odds = odds
+                    market_title = market_name
+
+        # Also check individual market questions (sometimes event title is generic)
+        for market in event.get("markets", []):
+            terms = POLYMARKET_MATCHER.scan((market.get("question") or "").lower())
+
+            # Skip negative questions (containing "not", "won't", etc.)
+            if terms["negation"]:
+                continue
+
+            if terms["iran"] and terms["strike"]:
+                market_name = market.get("question") or ""
+                if not _is_near_term_market(market_name, now):
+                    continue
+
+                odds = _polymarket_market_odds(market)
+                if odds > 0 and odds > highest_odds:
+                    highest_odds = odds
+                    market_title = market_name
+
+    # Second pass: If no strike markets, look for any Iran-related market (excluding negatives)
+    if highest_odds == 0:
+        for event in events:
+            terms = POLYMARKET_MATCHER.scan((event.get("title") or "").lower())
+            if terms["negation"] or not terms["iran"]:
+                continue
+            if not _is_near_term_market(event.get("title", ""), now):
+                continue
+
+            for market in event.get("markets", []):
+                # Skip negative questions
+                if POLYMARKET_MATCHER.scan((market.get("question") or "").lower())["negation"]:
+                    continue
+
+                market_name = market.get("question") or event.get("title") or ""
+                if not _is_near_term_market(market_name, now):
+                    continue
+
+                odds = _polymarket_market_odds(market)
+                if odds > 0 and odds > highest_odds:
+                    highest_odds = odds
+                    market_title = market_name
+
+    return highest_odds, market_title
+
+
+def fetch_polymarket_odds():
+    """Fetch Iran strike odds from Polymarket Gamma API"""
+    try:
+        print("\n" + "=" * 50)
+        print("POLYMARKET ODDS")
+        print("=" * 50)
+
+        # Try the events endpoint with higher limit
+        response = make_request(
+            "https://gamma-api.polymarket.com/public-search?q=iran",
+            timeout=20,
+        )
+
+        if response.status_code != 200:
+            print(f"Polymarket API error: {response.status_code}")
+            return None
+
+        data = response.json()
+
+        # Handle different response formats
+        if isinstance(data, dict) and data.get("events"):
+            events = data["events"]
+        elif isinstance(data, dict) and data.get("data"):
+            events = data["data"]
+        elif isinstance(data, list):
+            events = data
+        else:
+            print(
+                f"Unexpected Polymarket response format: {type(data)}, keys: {data.keys() if isinstance(data, dict) else 'N/A'}"
+            )
+            return None
+
+        # Filter out non-dict items (ensure all events are dictionaries)
+        events = [e for e in events if isinstance(e, dict)]
+
+        print(f"Scanning {len(events)} events...")
+        highest_odds, market_title = _scan_polymarket_events(events, _cassette_now())
+
+        if highest_odds > 0:
+            print(
+                f"Market: {market_title[:70]}..."
+                if len(market_title) > 70
+                else f"Market: {market_title}"
+            )
+        print(f"✓ Result: Risk {highest_odds}%")
+
+        return {
+            "odds": highest_odds,
+            "market": market_title,
+            "timestamp": _cycle_now().isoformat(),
+        }
+
+    except Exception as e:
+        print(f"Polymarket fetch error: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return None
+
+
+ESCALATION_MODEL = "MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli"
+ESCALATION_LABELS = [
+    "military escalation",
+    "diplomatic negotiation",
+    "routine operations",
+    "economic sanctions",
+    "unrelated",
+]
+
+ESCALATION_HYPOTHESIS = "This example is {}."
+
+# "torch" runs the model in PyTorch; "onnx" runs a dynamically int8-quantized
+# ONNX export of the same model through ONNX Runtime.
+ESCALATION_BACKEND = os.environ.get("ESCALATION_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "onnx", ESCALATION_MODEL.replace("/", "--"))
+# Intra-op threads for ONNX Runtime; 0 means the CPUs this process may run on,
+# which (unlike ORT's own default) respects container CPU affinity limits.
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ORT_INTRA_OP_THREADS", "0"))
+# Max absolute difference in escalation score allowed between the quantized ONNX
+# model and the PyTorch pipeline on ONNX_CALIBRATION_HEADLINES. A build outside
+# this tolerance is rejected and the torch backend is used instead.
+ONNX_SCORE_TOLERANCE = 0.03
+ONNX_CALIBRATION_HEADLINES = [
+    "US carrier strike group ordered to the Middle East as Iran tensions rise",
+    "Iran and US resume nuclear talks in Oman",
+    "Iranian navy holds routine drills in the Gulf of Oman",
+    "EU adds Iranian officials to sanctions list",
+    "Tehran hosts international book fair",
+    "Israel strikes targets near Tehran, Iran vows retaliation",
+    "Oil prices climb after tanker seized in Strait of Hormuz",
+    "Iran's president meets Saudi foreign minister",
+]
+# Batching for the NLI scorer: premise/hypothesis pairs are sorted by token
+# length and packed into forward calls of at most this many padded tokens.
+NLI_MAX_BATCH_TOKENS = 8192
+NLI_MAX_LENGTH = 512
+# Batch size for the stock transformers pipeline (used only as a benchmark baseline)
+PIPELINE_BATCH_SIZE = 8
+
+# "full" scores every headline with ESCALATION_MODEL. "cascade" first runs the alert
+# keyword check and a small distilled NLI model: headlines that are clearly routine
+# (no alert keyword, low score) or clearly escalatory (alert keyword, high score)
+# keep the small model's score, and only the band in between reaches ESCALATION_MODEL.
+ESCALATION_MODE = os.environ.get("ESCALATION_MODE", "full").lower()
+CASCADE_MODEL = "MoritzLaurer/xtremedistil-l6-h256-zeroshot-v1.1-all-33"
+CASCADE_ROUTINE_BELOW = 0.15
+CASCADE_ESCALATORY_ABOVE = 0.85
+
+_escalation_scorer = None
+_cascade_scorer = None
+_classifier_lock = threading.Lock()
+# Backend the full model actually loaded with ("onnx" or "torch"): set when it loads
+# here, or from the stats the inference worker returns. None until the first load.
+_escalation_backend = None
+
+
+def _escalation_model_id(backend=None):
+    """
+    Model identity used in the score cache; quantized and cascaded scores are
+    cached separately from full-precision, full-model scores. The backend is the
+    one that actually loaded (ONNX falls back to torch), else the configured one.
+    """
+    backend = backend or _escalation_backend or ESCALATION_BACKEND
+    model_id = ESCALATION_MODEL
+    if backend == "onnx":
+        model_id = f"{ESCALATION_MODEL}+onnx-int8"
+    if ESCALATION_MODE == "cascade":
+        model_id = f"cascade({CASCADE_MODEL},{CASCADE_ROUTINE_BELOW},{CASCADE_ESCALATORY_ABOVE})>{model_id}"
+    return model_id
+
+
+def _pair_layout(tokenizer, premise, hypothesis, premise_ids, hypothesis_ids):
+    """
+    Work out how the tokenizer wraps a (premise, hypothesis) pair in special tokens
+    by locating the bare token ids inside one encoded pair. Returns a function
+    (premise_ids, hypothesis_ids, max_length) -> (input_ids, token_type_ids), or
+    None if the layout cannot be recovered.
+    """
+    encoded = tokenizer(premise, hypothesis)
+    ids = list(encoded["input_ids"])
+    types = list(encoded.get("token_type_ids") or [0] * len(ids))
+    lp, lh = len(premise_ids), len(hypothesis_ids)
+    if not lp or not lh:
+        return None
+
+    for i in range(len(ids) - lp + 1):
+        if ids[i:i + lp] != premise_ids:
+            continue
+        for j in range(i + lp, len(ids) - lh + 1):
+            if ids[j:j + lh] != hypothesis_ids:
+                continue
+            prefix, middle, suffix = ids[:i], ids[i + lp:j], ids[j + lh:]
+            prefix_t, middle_t, suffix_t = types[:i], types[i + lp:j], types[j + lh:]
+            premise_t, hypothesis_t = types[i], types[j]
+            overhead = len(prefix) + len(middle) + len(suffix)
+
+            def assemble(p_ids, h_ids, max_length):
+                # truncation="only_first": trim the headline, never the hypothesis
+                p_ids = p_ids[: max(0, max_length - overhead - len(h_ids))]
+                return (
+                    prefix + p_ids + middle + h_ids + suffix,
+                    prefix_t + [premise_t] * len(p_ids) + middle_t + [hypothesis_t] * len(h_ids) + suffix_t,
+                )
+
+            return assemble
+    return None
+
+
+def _nli_escalation_scores(titles, tokenizer, forward, entailment_id):
+    """
+    Zero-shot "military escalation" score per title, computed like the transformers
+    zero-shot pipeline: softmax over the entailment logits of each
+    (title, "This example is {label}.") pair across ESCALATION_LABELS.
+
+    Each headline and each hypothesis is tokenized once and the pairs are assembled
+    from those ids. All pairs are sorted by length and packed into forward calls of
+    up to NLI_MAX_BATCH_TOKENS padded tokens, each padded only to its longest pair.
+    forward maps a dict of (batch, width) int64 numpy inputs to a (batch, 3) logits array.
+    """
+    import numpy as np
+
+    if not titles:
+        return []
+    hypotheses = [ESCALATION_HYPOTHESIS.format(label) for label in ESCALATION_LABELS]
+    target = ESCALATION_LABELS.index("military escalation")
+    max_length = min(NLI_MAX_LENGTH, tokenizer.model_max_length or NLI_MAX_LENGTH)
+
+    premise_ids = [list(ids) for ids in tokenizer(titles, add_special_tokens=False)["input_ids"]]
+    hypothesis_ids = [list(ids) for ids in tokenizer(hypotheses, add_special_tokens=False)["input_ids"]]
+    assemble = _pair_layout(tokenizer, titles[0], hypotheses[0], premise_ids[0], hypothesis_ids[0])
+
+    pairs = []
+    for title, p_ids in zip(titles, premise_ids):
+        for hypothesis, h_ids in zip(hypotheses, hypothesis_ids):
+            if assemble is not None:
+                pairs.append(assemble(p_ids, h_ids, max_length))
+            else:
+                encoded = tokenizer(title, hypothesis, truncation="only_first", max_length=max_length)
+                ids = list(encoded["input_ids"])
+                pairs.append((ids, list(encoded.get("token_type_ids") or [0] * len(ids))))
+
+    order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]))
+    use_types = "token_type_ids" in tokenizer.model_input_names
+    pad_id = tokenizer.pad_token_id or 0
+    logits = None
+
+    start = 0
+    while start < len(order):
+        # Ascending lengths: the last pair added sets the padded width
+        end = start + 1
+        while end < len(order) and (end - start + 1) * len(pairs[order[end]][0]) <= NLI_MAX_BATCH_TOKENS:
+            end += 1
+        batch = order[start:end]
+        width = len(pairs[batch[-1]][0])
+
+        input_ids = np.full((len(batch), width), pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(batch), width), dtype=np.int64)
+        token_type_ids = np.zeros((len(batch), width), dtype=np.int64)
+        for row, idx in enumerate(batch):
+            ids, types = pairs[idx]
+            input_ids[row, : len(ids)] = ids
+            attention_mask[row, : len(ids)] = 1
+            token_type_ids[row, : len(types)] = types
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if use_types:
+            inputs["token_type_ids"] = token_type_ids
+        out = np.asarray(forward(inputs), dtype=np.float64)
+        if logits is None:
+            logits = np.empty((len(pairs), out.shape[1]), dtype=np.float64)
+        logits[batch] = out
+        start = end
+
+    entail = logits[:, entailment_id].reshape(len(titles), len(hypotheses))
+    entail = np.exp(entail - entail.max(axis=1, keepdims=True))
+    probs = entail / entail.sum(axis=1, keepdims=True)
+    return [float(p) for p in probs[:, target]]
+
+
+def _entailment_id(config):
+    """Index of the entailment logit, found the way the zero-shot pipeline does."""
+    for label, idx in config.label2id.items():
+        if label.lower().startswith("entail"):
+            return idx
+    return -1
+
+
+# =============================================
+# MODEL BUNDLES
+# =============================================
+
+# Local safetensors copies of the classifier models, built by --build-bundle.
+# Loading from a bundle needs no network and memory-maps the weights, so
+# concurrent processes share one copy in the page cache. Each build lands in its
+# own read-only <model>@<revision>-<time> directory and <model> is a symlink swapped
+# atomically to the newest one.
+MODEL_BUNDLE_ROOT = os.path.join(CACHE_DIR, "models")
+# Hub revision (branch, tag or commit) per model; each pins independently, since
+# a commit of one model repo does not exist in the other.
+MODEL_REVISIONS = {
+    ESCALATION_MODEL: os.environ.get("ESCALATION_MODEL_REVISION", "main"),
+    CASCADE_MODEL: os.environ.get("CASCADE_MODEL_REVISION", "main"),
+}
+USE_MODEL_BUNDLE = os.environ.get("MODEL_BUNDLE", "1") != "0"
+
+
+def _model_bundle_dir(model_name):
+    return os.path.join(MODEL_BUNDLE_ROOT, model_name.strip("/").replace("/", "--"))
+
+
+def _model_revision(model_name):
+    return MODEL_REVISIONS.get(model_name, "main")
+
+
+def _bundle_manifest(model_name):
+    """Manifest of model_name's bundle if one was built for its MODEL_REVISIONS entry, else None."""
+    try:
+        with open(os.path.join(_model_bundle_dir(model_name), "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if _model_revision(model_name) not in (manifest.get("requested_revision"), manifest.get("revision")):
+        return None
+    return manifest
+
+
+def _model_source(model_name):
+    """(path, from_pretrained kwargs) for model_name: its bundle if one is built, else the hub."""
+    if USE_MODEL_BUNDLE and _bundle_manifest(model_name) is not None:
+        return _model_bundle_dir(model_name), {"local_files_only": True, "low_cpu_mem_usage": True}
+    return model_name, {"revision": _model_revision(model_name)}
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _memory_mb():
+    """Resident memory of this process split into anonymous and file-backed (shareable) MB."""
+    usage = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    usage[key] = round(int(value.split()[0]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return {"rss_mb": usage.get("VmRSS"), "rss_anon_mb": usage.get("RssAnon"), "rss_file_mb": usage.get("RssFile")}
+
+
+def build_model_bundle(model_name=None, force=False):
+    """
+    Materialize model_name (default ESCALATION_MODEL) at its MODEL_REVISIONS entry
+    and its tokenizer as a read-only safetensors bundle. Returns the manifest.
+    A bundle built for another revision is replaced.
+    """
+    import shutil
+
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model_name = model_name or ESCALATION_MODEL
+    requested = _model_revision(model_name)
+    link = _model_bundle_dir(model_name)
+    manifest = _bundle_manifest(model_name)
+    if manifest is not None and not force:
+        print(f"  Bundle for {model_name}@{manifest['revision'][:12]} already built: {link}")
+        return manifest
+
+    os.makedirs(MODEL_BUNDLE_ROOT, exist_ok=True)
+    tmp_dir = f"{link}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"  Materializing {model_name}@{requested}...")
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=requested)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=requested)
+    model.save_pretrained(tmp_dir, safe_serialization=True)
+    tokenizer.save_pretrained(tmp_dir)
+
+    revision = getattr(model.config, "_commit_hash", None) or requested
+    manifest = {
+        "model": model_name,
+        "revision": revision,
+        "requested_revision": requested,
+        "files": {
+            name: {"bytes": os.path.getsize(os.path.join(tmp_dir, name)), "sha256": _sha256_file(os.path.join(tmp_dir, name))}
+            for name in sorted(os.listdir(tmp_dir))
+        },
+        "built_at": datetime.now().isoformat(),
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    for name in os.listdir(tmp_dir):
+        os.chmod(os.path.join(tmp_dir, name), 0o444)
+    os.chmod(tmp_dir, 0o555)
+
+    # Publish: rename the finished directory into place, then swap the symlink.
+    # Readers see either the previous bundle or this one, never a partial copy.
+    target = f"{link}@{re.sub(r'[^A-Za-z0-9_.-]', '_', revision)[:12]}-{datetime.now():%Y%m%d%H%M%S%f}"
+    previous = os.path.realpath(link) if os.path.islink(link) else None
+    os.rename(tmp_dir, target)
+    tmp_link = f"{link}.link-{os.getpid()}"
+    os.symlink(os.path.basename(target), tmp_link)
+    os.replace(tmp_link, link)
+    if previous and previous != os.path.realpath(target) and os.path.isdir(previous):
+        # Processes that already mapped the old weights keep them until they exit
+        os.chmod(previous, 0o755)
+        shutil.rmtree(previous)
+
+    size_mb = sum(f["bytes"] for f in manifest["files"].values()) / 2**20
+    print(f"  Bundle written: {link} -> {os.path.basename(target)} ({size_mb:.0f} MB)")
+    return manifest
+
+
+COLD_START_PROBE = """
+import json, time
+started = time.perf_counter()
+import update_data
+score = update_data._load_torch_scorer({model!r})
+score({headlines!r})
+print(json.dumps({{"seconds": round(time.perf_counter() - started, 2), **update_data._memory_mb()}}))
+"""
+
+
+def measure_cold_start(model_name=None):
+    """
+    Time-to-first-prediction and memory of a fresh process loading model_name
+    from the hub cache and from its bundle. Returns {source: measurements}.
+    """
+    import subprocess
 
+    model_name = model_name or ESCALATION_MODEL
+    probe = COLD_START_PROBE.format(model=model_name, headlines=ONNX_CALIBRATION_HEADLINES[:1])
+    results = {}
+    for source, bundle in (("hub cache", "0"), ("bundle", "1")):
+        out = subprocess.run(
+            [sys.executable, "-c", probe],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, "MODEL_BUNDLE": bundle},
+        )
+        if out.returncode != 0:
+            print(f"  {source:<10} failed: {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else out.returncode}")
+            continue
+        results[source] = json.loads(out.stdout.strip().splitlines()[-1])
+        r = results[source]
+        print(
+            f"  {source:<10} first prediction after {r['seconds']:.2f}s, RSS {r['rss_mb']} MB "
+            f"({r['rss_anon_mb']} MB private, {r['rss_file_mb']} MB file-backed/shareable)"
+        )
     return results
 
 
-def _pentagon_eastern_time():
-    """Return current time in US Eastern (Pentagon local), accounting for DST."""
-    from datetime import timezone
+def _load_pipeline_scorer():
+    """Stock transformers zero-shot pipeline on CPU. Returns titles -> escalation scores."""
+    from transformers import pipeline as hf_pipeline
 
-    utc_now = datetime.now(timezone.utc)
-    # US Eastern: UTC-5, EDT: UTC-4. Approximate DST (Mar second Sun – Nov first Sun).
-    month = utc_now.month
-    is_dst = 3 < month < 11 or (
-        month == 3 and utc_now.day >= 8
-    ) or (
-        month == 11 and utc_now.day < 1
+    classifier = hf_pipeline(
+        "zero-shot-classification",
+        model=ESCALATION_MODEL,
+        device=-1,
     )
-    offset = timedelta(hours=-4 if is_dst else -5)
-    return utc_now + offset
 
+    def score(titles):
+        results = classifier(titles, candidate_labels=ESCALATION_LABELS, batch_size=PIPELINE_BATCH_SIZE)
+        if isinstance(results, dict):
+            results = [results]
+        scores = []
+        for result in results:
+            score_map = {l: s for l, s in zip(result["labels"], result["scores"])}
+            scores.append(score_map.get("military escalation", 0.0))
+        return scores
 
-def fetch_polymarket_odds():
-    """Fetch Iran strike odds from Polymarket Gamma API"""
-    try:
-        print("\n" + "=" * 50)
-        print("POLYMARKET ODDS")
-        print("=" * 50)
+    return score
 
-        # Search for "US strikes Iran" specifically (the exact market we want)
-        strike_keywords = ["strike", "attack", "bomb", "military action"]
 
-        # Try the events endpoint with higher limit
-        response = make_request(
-            "https://gamma-api.polymarket.com/public-search?q=iran",
-            timeout=20,
-        )
+def _load_torch_scorer(model_name=None):
+    """
+    Length-bucketed NLI scorer on PyTorch (CPU) for model_name (default
+    ESCALATION_MODEL), loaded from its bundle when one is built.
+    Returns titles -> escalation scores.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
-        if response.status_code != 200:
-            print(f"Polymarket API error: {response.status_code}")
-            return None
+    source, kwargs = _model_source(model_name or ESCALATION_MODEL)
+    tokenizer = AutoTokenizer.from_pretrained(source, **kwargs)
+    model = AutoModelForSequenceClassification.from_pretrained(source, **kwargs).eval()
+    entailment_id = _entailment_id(model.config)
 
-        data = response.json()
+    def forward(inputs):
+        with torch.inference_mode():
+            tensors = {k: torch.from_numpy(v) for k, v in inputs.items()}
+            return model(**tensors).logits.float().numpy()
 
-        # Handle different response formats
-        if isinstance(data, dict) and data.get("events"):
-            events = data["events"]
-        elif isinstance(data, dict) and data.get("data"):
-            events = data["data"]
-        elif isinstance(data, list):
-            events = data
-        else:
-            print(
-                f"Unexpected Polymarket response format: {type(data)}, keys: {data.keys() if isinstance(data, dict) else 'N/A'}"
-            )
-            return None
+    def score(titles):
+        return _nli_escalation_scores(titles, tokenizer, forward, entailment_id)
 
-        # Filter out non-dict items (ensure all events are dictionaries)
-        events = [e for e in events if isinstance(e, dict)]
+    return score
 
-        highest_odds = 0
-        market_title = ""
 
-        print(f"Scanning {len(events)} events...")
+def benchmark_escalation_scorers(titles=None, repeats=3):
+    """
+    Micro-benchmark: premise/hypothesis pairs per second for the stock zero-shot
+    pipeline vs the length-bucketed scorer (PyTorch, and ONNX if it is built).
+    Uses headlines from the current data file when available.
+    """
+    if titles is None:
+        try:
+            with open(OUTPUT_FILE, "r") as f:
+                articles = json.load(f).get("news", {}).get("raw_data", {}).get("articles", [])
+            titles = [a["title"] for a in articles if a.get("title")]
+        except (OSError, ValueError):
+            titles = []
+        if len(titles) < 16:
+            titles = titles + ONNX_CALIBRATION_HEADLINES * 4
+    pairs = len(titles) * len(ESCALATION_LABELS)
+
+    scorers = [("pipeline", _load_pipeline_scorer), ("bucketed-torch", _load_torch_scorer)]
+    if os.path.exists(os.path.join(ONNX_MODEL_DIR, "model.int8.onnx")):
+        scorers.append(("bucketed-onnx", _load_onnx_scorer))
+
+    print(f"Benchmarking {len(titles)} headlines x {len(ESCALATION_LABELS)} labels = {pairs} pairs")
+    results = {}
+    reference = None
+    for name, load in scorers:
+        scorer = load()
+        scores = scorer(titles)  # warm-up
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            scorer(titles)
+            best = min(best, time.perf_counter() - started)
+        if reference is None:
+            reference = scores
+        max_diff = max(abs(a - b) for a, b in zip(scores, reference))
+        results[name] = {"pairs_per_sec": round(pairs / best, 1), "seconds": round(best, 3), "max_abs_diff": round(max_diff, 4)}
+        print(f"  {name:<15} {pairs / best:9.1f} pairs/sec  ({best:.3f}s, max |diff| vs pipeline {max_diff:.4f})")
+    return results
 
-        def get_market_odds(market):
-            """Extract odds from a market using multiple methods"""
-            odds = 0
 
-            # Method 1: outcomePrices (most common) - this is the YES price
-            prices = market.get("outcomePrices", [])
-            if prices and len(prices) > 0:
-                try:
-                    # First price is YES, second is NO
-                    yes_price_str = str(prices[0]) if prices[0] else "0"
-                    yes_price = float(yes_price_str)
-
-                    # Handle different formats: 0.5 (50%) or 50 (50%)
-                    if yes_price > 1:
-                        # Already in percentage format
-                        odds = round(yes_price)
-                    elif 0 < yes_price <= 1:
-                        # Decimal format (0-1)
-                        odds = round(yes_price * 100)
-
-                    # Additional check: if we got exactly 100, might be parsing the NO price
-                    # In that case, try the second element
-                    if odds >= 100 and len(prices) > 1:
-                        no_price = float(str(prices[1])) if prices[1] else 0
-                        if 0 < no_price < 1:
-                            odds = round((1 - no_price) * 100)
-                        elif no_price > 1:
-                            odds = 100 - round(no_price)
-
-                except (ValueError, TypeError):
-                    pass
-
-            # Method 2: bestAsk
-            if odds == 0 or odds >= 100:
-                try:
-                    best_ask = float(market.get("bestAsk", 0) or 0)
-                    if best_ask > 1:
-                        odds = round(best_ask)
-                    elif 0 < best_ask <= 1:
-                        odds = round(best_ask * 100)
-                except (ValueError, TypeError):
-                    pass
-
-            # Method 3: lastTradePrice
-            if odds == 0 or odds >= 100:
-                try:
-                    last_price = float(market.get("lastTradePrice", 0) or 0)
-                    if last_price > 1:
-                        odds = round(last_price)
-                    elif 0 < last_price <= 1:
-                        odds = round(last_price * 100)
-                except (ValueError, TypeError):
-                    pass
-
-            # Safety: Cap odds at 95% (if still 100%, likely bad data)
-            if odds >= 100:
-                return 0
-
-            return odds
-
-        # Helper function to check if market is within 7 days
-        def is_near_term_market(title):
-            """Check if market has a date within the next 7 days"""
-            import re
-            from datetime import timedelta
-
-            # Look for date patterns like "by January 27" or "January 27, 2026"
-            months = [
-                "january",
-                "february",
-                "march",
-                "april",
-                "may",
-                "june",
-                "july",
-                "august",
-                "september",
-                "october",
-                "november",
-                "december",
-            ]
+def build_onnx_model(out_dir=ONNX_MODEL_DIR):
+    """
+    Export the escalation model to ONNX, apply dynamic int8 quantization, and
+    check the quantized scores against the PyTorch pipeline. Writes model.int8.onnx,
+    the tokenizer/config and manifest.json (with the measured deviation) to out_dir.
+    Returns the manifest.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    source, kwargs = _model_source(ESCALATION_MODEL)
+    tokenizer = AutoTokenizer.from_pretrained(source, **kwargs)
+    model = AutoModelForSequenceClassification.from_pretrained(source, **kwargs).eval()
+
+    sample = tokenizer(
+        ["Iran fires missiles"], [ESCALATION_HYPOTHESIS.format("military escalation")],
+        return_tensors="pt",
+    )
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+
+    # The TorchScript exporter handles DeBERTa with dynamic axes; newer torch
+    # defaults to the dynamo exporter, which needs onnxscript.
+    import inspect
+    export_kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+    print(f"  Exporting {ESCALATION_MODEL} to ONNX...")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={
+                **{n: {0: "batch", 1: "sequence"} for n in input_names},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+            **export_kwargs,
+        )
+    print("  Quantizing weights to int8...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+
+    onnx_scores = _load_onnx_scorer(out_dir, verify=False)(ONNX_CALIBRATION_HEADLINES)
+    torch_scores = _load_pipeline_scorer()(ONNX_CALIBRATION_HEADLINES)
+    max_diff = max(abs(a - b) for a, b in zip(onnx_scores, torch_scores))
+    manifest = {
+        "model": ESCALATION_MODEL,
+        "quantization": "dynamic-int8",
+        "max_abs_diff": round(max_diff, 4),
+        "tolerance": ONNX_SCORE_TOLERANCE,
+        "within_tolerance": max_diff <= ONNX_SCORE_TOLERANCE,
+        "built_at": datetime.now().isoformat(),
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(
+        f"  ONNX int8 vs PyTorch: max |diff| {max_diff:.4f} "
+        f"(tolerance {ONNX_SCORE_TOLERANCE}) -> {'OK' if manifest['within_tolerance'] else 'REJECTED'}"
+    )
+    return manifest
 
-            title_lower = title.lower()
-            now = datetime.now()
-            week_ahead = now + timedelta(days=7)
-
-            # Try to find month and day in title
-            for i, month in enumerate(months, 1):
-                if month in title_lower:
-                    # Look for day number after month
-                    match = re.search(rf"{month}\s+(\d{{1,2}})", title_lower)
-                    if match:
-                        day = int(match.group(1))
-                        try:
-                            # Assume current year if not specified
-                            market_date = datetime(now.year, i, day)
-                            # If date is in the past, try next year
-                            if market_date < now:
-                                market_date = datetime(now.year + 1, i, day)
-
-                            # Check if within 7 days
-                            if now <= market_date <= week_ahead:
-                                print(
-                                    f"    Market date {market_date.strftime('%Y-%m-%d')} is within 7 days"
-                                )
-                                return True
-                            else:
-                                print(
-                                    f"    Market date {market_date.strftime('%Y-%m-%d')} is too far away (>7 days)"
-                                )
-                        except ValueError:
-                            pass
-            return False
-
-        # First pass: Look for the specific "Will US or Israel strike Iran" market
-        for event in events:
-            event_title = (event.get("title") or "").lower()
-
-            # Look for the positive bet version (not negatives like "will not strike")
-            if (
-                "will us or israel strike iran" in event_title
-                or "us strikes iran by" in event_title
-            ):
-                # Check if it's a near-term market (within 7 days)
-                if not is_near_term_market(event.get("title", "")):
-                    continue
 
-                markets = event.get("markets", [])
+def _load_onnx_scorer(model_dir=ONNX_MODEL_DIR, verify=True):
+    """
+    Quantized ONNX Runtime scorer. Builds the model on first use; with verify,
+    refuses a build whose scores drifted beyond ONNX_SCORE_TOLERANCE.
+    Returns titles -> escalation scores.
+    """
+    model_path = os.path.join(model_dir, "model.int8.onnx")
+    if verify:
+        manifest_path = os.path.join(model_dir, "manifest.json")
+        if not os.path.exists(model_path) or not os.path.exists(manifest_path):
+            build_onnx_model(model_dir)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if not manifest.get("within_tolerance"):
+            raise RuntimeError(
+                f"quantized model deviates by {manifest.get('max_abs_diff')} "
+                f"(> {ONNX_SCORE_TOLERANCE}) from PyTorch"
+            )
 
-                for market in markets:
-                    market_question = (market.get("question") or "").lower()
-                    market_name = market.get("question") or event.get("title") or ""
+    import numpy as np
+    import onnxruntime as ort
+    from transformers import AutoConfig, AutoTokenizer
 
-                    odds = get_market_odds(market)
+    threads = ONNX_INTRA_OP_THREADS or _available_cpus()
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+    input_names = {i.name for i in session.get_inputs()}
 
-                    if odds > highest_odds:
-                        highest_odds = odds
-                        market_title = market_name
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    entailment_id = _entailment_id(AutoConfig.from_pretrained(model_dir))
 
-            # Also check individual market questions (sometimes event title is generic)
-            markets = event.get("markets", [])
-            for market in markets:
-                market_question = (market.get("question") or "").lower()
+    def forward(inputs):
+        feed = {k: np.asarray(v, dtype=np.int64) for k, v in inputs.items() if k in input_names}
+        return session.run(["logits"], feed)[0]
 
-                # Skip negative questions (containing "not", "won't", etc.)
-                if any(
-                    neg in market_question
-                    for neg in [" not ", "won't", "will not", "doesn't", "does not"]
-                ):
-                    continue
+    def score(titles):
+        return _nli_escalation_scores(titles, tokenizer, forward, entailment_id)
 
-                if "iran" in market_question and any(
-                    kw in market_question for kw in strike_keywords
-                ):
-                    market_name = market.get("question") or ""
+    score.threads = threads
+    return score
 
-                    # Check if near-term (within 7 days)
-                    if not is_near_term_market(market_name):
-                        continue
 
-                    odds = get_market_odds(market)
+def _available_cpus():
+    """CPUs this process may run on; sched_getaffinity is Linux-only."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
-                    if odds > 0 and odds > highest_odds:
-                        highest_odds = odds
-                        market_title = market_name
 
-        # Second pass: If no strike markets, look for any Iran-related market (excluding negatives)
-        if highest_odds == 0:
-            for event in events:
-                event_title = (event.get("title") or "").lower()
+def _get_escalation_scorer():
+    """
+    Load the escalation scorer for ESCALATION_BACKEND once per process and reuse
+    it on later calls. Falls back to PyTorch if the ONNX backend is unavailable.
+    Returns a callable mapping a list of titles to escalation scores.
+    """
+    global _escalation_scorer, _escalation_backend
+    with _classifier_lock:
+        if _escalation_scorer is None and ESCALATION_BACKEND == "onnx":
+            try:
+                _escalation_scorer = _load_onnx_scorer()
+                _escalation_backend = "onnx"
+                print(f"  Escalation backend: ONNX Runtime int8 ({_escalation_scorer.threads} threads)")
+            except ImportError as e:
+                print(f"  onnxruntime not installed ({e}), using PyTorch backend")
+            except Exception as e:
+                print(f"  ONNX backend unavailable ({e}), using PyTorch backend")
+        if _escalation_scorer is None:
+            _escalation_scorer = _load_torch_scorer()
+            _escalation_backend = "torch"
+        return _escalation_scorer
 
-                # Skip events with negative framing
-                if any(
-                    neg in event_title
-                    for neg in [" not ", "won't", "will not", "doesn't", "does not"]
-                ):
-                    continue
 
-                if "iran" in event_title:
-                    # Check if near-term
-                    if not is_near_term_market(event.get("title", "")):
-                        continue
+def _get_cascade_scorer():
+    """Load the small first-stage model for cascade mode once per process."""
+    global _cascade_scorer
+    with _classifier_lock:
+        if _cascade_scorer is None:
+            _cascade_scorer = _load_torch_scorer(CASCADE_MODEL)
+        return _cascade_scorer
 
-                    markets = event.get("markets", [])
 
-                    for market in markets:
-                        market_question = (market.get("question") or "").lower()
+# =============================================
+# ESCALATION SCORE CACHE
+# =============================================
 
-                        # Skip negative questions
-                        if any(
-                            neg in market_question
-                            for neg in [
-                                " not ",
-                                "won't",
-                                "will not",
-                                "doesn't",
-                                "does not",
-                            ]
-                        ):
-                            continue
+ESCALATION_CACHE_FILE = os.path.join(CACHE_DIR, "escalation_scores.json")
+ESCALATION_CACHE_MAX_ENTRIES = 5000
+ESCALATION_CACHE_TTL = 30 * 24 * 3600
 
-                        market_name = market.get("question") or event.get("title") or ""
+# key -> [escalation score, last used epoch]; loaded from disk on first use
+_escalation_cache = None
+_escalation_cache_lock = threading.Lock()
 
-                        # Check if market question has near-term date
-                        if not is_near_term_market(market_name):
-                            continue
 
-                        odds = get_market_odds(market)
+def _normalize_headline(title):
+    """Unicode- and whitespace-normalize a headline. Case is kept: the model is cased."""
+    return " ".join(unicodedata.normalize("NFKC", title).split())
 
-                        if odds > 0 and odds > highest_odds:
-                            highest_odds = odds
-                            market_title = market_name
 
-        if highest_odds > 0:
-            print(
-                f"Market: {market_title[:70]}..."
-                if len(market_title) > 70
-                else f"Market: {market_title}"
+def _escalation_cache_key(title, model_id=None, labels=ESCALATION_LABELS):
+    """Cache key over normalized headline + model id + label set."""
+    raw = "\x1f".join([_normalize_headline(title), model_id or _escalation_model_id(), *labels])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _load_escalation_cache():
+    """Return the in-memory cache, reading it from disk the first time. Caller holds the lock."""
+    global _escalation_cache
+    if _escalation_cache is None:
+        try:
+            with open(ESCALATION_CACHE_FILE, "r") as f:
+                _escalation_cache = json.load(f).get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            _escalation_cache = {}
+    return _escalation_cache
+
+
+def escalation_cache_lookup(titles, model_id=None):
+    """Return {title: score} for titles with a live cache entry, refreshing their LRU stamp."""
+    if not _disk_caches_enabled():
+        return {}
+    now = time.time()
+    hits = {}
+    with _escalation_cache_lock:
+        cache = _load_escalation_cache()
+        for title in titles:
+            entry = cache.get(_escalation_cache_key(title, model_id))
+            if entry and now - entry[1] <= ESCALATION_CACHE_TTL:
+                entry[1] = now
+                hits[title] = entry[0]
+    return hits
+
+
+def escalation_cache_store(scores, model_id=None):
+    """Insert {title: score}, evict expired then least-recently-used entries, and persist."""
+    if not _disk_caches_enabled():
+        return
+    now = time.time()
+    with _escalation_cache_lock:
+        cache = _load_escalation_cache()
+        for title, score in scores.items():
+            cache[_escalation_cache_key(title, model_id)] = [score, now]
+
+        for key in [k for k, (_, used) in cache.items() if now - used > ESCALATION_CACHE_TTL]:
+            del cache[key]
+        if len(cache) > ESCALATION_CACHE_MAX_ENTRIES:
+            by_age = sorted(cache, key=lambda k: cache[k][1])
+            for key in by_age[: len(cache) - ESCALATION_CACHE_MAX_ENTRIES]:
+                del cache[key]
+
+        try:
+            _write_atomic(
+                ESCALATION_CACHE_FILE,
+                json.dumps({"version": 1, "entries": cache}).encode("utf-8"),
             )
-        print(f"✓ Result: Risk {highest_odds}%")
+        except OSError as e:
+            print(f"  Escalation cache write failed: {e}")
 
-        return {
-            "odds": highest_odds,
-            "market": market_title,
-            "timestamp": datetime.now().isoformat(),
-        }
 
-    except Exception as e:
-        print(f"Polymarket fetch error: {e}")
-        import traceback
+def _cascade_escalation_scores(titles, stats, alerts=None):
+    """
+    First cascade stage: score titles with the small model and settle the clear
+    cases; the rest go to the full model. alerts is the set of titles whose
+    article (title + description) matched an alert term, as the news filter
+    saw it; when None the title alone is scanned. Returns {title: score}.
+    """
+    small_model = _get_cascade_scorer()
+    started = time.perf_counter()
+    small_scores = small_model(titles)
+    stats["prefilter_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    scores = {}
+    uncertain = []
+    for title, score in zip(titles, small_scores):
+        if alerts is not None:
+            is_alert = title in alerts
+        else:
+            is_alert = bool(NEWS_MATCHER.scan(title.lower())["alert"])
+        if not is_alert and score < CASCADE_ROUTINE_BELOW:
+            scores[title] = score
+            stats["resolved_routine"] += 1
+        elif is_alert and score > CASCADE_ESCALATORY_ABOVE:
+            scores[title] = score
+            stats["resolved_escalatory"] += 1
+        else:
+            uncertain.append(title)
+
+    if uncertain:
+        full_model = _get_escalation_scorer()
+        stats["backend"] = _escalation_backend
+        started = time.perf_counter()
+        scores.update(zip(uncertain, full_model(uncertain)))
+        stats["full_model_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    stats["full_model"] = len(uncertain)
+    return scores
+
+
+def _score_escalation_misses(titles, stats, alerts=None):
+    """Score titles that missed the cache with the configured mode. Returns {title: score}."""
+    if ESCALATION_MODE == "cascade":
+        scores = _cascade_escalation_scores(titles, stats, alerts)
+        print(
+            f"  Cascade: {stats['resolved_routine']} routine + {stats['resolved_escalatory']} escalatory "
+            f"settled by {CASCADE_MODEL.split('/')[-1]} ({stats['prefilter_ms']:.0f} ms), "
+            f"{stats['full_model']} sent to full model ({stats['full_model_ms']:.0f} ms)"
+        )
+        return scores
+    full_model = _get_escalation_scorer()
+    stats["backend"] = _escalation_backend
+    started = time.perf_counter()
+    scores = dict(zip(titles, full_model(titles)))
+    stats["full_model"] = len(titles)
+    stats["full_model_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return scores
 
-        traceback.print_exc()
+
+# =============================================
+# INFERENCE WORKER PROCESS
+# =============================================
+
+# "process" runs escalation inference in a spawned worker process, so torch and the
+# model weights never share an address space with Chrome and the HTML parsers;
+# "inline" runs it in this process.
+INFERENCE_WORKER = os.environ.get("INFERENCE_WORKER", "process").lower()
+# After a batch the worker exits (and is respawned) if its RSS exceeds this many MB
+# or it has served this many batches, handing its memory back to the OS.
+INFERENCE_WORKER_MAX_RSS_MB = int(os.environ.get("INFERENCE_WORKER_MAX_RSS_MB", "3072"))
+INFERENCE_WORKER_MAX_BATCHES = int(os.environ.get("INFERENCE_WORKER_MAX_BATCHES", "50"))
+# Must stay below the news fetch deadline (FETCH_DEADLINES["news"]), so a stuck
+# worker is killed while the fetch waiting on it can still report the failure.
+INFERENCE_TIMEOUT = 180
+
+# (process, request queue, response queue, score_fn) of the current worker; a dead
+# worker stays here until the next request respawns it with the same score_fn
+_inference_worker = None
+_inference_lock = threading.Lock()
+
+
+def _rss_mb():
+    """
+    Current resident set size of this process in MB, from /proc or psutil if
+    installed; None where neither is available (getrusage only reports the peak).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
         return None
 
 
+def _inference_worker_main(requests_q, responses_q, config, score_fn, max_rss_mb, max_batches):
+    """
+    Worker process loop: load the models, then answer (titles, stats, alerts)
+    requests with {title: score} until sent None or due for recycling.
+    """
+    globals().update(config)
+    if score_fn is None:
+        score_fn = _score_escalation_misses
+        try:
+            _get_escalation_scorer()
+            if ESCALATION_MODE == "cascade":
+                _get_cascade_scorer()
+        except Exception as e:
+            print(f"  Inference worker: model load failed: {e}")
+
+    batches = 0
+    while True:
+        request = requests_q.get()
+        if request is None:
+            return
+        titles, stats, alerts = request
+        try:
+            scores, error = score_fn(titles, stats, alerts), None
+        except Exception as e:
+            scores, error = None, f"{type(e).__name__}: {e}"
+        batches += 1
+        rss = _rss_mb()
+        # Without a current-RSS reading only the batch limit recycles the worker
+        retiring = batches >= max_batches or (rss is not None and rss > max_rss_mb)
+        responses_q.put({
+            "scores": scores, "stats": stats, "error": error,
+            "rss_mb": None if rss is None else round(rss), "retiring": retiring,
+        })
+        if retiring:
+            return
+
+
+def _spawn_inference_worker(score_fn=None):
+    """Start a worker process; the caller holds _inference_lock."""
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    requests_q, responses_q = ctx.Queue(), ctx.Queue()
+    config = {
+        name: globals()[name]
+        for name in (
+            "ESCALATION_MODEL", "ESCALATION_BACKEND", "ESCALATION_MODE", "ONNX_MODEL_DIR",
+            "CASCADE_MODEL", "CASCADE_ROUTINE_BELOW", "CASCADE_ESCALATORY_ABOVE",
+            "MODEL_BUNDLE_ROOT", "MODEL_REVISIONS", "USE_MODEL_BUNDLE",
+        )
+    }
+    process = ctx.Process(
+        target=_inference_worker_main,
+        args=(requests_q, responses_q, config, score_fn, INFERENCE_WORKER_MAX_RSS_MB, INFERENCE_WORKER_MAX_BATCHES),
+        name="inference-worker",
+        daemon=True,
+    )
+    process.start()
+    return process, requests_q, responses_q, score_fn
+
+
+def start_inference_worker(score_fn=None):
+    """
+    Make sure a worker is running. It loads the models in the background, so
+    calling this before fetching overlaps model loading with network I/O.
+    """
+    global _inference_worker
+    with _inference_lock:
+        if _inference_worker is None or not _inference_worker[0].is_alive():
+            _inference_worker = _spawn_inference_worker(score_fn)
+
+
+def stop_inference_worker():
+    """Ask the worker to exit, killing it if it does not within a few seconds."""
+    global _inference_worker
+    with _inference_lock:
+        if _inference_worker is None:
+            return
+        # Hold both queues until the worker is gone: a just-spawned child still
+        # unpickling them fails if their semaphores are released under it.
+        worker, _inference_worker = _inference_worker, None
+        process, requests_q = worker[0], worker[1]
+        if process.is_alive():
+            requests_q.put(None)
+            process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def score_in_worker(titles, stats, alerts=None):
+    """
+    Score titles in the worker process, (re)spawning it as needed. Blocks only the
+    calling thread; other fetchers keep running. Returns {title: score}.
+    """
+    import queue
+
+    global _inference_worker
+    with _inference_lock:
+        if _inference_worker is None or not _inference_worker[0].is_alive():
+            _inference_worker = _spawn_inference_worker(_inference_worker[3] if _inference_worker else None)
+        process, requests_q, responses_q, score_fn = _inference_worker
+        requests_q.put((titles, stats, alerts))
+
+        deadline = time.monotonic() + INFERENCE_TIMEOUT
+        while True:
+            try:
+                reply = responses_q.get(timeout=1)
+                break
+            except queue.Empty:
+                pass
+            if not process.is_alive():
+                try:
+                    reply = responses_q.get(timeout=1)
+                    break
+                except queue.Empty:
+                    raise RuntimeError(f"inference worker died (exit code {process.exitcode})")
+            if time.monotonic() > deadline:
+                process.kill()
+                raise TimeoutError(f"inference worker did not answer within {INFERENCE_TIMEOUT}s")
+
+        if reply["retiring"]:
+            # Respawn right away so the next batch finds the models loaded
+            process.join(10)
+            rss = "unknown" if reply["rss_mb"] is None else f"{reply['rss_mb']} MB"
+            print(f"  Recycling inference worker (RSS {rss})")
+            _inference_worker = _spawn_inference_worker(score_fn)
+
+    if reply["error"]:
+        raise RuntimeError(reply["error"])
+    stats.update(reply["stats"], worker_rss_mb=reply["rss_mb"])
+    return reply["scores"]
+
+
+def _note_escalation_backend(backend):
+    """Remember which backend the (possibly out-of-process) full model loaded with."""
+    global _escalation_backend
+    if backend:
+        _escalation_backend = backend
+
+
+def classify_escalation(titles, stats=None, alerts=None):
+    """
+    Return the "military escalation" score for each title. Titles already in the
+    score cache skip the model; only new headlines reach DeBERTa (in cascade mode,
+    only those the first stage could not settle), in the inference worker process
+    unless INFERENCE_WORKER is "inline". If a stats dict is given it is filled with
+    per-stage hit counts and latencies. alerts, the set of titles the news filter
+    flagged as alerts, lets the cascade use the same text the filter matched.
+    """
+    stats = {} if stats is None else stats
+    stats.update(mode=ESCALATION_MODE, cached=0, resolved_routine=0, resolved_escalatory=0,
+                 full_model=0, prefilter_ms=0.0, full_model_ms=0.0)
+
+    scores = escalation_cache_lookup(titles)
+    misses = list(dict.fromkeys(t for t in titles if t not in scores))
+    stats["cached"] = len(dict.fromkeys(titles)) - len(misses)
+    print(f"  Escalation cache: {len(titles) - len(misses)} hits, {len(misses)} to classify")
+
+    model_seconds = 0.0
+    if misses:
+        started = time.perf_counter()
+        with Span("escalation model", "model"):
+            if INFERENCE_WORKER == "process":
+                fresh = score_in_worker(misses, stats, alerts)
+            else:
+                fresh = _score_escalation_misses(misses, stats, alerts)
+        model_seconds = time.perf_counter() - started
+        # Cache under the backend that produced the scores, not the configured one
+        _note_escalation_backend(stats.get("backend"))
+        escalation_cache_store(fresh, _escalation_model_id(stats.get("backend")))
+        scores.update(fresh)
+    observe_classifier(len(misses), model_seconds, stats["cached"])
+
+    return [scores[t] for t in titles]
+
+
 def fetch_news_intel():
     """Fetch Iran-related news from RSS feeds - server side, no CORS issues"""
     try:
         print("\n" + "=" * 50)
         print("NEWS INTELLIGENCE")
         print("=" * 50)
-        import xml.etree.ElementTree as ET
+
+        # Let the worker load the classifier while the feeds download
+        if INFERENCE_WORKER == "process":
+            start_inference_worker()
 
         rss_feeds = [
             "https://feeds.bbci.co.uk/news/world/middle_east/rss.xml",
@@ -454,59 +2054,30 @@ def fetch_news_intel():
 
         all_articles = []
         alert_count = 0
-        alert_keywords = [
-            "strike",
-            "attack",
-            "military",
-            "bomb",
-            "missile",
-            "war",
-            "imminent",
-            "troops",
-            "forces",
-        ]
 
         for feed_url in rss_feeds:
             try:
                 print(f"  Fetching {feed_url[:50]}...")
-                response = make_request(
+                items, not_modified = fetch_feed_items(
                     feed_url,
                     timeout=15,
                     headers={"User-Agent": "Mozilla/5.0 (compatible; StrikeRadar/1.0)"},
                 )
-                if not response.ok:
-                    print(f"    Failed: {response.status_code}")
+                if items is None:
                     continue
-
-                root = ET.fromstring(response.content)
-
-                # Find all items (works for both RSS 2.0 and Atom)
-                items = root.findall(".//item")
-                if not items:
-                    items = root.findall(".//{http://www.w3.org/2005/Atom}entry")
+                if not_modified:
+                    print("    Not modified, using cached items")
 
                 for item in items:
-                    title_elem = item.find("title")
-                    desc_elem = item.find("description")
-
-                    if title_elem is None:
-                        title_elem = item.find("{http://www.w3.org/2005/Atom}title")
-                    if desc_elem is None:
-                        desc_elem = item.find("{http://www.w3.org/2005/Atom}summary")
-
-                    title = title_elem.text if title_elem is not None else ""
-                    desc = desc_elem.text if desc_elem is not None else ""
+                    title = item["title"] or ""
+                    desc = item["description"] or ""
 
                     combined = (title + " " + desc).lower()
+                    terms = NEWS_MATCHER.scan(combined)
 
                     # Filter for Iran-related news
-                    if (
-                        "iran" in combined
-                        or "tehran" in combined
-                        or "persian gulf" in combined
-                        or "strait of hormuz" in combined
-                    ):
-                        is_alert = any(kw in combined for kw in alert_keywords)
+                    if terms["iran"]:
+                        is_alert = bool(terms["alert"])
                         if is_alert:
                             alert_count += 1
                         all_articles.append(
@@ -538,30 +2109,16 @@ def fetch_news_intel():
         # Zero-shot classification for military escalation
         avg_escalation = 0.0
         escalation_available = False
-        ESCALATION_LABELS = [
-            "military escalation",
-            "diplomatic negotiation",
-            "routine operations",
-            "economic sanctions",
-            "unrelated",
-        ]
+        escalation_stages = {}
         try:
-            from transformers import pipeline as hf_pipeline
-            titles = [a["title"] for a in unique_articles if a["title"]]
-            if titles:
+            titled = [a for a in unique_articles if a["title"]]
+            if titled:
                 print("  Running zero-shot escalation classification...")
-                classifier = hf_pipeline(
-                    "zero-shot-classification",
-                    model="MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli",
-                    device=-1,
-                )
-                results = classifier(titles, candidate_labels=ESCALATION_LABELS, batch_size=8)
-                esc_scores = []
-                for i, result in enumerate(results):
-                    score_map = {l: s for l, s in zip(result["labels"], result["scores"])}
-                    esc = score_map.get("military escalation", 0.0)
-                    esc_scores.append(esc)
-                    unique_articles[i]["escalation"] = round(esc, 3)
+                # The cascade settles alerts on the title + description match above
+                alerts = {a["title"] for a in titled if a["is_alert"]}
+                esc_scores = classify_escalation([a["title"] for a in titled], escalation_stages, alerts)
+                for article, esc in zip(titled, esc_scores):
+                    article["escalation"] = round(esc, 3)
                 avg_escalation = sum(esc_scores) / len(esc_scores)
                 escalation_available = True
                 print(f"  Avg escalation: {avg_escalation:.3f} ({sum(1 for s in esc_scores if s > 0.5)}/{len(esc_scores)} above 0.5)")
@@ -582,7 +2139,8 @@ def fetch_news_intel():
             "alert_count": alert_count,
             "avg_escalation": round(avg_escalation, 3),
             "escalation_available": escalation_available,
-            "timestamp": datetime.now().isoformat(),
+            "escalation_stages": escalation_stages,
+            "timestamp": _cycle_now().isoformat(),
         }
 
     except Exception as e:
@@ -594,6 +2152,526 @@ def fetch_news_intel():
 
 
 
+# Middle East bbox, wide enough for every geofence below (Red Sea down to Bab-el-Mandeb)
+OPENSKY_STATES_URL = "https://opensky-network.org/api/states/all?lamin=12&lomin=32&lamax=40&lomax=65"
+
+# Iran airspace sub-bbox for civil aviation counting
+IRAN_LAT_MIN, IRAN_LAT_MAX = 25, 40
+IRAN_LON_MIN, IRAN_LON_MAX = 44, 64
+
+# Tankers are counted in the original Middle East query box only
+TANKER_LAT_MIN, TANKER_LAT_MAX = 20, 40
+TANKER_LON_MIN, TANKER_LON_MAX = 40, 65
+
+# Named regions for per-region civil traffic counts: (lon, lat) vertices, in order.
+# Rough outlines; regions may overlap, and a point counts in each region containing it.
+GEOFENCES = {
+    "iraq": [
+        (38.8, 33.4), (41.0, 37.1), (42.4, 37.4), (44.8, 37.2), (45.4, 35.9), (46.1, 35.1),
+        (45.7, 34.0), (47.9, 31.0), (48.6, 29.9), (47.7, 29.4), (46.6, 29.1), (44.7, 29.2),
+        (42.0, 31.1), (39.2, 32.2),
+    ],
+    "gulf_states": [
+        (47.5, 30.1), (48.9, 30.0), (50.5, 29.0), (51.5, 27.9), (53.5, 26.8), (56.0, 26.6),
+        (56.4, 25.0), (56.2, 24.0), (55.2, 22.7), (52.0, 23.0), (51.6, 24.3), (50.8, 24.7),
+        (50.2, 25.7), (49.6, 26.6), (48.5, 27.9), (47.7, 28.5),
+    ],
+    "strait_of_hormuz": [
+        (55.8, 27.2), (57.0, 27.0), (57.2, 25.6), (56.5, 25.2), (55.8, 25.8),
+    ],
+    "red_sea": [
+        (32.3, 29.9), (35.0, 29.5), (36.5, 26.0), (39.0, 22.0), (42.0, 17.0), (43.5, 12.6),
+        (43.2, 12.2), (41.8, 13.8), (39.5, 17.5), (37.3, 21.0), (35.5, 24.5), (33.5, 27.5),
+        (32.5, 29.5),
+    ],
+}
+
+# Military ICAO hex ranges
+MILITARY_HEX_RANGES = [
+    (int("AE0000", 16), int("AE7FFF", 16)),    # US Air Force
+    (int("ADF000", 16), int("ADF7FF", 16)),    # US Navy/Marines
+    (int("43C000", 16), int("43CFFF", 16)),    # Royal Air Force
+]
+
+TANKER_PREFIXES = (
+    # USAF tanker callsigns
+    "IRON", "SHELL", "TEXAN", "ETHYL", "PEARL", "ARCO",
+    "ESSO", "MOBIL", "GULF", "TOPAZ", "PACK", "DOOM",
+    "TREK", "REACH",
+    # US Navy
+    "CNV", "NAVY",
+    # RAF / allied
+    "RRR", "RAFR", "TYNE", "TARTAN",
+    # NATO
+    "NATO", "MMF",
+)
+
+
+def _point_in_polygon(lon, lat, polygon):
+    """Even-odd ray cast; points exactly on an edge may land on either side."""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class GeofenceIndex:
+    """
+    Uniform grid over a set of named polygon geofences. Each cell lists the
+    geofences whose bounding box touches it, so locating a point is one dict
+    lookup plus a ray cast against the one or two polygons in its cell, however
+    many geofences are configured. A point inside overlapping geofences counts
+    in each of them.
+    """
+
+    def __init__(self, geofences, cell_deg=1.0):
+        # geofences: {name: [(lon, lat), ...]}, open polygons with vertices in order
+        self.names = list(geofences)
+        self.polygons = [tuple(tuple(vertex) for vertex in geofences[name]) for name in self.names]
+        self.cell_deg = cell_deg
+        self.cells = {}
+        for index, polygon in enumerate(self.polygons):
+            lons = [lon for lon, _ in polygon]
+            lats = [lat for _, lat in polygon]
+            for row in range(int(min(lats) // cell_deg), int(max(lats) // cell_deg) + 1):
+                for col in range(int(min(lons) // cell_deg), int(max(lons) // cell_deg) + 1):
+                    self.cells.setdefault((row, col), []).append(index)
+        # Cell keys as row * 4096 + col (unique down to 0.1 deg cells), per geofence, for count_arrays
+        self._region_keys = [
+            [row * 4096 + col for (row, col), members in self.cells.items() if index in members]
+            for index in range(len(self.polygons))
+        ]
+        self._edges = None
+
+    def locate(self, lat, lon):
+        """Indexes (into self.names) of every geofence containing the point."""
+        cell = (int(lat // self.cell_deg), int(lon // self.cell_deg))
+        return [i for i in self.cells.get(cell, ()) if _point_in_polygon(lon, lat, self.polygons[i])]
+
+    def count_arrays(self, lats, lons):
+        """Per-geofence counts for NumPy coordinate arrays (no NaNs); same result as locate()."""
+        import numpy as np
+
+        counts = [0] * len(self.names)
+        if not len(lats):
+            return counts
+        if self._edges is None:
+            # (xi, yi, xj, yj) columns per polygon; horizontal edges never cross the ray
+            self._edges = []
+            for polygon in self.polygons:
+                edges = [(*polygon[i], *polygon[i - 1]) for i in range(len(polygon)) if polygon[i][1] != polygon[i - 1][1]]
+                self._edges.append(np.array(edges, dtype=float).T)
+        keys = np.floor_divide(lats, self.cell_deg) * 4096 + np.floor_divide(lons, self.cell_deg)
+        for index, (xi, yi, xj, yj) in enumerate(self._edges):
+            candidates = np.isin(keys, self._region_keys[index])
+            lon, lat = lons[candidates, None], lats[candidates, None]
+            crossings = ((yi > lat) != (yj > lat)) & (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi)
+            counts[index] = int((crossings.sum(axis=1) % 2).sum())
+        return counts
+
+
+GEOFENCE_INDEX = GeofenceIndex(GEOFENCES)
+
+# Per-state flags for the track store: what each aircraft counted as in this snapshot
+TRACK_CIVIL = 1   # civil, over the Iran rectangle
+TRACK_TANKER = 2  # tanker, inside the tanker box
+
+# Below this many state vectors the plain loop beats the NumPy setup cost
+OPENSKY_VECTOR_MIN_STATES = 300
+
+_TANKER_PREFIXES_BY_LENGTH = {}
+for _prefix in TANKER_PREFIXES:
+    _TANKER_PREFIXES_BY_LENGTH.setdefault(len(_prefix), []).append(_prefix)
+
+
+def _classify_opensky_states(states, geofences=None, with_flags=False):
+    """
+    Split OpenSky state vectors into civil traffic over Iran and tankers in the
+    Middle East tanker box, and count civil traffic per geofence (GEOFENCE_INDEX
+    unless another GeofenceIndex is given). Military airframes are never counted
+    as civil. Pure function of its input; returns counts plus airline codes and
+    tanker callsigns in first-seen order; with_flags adds "flags", one
+    TRACK_CIVIL/TRACK_TANKER bitmask per state. Large batches take the columnar
+    NumPy path, small ones (or a missing NumPy) the plain loop; both return the
+    same dict.
+    """
+    if len(states) >= OPENSKY_VECTOR_MIN_STATES:
+        try:
+            return _classify_opensky_states_numpy(states, geofences, with_flags)
+        except ImportError:
+            pass
+    return _classify_opensky_states_python(states, geofences, with_flags)
+
+
+def _classify_opensky_states_python(states, geofences=None, with_flags=False):
+    """Reference implementation of _classify_opensky_states: one pass per state vector."""
+    geofences = geofences or GEOFENCE_INDEX
+    civil_count = 0
+    airlines = []
+    tanker_count = 0
+    tanker_callsigns = []
+    region_counts = [0] * len(geofences.names)
+    flags = [0] * len(states)
+
+    for row, ac in enumerate(states):
+        icao = ac[0]
+        callsign = (ac[1] or "").strip().upper()
+        lat = ac[6]
+        lon = ac[5]
+        on_ground = ac[8]
+
+        if on_ground:
+            continue
+
+        # --- Tanker detection (whole Middle East bbox) ---
+        is_tanker = callsign.startswith(TANKER_PREFIXES)
+        has_kc = "KC" in callsign or "TANKER" in callsign
+
+        try:
+            icao_num = int(icao, 16)
+            is_mil = any(lo <= icao_num <= hi for lo, hi in MILITARY_HEX_RANGES)
+        except (TypeError, ValueError):
+            is_mil = False
+
+        if is_tanker or has_kc or (is_mil and callsign):
+            in_tanker_box = lat is None or lon is None or (
+                TANKER_LAT_MIN <= lat <= TANKER_LAT_MAX and TANKER_LON_MIN <= lon <= TANKER_LON_MAX
+            )
+            if (is_tanker or has_kc) and in_tanker_box:
+                tanker_count += 1
+                flags[row] = TRACK_TANKER
+                if callsign:
+                    tanker_callsigns.append(callsign)
+            continue  # don't count military as civil
+
+        # --- Civil aviation (Iran sub-bbox, plus every geofence) ---
+        if lat is not None and lon is not None:
+            for region in geofences.locate(lat, lon):
+                region_counts[region] += 1
+            if IRAN_LAT_MIN <= lat <= IRAN_LAT_MAX and IRAN_LON_MIN <= lon <= IRAN_LON_MAX:
+                civil_count += 1
+                flags[row] = TRACK_CIVIL
+                if callsign and len(callsign) >= 3:
+                    code = callsign[:3]
+                    if code not in airlines:
+                        airlines.append(code)
+
+    counts = {
+        "civil_count": civil_count,
+        "airlines": airlines,
+        "tanker_count": tanker_count,
+        "tanker_callsigns": tanker_callsigns,
+        "region_counts": dict(zip(geofences.names, region_counts)),
+    }
+    if with_flags:
+        counts["flags"] = flags
+    return counts
+
+
+def _classify_opensky_states_numpy(states, geofences=None, with_flags=False):
+    """
+    Columnar version of _classify_opensky_states_python: the state vectors are
+    loaded into NumPy arrays once, ICAO addresses are matched against
+    MILITARY_HEX_RANGES by sorted-interval search, tanker prefixes per prefix
+    length with np.isin, and the Iran box is a boolean mask. Returns exactly
+    what the Python version returns.
+    """
+    import numpy as np
+
+    if not states:
+        return _classify_opensky_states_python(states, geofences, with_flags)
+    geofences = geofences or GEOFENCE_INDEX
+    n = len(states)
+    icao_column = [ac[0] for ac in states]
+
+    # Canonical ICAO addresses (6 lowercase hex digits) sort like the numbers they
+    # encode, so the ranges are searched as strings; MILITARY_HEX_RANGES do not
+    # overlap, so the last start <= x is the only candidate range.
+    ranges = sorted(MILITARY_HEX_RANGES)
+    starts = np.array([f"{lo:06x}" for lo, _ in ranges])
+    ends = np.array([f"{hi:06x}" for _, hi in ranges])
+
+    # --- ICAO membership: sorted interval lookup over the hex strings ---
+    icao = np.array([x if isinstance(x, str) else "" for x in icao_column])
+    codepoints = icao.astype("U6").view(np.uint32).reshape(n, 6)
+    canonical = (
+        (((codepoints >= 48) & (codepoints <= 57)) | ((codepoints >= 97) & (codepoints <= 102))).all(axis=1)
+        & (np.char.str_len(icao) == 6)
+    )
+    slot = np.searchsorted(starts, icao, side="right") - 1
+    is_mil = canonical & (slot >= 0) & (icao <= ends[np.maximum(slot, 0)])
+    # Anything else (upper case, short, padded, non-string) goes through int() as before
+    for i in np.flatnonzero(~canonical):
+        try:
+            icao_num = int(icao_column[i], 16)
+            is_mil[i] = any(lo <= icao_num <= hi for lo, hi in MILITARY_HEX_RANGES)
+        except (TypeError, ValueError):
+            pass
+
+    # --- Callsigns: normalized in one pass, prefixes compared per prefix length ---
+    callsigns = np.array([(ac[1] or "").strip().upper() for ac in states], dtype=str)
+    has_callsign = np.char.str_len(callsigns) > 0
+    is_tanker = np.zeros(n, dtype=bool)
+    for length, prefixes in _TANKER_PREFIXES_BY_LENGTH.items():
+        is_tanker |= np.isin(callsigns.astype(f"U{length}"), prefixes)
+    has_kc = (np.char.find(callsigns, "KC") >= 0) | (np.char.find(callsigns, "TANKER") >= 0)
+
+    airborne = ~np.array([bool(ac[8]) for ac in states], dtype=bool)
+    lat = np.array([ac[6] for ac in states], dtype=float)
+    lon = np.array([ac[5] for ac in states], dtype=float)
+
+    has_position = ~np.isnan(lat) & ~np.isnan(lon)
+    in_tanker_box = ~has_position | (
+        (lat >= TANKER_LAT_MIN) & (lat <= TANKER_LAT_MAX)
+        & (lon >= TANKER_LON_MIN) & (lon <= TANKER_LON_MAX)
+    )
+    tanker_like = airborne & (is_tanker | has_kc)
+    tankers = tanker_like & in_tanker_box
+    military = tanker_like | (airborne & is_mil & has_callsign)
+    positioned_civil = airborne & ~military & has_position
+    civil = (
+        positioned_civil
+        & (lat >= IRAN_LAT_MIN) & (lat <= IRAN_LAT_MAX)
+        & (lon >= IRAN_LON_MIN) & (lon <= IRAN_LON_MAX)
+    )
+    region_counts = geofences.count_arrays(lat[positioned_civil], lon[positioned_civil])
+
+    codes = callsigns[civil & (np.char.str_len(callsigns) >= 3)].astype("U3")
+    _, first_seen = np.unique(codes, return_index=True)
+    counts = {
+        "civil_count": int(civil.sum()),
+        "airlines": codes[np.sort(first_seen)].tolist(),
+        "tanker_count": int(tankers.sum()),
+        "tanker_callsigns": callsigns[tankers & has_callsign].tolist(),
+        "region_counts": dict(zip(geofences.names, region_counts)),
+    }
+    if with_flags:
+        counts["flags"] = (civil * TRACK_CIVIL | tankers * TRACK_TANKER).tolist()
+    return counts
+
+
+# OpenSky track store: recent positions keyed by icao24, kept across polls
+TRACK_STORE_FILE = os.path.join(CACHE_DIR, "opensky_tracks.json")
+TRACK_STORE_VERSION = 1
+TRACK_STORE_CAPACITY = 4096      # airframes held at once
+TRACK_POINTS = 12                # positions kept per airframe (3 h at the 15 min OpenSky cadence)
+TRACK_RETENTION_SECONDS = 3 * 3600
+
+
+class TrackStore:
+    """
+    Recent positions of every airborne aircraft seen by OpenSky, keyed by icao24.
+    Each airframe owns a slot, and a slot's last `points` observations sit in a
+    ring inside flat arrays (time, lat, lon, flags), so memory is fixed at
+    capacity * points whatever the daemon's uptime. Slots not seen for
+    TRACK_RETENTION_SECONDS are freed; when every slot is taken the stalest one
+    is reused. Observing the same poll twice overwrites instead of appending.
+    Slots are kept least recently seen first, so eviction never scans the store.
+    """
+
+    def __init__(self, capacity=TRACK_STORE_CAPACITY, points=TRACK_POINTS):
+        self.capacity = capacity
+        self.points = points
+        self.times = array("d", [0.0]) * (capacity * points)
+        self.lats = array("d", [0.0]) * (capacity * points)
+        self.lons = array("d", [0.0]) * (capacity * points)
+        self.flags = array("B", [0]) * (capacity * points)
+        self.head = array("l", [0]) * capacity
+        self.length = array("l", [0]) * capacity
+        self.first_seen = array("d", [0.0]) * capacity
+        self.last_seen = array("d", [0.0]) * capacity
+        self.callsigns = [""] * capacity
+        self.slots = OrderedDict()  # icao24 -> slot, least recently seen first
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _allocate(self, icao24, ts):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self.slots.popitem(last=False)[1]
+        self.slots[icao24] = slot
+        self.head[slot] = self.length[slot] = 0
+        self.first_seen[slot] = self.last_seen[slot] = ts
+        self.callsigns[slot] = ""
+        return slot
+
+    def observe(self, icao24, callsign, lat, lon, flags, ts):
+        """Append one position (lat/lon None when unknown) for icao24 at epoch time ts."""
+        slot = self.slots.get(icao24)
+        if slot is None:
+            slot = self._allocate(icao24, ts)
+        base = slot * self.points
+        latest = base + (self.head[slot] - 1) % self.points
+        if self.length[slot] and self.times[latest] == ts:
+            i = latest
+        else:
+            i = base + self.head[slot]
+            self.head[slot] = (self.head[slot] + 1) % self.points
+            self.length[slot] = min(self.length[slot] + 1, self.points)
+        self.times[i] = ts
+        self.lats[i] = float("nan") if lat is None else lat
+        self.lons[i] = float("nan") if lon is None else lon
+        self.flags[i] = flags
+        if ts >= self.last_seen[slot]:
+            self.last_seen[slot] = ts
+            self.slots.move_to_end(icao24)
+        if callsign:
+            self.callsigns[slot] = callsign
+
+    def observe_states(self, states, flags, ts):
+        """Record one OpenSky poll: airborne state vectors with their classifier flags."""
+        for ac, flag in zip(states, flags):
+            if ac[8] or not isinstance(ac[0], str):
+                continue
+            self.observe(ac[0], (ac[1] or "").strip().upper(), ac[6], ac[5], flag, ts)
+        self.evict(ts)
+
+    def evict(self, now):
+        """Free every slot not seen for TRACK_RETENTION_SECONDS."""
+        cutoff = now - TRACK_RETENTION_SECONDS
+        while self.slots:
+            icao24, slot = next(iter(self.slots.items()))
+            if self.last_seen[slot] >= cutoff:
+                break
+            del self.slots[icao24]
+            self._free.append(slot)
+
+    def _track_points(self, slot, since=None):
+        base, length = slot * self.points, self.length[slot]
+        start = (self.head[slot] - length) % self.points
+        for k in range(length):
+            i = base + (start + k) % self.points
+            if since is None or self.times[i] >= since:
+                yield i
+
+    def window_counts(self, now, window=None):
+        """
+        Unique airframes flagged civil / tanker in any poll of the last `window`
+        seconds (TRACK_WINDOW_SECONDS when None), with tanker callsigns (latest
+        per airframe) least recently seen first.
+        """
+        since = now - (TRACK_WINDOW_SECONDS if window is None else window)
+        civil_count, tanker_count, tanker_callsigns = 0, 0, []
+        for slot in self.slots.values():
+            if self.last_seen[slot] < since:
+                continue
+            seen = 0
+            for i in self._track_points(slot, since):
+                seen |= self.flags[i]
+            if seen & TRACK_CIVIL:
+                civil_count += 1
+            if seen & TRACK_TANKER:
+                tanker_count += 1
+                if self.callsigns[slot]:
+                    tanker_callsigns.append(self.callsigns[slot])
+        return {"civil_count": civil_count, "tanker_count": tanker_count, "tanker_callsigns": tanker_callsigns}
+
+    def recent_tracks(self, since=None, flags=None, icao24=None):
+        """
+        Tracks seen at or after `since` (epoch seconds; all when None), optionally
+        only airframes with any of `flags` in that span, or a single icao24.
+        Points are [time, lat, lon, flags] oldest first, lat/lon None when unknown.
+        """
+        tracks = []
+        for icao, slot in self.slots.items():
+            if icao24 is not None and icao != icao24:
+                continue
+            if since is not None and self.last_seen[slot] < since:
+                continue
+            points = [
+                [self.times[i], _nan_to_none(self.lats[i]), _nan_to_none(self.lons[i]), self.flags[i]]
+                for i in self._track_points(slot, since)
+            ]
+            if flags is not None and not any(point[3] & flags for point in points):
+                continue
+            tracks.append({
+                "icao24": icao,
+                "callsign": self.callsigns[slot],
+                "first_seen": self.first_seen[slot],
+                "last_seen": self.last_seen[slot],
+                "dwell_seconds": self.last_seen[slot] - self.first_seen[slot],
+                "points": points,
+            })
+        return tracks
+
+    def to_json(self):
+        return {
+            "version": TRACK_STORE_VERSION,
+            "tracks": {
+                icao: {
+                    "callsign": self.callsigns[slot],
+                    "first_seen": self.first_seen[slot],
+                    "points": [
+                        [self.times[i], _nan_to_none(self.lats[i]), _nan_to_none(self.lons[i]), self.flags[i]]
+                        for i in self._track_points(slot)
+                    ],
+                }
+                for icao, slot in self.slots.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data, capacity=TRACK_STORE_CAPACITY, points=TRACK_POINTS):
+        store = cls(capacity, points)
+        if not isinstance(data, dict) or data.get("version") != TRACK_STORE_VERSION:
+            return store
+        for icao, track in data.get("tracks", {}).items():
+            for ts, lat, lon, flags in track["points"]:
+                store.observe(icao, track["callsign"], lat, lon, flags, ts)
+            if icao in store.slots:
+                store.first_seen[store.slots[icao]] = track["first_seen"]
+        return store
+
+
+def _nan_to_none(value):
+    return None if value != value else value
+
+
+_track_store = None
+_track_store_lock = threading.Lock()  # the daemon's /tracks handler reads while a cycle writes
+
+
+def opensky_track_store():
+    """
+    The process-wide TrackStore, loaded from TRACK_STORE_FILE on first use so
+    one-shot runs continue the previous run's window. Record/replay runs get a
+    fresh, unsaved store so their counts depend on the cassette alone.
+    """
+    global _track_store
+    if not _disk_caches_enabled():
+        return TrackStore()
+    if _track_store is None:
+        try:
+            with open(TRACK_STORE_FILE, "r") as f:
+                _track_store = TrackStore.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            _track_store = TrackStore()
+    return _track_store
+
+
+def save_opensky_track_store(store):
+    if not _disk_caches_enabled():
+        return
+    try:
+        _write_atomic(TRACK_STORE_FILE, json.dumps(store.to_json()).encode("utf-8"))
+    except OSError as e:
+        print(f"    OpenSky track store write failed: {e}")
+
+
+def recent_opensky_tracks(since=None, flags=None, icao24=None):
+    """TrackStore.recent_tracks() on the process-wide store, safe to call while a cycle runs."""
+    with _track_store_lock:
+        return opensky_track_store().recent_tracks(since, flags, icao24)
+
+
 def fetch_opensky_data():
     """Single OpenSky call: civil aviation over Iran + military/allied tankers in Middle East."""
     try:
@@ -601,9 +2679,7 @@ def fetch_opensky_data():
         print("OPENSKY — AVIATION & TANKERS")
         print("=" * 50)
 
-        # Middle East bbox (covers Iran too)
-        url = "https://opensky-network.org/api/states/all?lamin=20&lomin=40&lamax=40&lomax=65"
-        response = make_request(url, timeout=20)
+        response = make_request(OPENSKY_STATES_URL, timeout=20)
         if not response.ok:
             print(f"  OpenSky API error: HTTP {response.status_code}")
             return None, None
@@ -613,83 +2689,38 @@ def fetch_opensky_data():
             print("  OpenSky returned no states (possibly rate-limited)")
             return None, None
 
-        # Iran airspace sub-bbox for civil aviation counting
-        IRAN_LAT_MIN, IRAN_LAT_MAX = 25, 40
-        IRAN_LON_MIN, IRAN_LON_MAX = 44, 64
-
-        # Military ICAO hex ranges
-        USAF_HEX = (int("AE0000", 16), int("AE7FFF", 16))    # US Air Force
-        USN_HEX  = (int("ADF000", 16), int("ADF7FF", 16))     # US Navy/Marines
-        RAF_HEX  = (int("43C000", 16), int("43CFFF", 16))     # Royal Air Force
-
-        TANKER_PREFIXES = [
-            # USAF tanker callsigns
-            "IRON", "SHELL", "TEXAN", "ETHYL", "PEARL", "ARCO",
-            "ESSO", "MOBIL", "GULF", "TOPAZ", "PACK", "DOOM",
-            "TREK", "REACH",
-            # US Navy
-            "CNV", "NAVY",
-            # RAF / allied
-            "RRR", "RAFR", "TYNE", "TARTAN",
-            # NATO
-            "NATO", "MMF",
-        ]
-
-        civil_count = 0
-        airlines = []
-        tanker_count = 0
-        tanker_callsigns = []
-
-        for ac in data["states"]:
-            icao = ac[0]
-            callsign = (ac[1] or "").strip().upper()
-            lat = ac[6]
-            lon = ac[5]
-            on_ground = ac[8]
-
-            if on_ground:
-                continue
-
-            # --- Tanker detection (whole Middle East bbox) ---
-            is_tanker = any(callsign.startswith(p) for p in TANKER_PREFIXES)
-            has_kc = "KC" in callsign or "TANKER" in callsign
-
-            try:
-                icao_num = int(icao, 16)
-                is_mil = any(lo <= icao_num <= hi for lo, hi in [USAF_HEX, USN_HEX, RAF_HEX])
-            except ValueError:
-                is_mil = False
-
-            if is_tanker or has_kc or (is_mil and callsign):
-                if is_tanker or has_kc:
-                    tanker_count += 1
-                    if callsign:
-                        tanker_callsigns.append(callsign)
-                continue  # don't count military as civil
-
-            # --- Civil aviation (Iran sub-bbox only) ---
-            if lat is not None and lon is not None:
-                if IRAN_LAT_MIN <= lat <= IRAN_LAT_MAX and IRAN_LON_MIN <= lon <= IRAN_LON_MAX:
-                    civil_count += 1
-                    if callsign and len(callsign) >= 3:
-                        code = callsign[:3]
-                        if code not in airlines:
-                            airlines.append(code)
-
-        print(f"  Civil: {civil_count} aircraft, {len(airlines)} airlines over Iran")
-        print(f"  Tankers: {tanker_count} detected in Middle East — {tanker_callsigns}")
-
-        ts = datetime.now().isoformat()
+        counts = _classify_opensky_states(data["states"], with_flags=True)
+        airlines = counts["airlines"]
+
+        # The risk formulas are calibrated on a single snapshot, so the counts they
+        # read stay per-poll; unique airframes over the track window ride alongside
+        polled_at = data.get("time") if isinstance(data.get("time"), (int, float)) else _cycle_now().timestamp()
+        with _track_store_lock:
+            tracks = opensky_track_store()
+            tracks.observe_states(data["states"], counts["flags"], polled_at)
+            save_opensky_track_store(tracks)
+            window = tracks.window_counts(polled_at)
+        print(f"  Civil: {counts['civil_count']} aircraft over Iran ({window['civil_count']} in the last "
+              f"{TRACK_WINDOW_SECONDS // 60} min), {len(airlines)} airlines")
+        print(f"  Tankers: {counts['tanker_count']} detected in Middle East — {counts['tanker_callsigns']} "
+              f"({window['tanker_count']} in the last {TRACK_WINDOW_SECONDS // 60} min — {window['tanker_callsigns']})")
+        print("  Regions: " + ", ".join(f"{name} {count}" for name, count in counts["region_counts"].items()))
+
+        ts = _cycle_now().isoformat()
 
         aviation = {
-            "aircraft_count": civil_count,
+            "aircraft_count": counts["civil_count"],
+            "window_count": window["civil_count"],
             "airline_count": len(airlines),
             "airlines": airlines[:10],
+            "regions": counts["region_counts"],
             "timestamp": ts,
         }
         tanker = {
-            "tanker_count": tanker_count,
-            "callsigns": tanker_callsigns[:10],
+            "tanker_count": counts["tanker_count"],
+            "window_count": window["tanker_count"],
+            "callsigns": counts["tanker_callsigns"][:10],
+            "window_callsigns": window["tanker_callsigns"][:10],
             "timestamp": ts,
         }
         return aviation, tanker
@@ -763,16 +2794,73 @@ AIR_BASE_POINTS = {
     "souda bay": 3, "crete": 3,
 }
 
-AIR_CAPABILITY_CATEGORIES = {
-    "strategic_strike": ["b-2", "b-52", "b-1"],
-    "air_superiority": ["f-22"],
-    "multirole_strike": ["f-35", "f-15e"],
-    "ground_attack": ["a-10"],
-    "c2_isr": ["awacs", "e-3", "rc-135", "global hawk", "rq-4", "p-8"],
-    "allied": ["typhoon", "rafale"],
-}
+AIR_CAPABILITY_CATEGORIES = {
+    "strategic_strike": ["b-2", "b-52", "b-1"],
+    "air_superiority": ["f-22"],
+    "multirole_strike": ["f-35", "f-15e"],
+    "ground_attack": ["a-10"],
+    "c2_isr": ["awacs", "e-3", "rc-135", "global hawk", "rq-4", "p-8"],
+    "allied": ["typhoon", "rafale"],
+}
+
+CARRIER_SQUADRON_PATTERN = r"(?:VFA|VMFA)[-\s]*\d+"
+
+# Deployment news headline terms
+DEPLOYMENT_ESCALATION_KEYWORDS = ["buildup", "build-up", "strike option", "deadline", "warns", "critical level", "armada", "tensions"]
+DEPLOYMENT_KEYWORDS = ["deploy", "carrier", "arrives", "heading", "sailing", "ordered to", "strike group"]
+
+BUILDUP_NEWS_MATCHER = KeywordMatcher({
+    "platform": AIR_PLATFORM_POINTS,
+    "base": AIR_BASE_POINTS,
+    "escalation": DEPLOYMENT_ESCALATION_KEYWORDS,
+    "deployment": DEPLOYMENT_KEYWORDS,
+})
+
+# Points per carrier air wing squadron by designator prefix
+SQUADRON_POINTS = {"VFA": 6, "VMFA": 8, "VAQ": 4, "VAW": 3}
+
+
+class FleetScanner:
+    """
+    The Fleet Tracker patterns compiled once. Each lookup is a single regex pass
+    over the text: the region lists, transit phrases and station keywords are
+    joined into alternations, and the four squadron prefixes share one pattern.
+    Hulls keep their own pass; folding them into the same alternation would let
+    a (non-overlapping) hull match swallow a transit phrase inside a ship name.
+    """
+
+    def __init__(self):
+        self.hull_re = re.compile(HULL_PATTERN)
+        self.squadron_re = re.compile(r"(%s)[-\s]*\d+" % "|".join(SQUADRON_POINTS))
+        self.transit_re = re.compile("|".join(f"(?:{p})" for p in TRANSIT_KEYWORDS_RE))
+        self.station_re = re.compile("|".join(re.escape(k) for k in STATION_KEYWORDS))
+        self.high_region_re = re.compile("|".join(re.escape(r) for r in HIGH_RELEVANCE_REGIONS))
+        self.medium_region_re = re.compile("|".join(re.escape(r) for r in CONDITIONAL_MEDIUM_REGIONS))
+
+    def relevance(self, region_lower, section_lower):
+        """(relevance, multiplier) of a section from its lowercased heading and text."""
+        if self.high_region_re.search(region_lower):
+            return "high", 1.0
+        if self.medium_region_re.search(region_lower):
+            if self.transit_re.search(section_lower):
+                return "medium-transit", 0.5
+            if self.station_re.search(section_lower):
+                return "medium-station", 0.4
+        return "low", 0.0
+
+    def hulls(self, text):
+        """[(ship name, hull designation)] in order of appearance."""
+        return self.hull_re.findall(text)
+
+    def squadrons(self, text):
+        """{prefix: set of distinct squadron designations} for VFA/VMFA/VAQ/VAW."""
+        found = {prefix: set() for prefix in SQUADRON_POINTS}
+        for m in self.squadron_re.finditer(text):
+            found[m.group(1)].add(m.group(0))
+        return found
 
-CARRIER_SQUADRON_PATTERN = r"(?:VFA|VMFA)[-\s]*\d+"
+
+FLEET_SCANNER = FleetScanner()
 
 
 def _get_hull_type(hull):
@@ -783,56 +2871,85 @@ def _get_hull_type(hull):
     return hull.split("-")[0]
 
 
-def score_naval_force(content_html):
+def _fleet_html_parser():
+    """lxml when installed (several times faster to build the tree), else the stdlib parser."""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+def _segment_by_heading(soup, heading="h2"):
     """
-    Score naval force posture from USNI Fleet Tracker article HTML.
-    Pure function: deterministic on the same input, no network calls.
-    Returns dict with total_weighted_points, force_risk, type_counts, etc.
+    Split a parsed document into (heading tag, section text) pairs in document
+    order. A section is the text of the tags following its heading, up to the
+    next heading at the same level. Each parent's children are walked once and
+    joined at the end, so the cost is linear in document size.
     """
-    import re as _re
+    headings = soup.find_all(heading)
+    parts = {id(tag): [] for tag in headings}
+    walked = set()
 
-    soup = BeautifulSoup(content_html, "html.parser")
-    h2s = soup.find_all("h2")
-    all_ships = {}
-    total_points = 0.0
+    for tag in headings:
+        parent = tag.parent
+        if id(parent) in walked:
+            continue
+        walked.add(id(parent))
+        current = None
+        for child in parent.children:
+            if child.name is None:  # bare strings and comments between tags
+                continue
+            if child.name == heading:
+                current = parts[id(child)]
+            elif current is not None:
+                current.append(child.get_text(" ", strip=True))
+
+    return [(tag, "".join(text + " " for text in parts[id(tag)])) for tag in headings]
+
+
+def _parse_fleet_sections(content_html):
+    """
+    Split USNI Fleet Tracker article HTML into its h2 regions, parsed once and
+    shared by every buildup scorer. Navigation sections ("ships underway",
+    "search", "related") are dropped. Returns a list of dicts with region name,
+    section text, relevance and the multiplier applied to assets found there.
+    """
+    soup = bs4.BeautifulSoup(content_html, _fleet_html_parser())
+    sections = []
 
-    for h2 in h2s:
+    for h2, section_text in _segment_by_heading(soup):
         region_name = h2.get_text(strip=True)
         region_lower = region_name.lower()
         if any(s in region_lower for s in ["ships underway", "search", "related"]):
             continue
+        relevance, multiplier = FLEET_SCANNER.relevance(region_lower, section_text.lower())
 
-        section_text = ""
-        for sibling in h2.find_next_siblings():
-            if sibling.name == "h2":
-                break
-            section_text += sibling.get_text(" ", strip=True) + " "
-        section_lower = section_text.lower()
-
-        relevance = "low"
-        multiplier = 0.0
-        for hr in HIGH_RELEVANCE_REGIONS:
-            if hr in region_lower:
-                relevance = "high"
-                multiplier = 1.0
-                break
-        if relevance == "low":
-            for cmr in CONDITIONAL_MEDIUM_REGIONS:
-                if cmr in region_lower:
-                    for tkw in TRANSIT_KEYWORDS_RE:
-                        if _re.search(tkw, section_lower):
-                            relevance = "medium-transit"
-                            multiplier = 0.5
-                            break
-                    if relevance == "low":
-                        for skw in STATION_KEYWORDS:
-                            if skw in section_lower:
-                                relevance = "medium-station"
-                                multiplier = 0.4
-                                break
-                    break
+        sections.append({
+            "region": region_name,
+            "text": section_text,
+            "relevance": relevance,
+            "multiplier": multiplier,
+        })
+
+    return sections
+
+
+def score_naval_force(content_html, sections=None):
+    """
+    Score naval force posture from USNI Fleet Tracker article HTML (or its
+    already parsed sections from _parse_fleet_sections).
+    Pure function: deterministic on the same input, no network calls.
+    Returns dict with total_weighted_points, force_risk, type_counts, etc.
+    """
+    if sections is None:
+        sections = _parse_fleet_sections(content_html)
+    all_ships = {}
+    total_points = 0.0
 
-        ships = _re.findall(HULL_PATTERN, section_text)
+    for section in sections:
+        multiplier = section["multiplier"]
+        ships = FLEET_SCANNER.hulls(section["text"])
         seen = set()
         for name, hull in ships:
             if hull in seen:
@@ -879,45 +2996,27 @@ def score_naval_force(content_html):
     }
 
 
-def _score_carrier_air(content_html, h2_regions_lower_relevant):
+def _score_carrier_air(sections):
     """
-    Score carrier air wing composition from USNI article HTML.
+    Score carrier air wing composition from parsed USNI Fleet Tracker sections.
     Only counts squadrons within CENTCOM-relevant h2 sections.
     Returns dict with risk score and squadron counts.
     """
-    soup = BeautifulSoup(content_html, "html.parser")
     total_air_pts = 0.0
     total_fighter_sq = 0
     total_ea_sq = 0
     total_ew_sq = 0
 
-    for h2 in soup.find_all("h2"):
-        region_lower = h2.get_text(strip=True).lower()
-        multiplier = h2_regions_lower_relevant.get(region_lower, 0.0)
+    for section in sections:
+        multiplier = section["multiplier"]
         if multiplier == 0.0:
             continue
+        squadrons = FLEET_SCANNER.squadrons(section["text"])
+        total_fighter_sq += len(squadrons["VFA"]) + len(squadrons["VMFA"])
+        total_ea_sq += len(squadrons["VAQ"])
+        total_ew_sq += len(squadrons["VAW"])
 
-        section_text = ""
-        for sibling in h2.find_next_siblings():
-            if sibling.name == "h2":
-                break
-            section_text += sibling.get_text(" ", strip=True) + " "
-
-        vfa_squadrons = set(re.findall(r"VFA[-\s]*\d+", section_text))
-        vmfa_squadrons = set(re.findall(r"VMFA[-\s]*\d+", section_text))
-        vaq_squadrons = set(re.findall(r"VAQ[-\s]*\d+", section_text))
-        vaw_squadrons = set(re.findall(r"VAW[-\s]*\d+", section_text))
-
-        total_fighter_sq += len(vfa_squadrons) + len(vmfa_squadrons)
-        total_ea_sq += len(vaq_squadrons)
-        total_ew_sq += len(vaw_squadrons)
-
-        pts = (
-            len(vfa_squadrons) * 6
-            + len(vmfa_squadrons) * 8
-            + len(vaq_squadrons) * 4
-            + len(vaw_squadrons) * 3
-        )
+        pts = sum(len(found) * SQUADRON_POINTS[prefix] for prefix, found in squadrons.items())
         total_air_pts += pts * multiplier
 
     carrier_air_risk = min(100, round((total_air_pts / 50) * 100))
@@ -930,6 +3029,81 @@ def _score_carrier_air(content_html, h2_regions_lower_relevant):
     }
 
 
+# Fleet Tracker score store: results keyed by article fingerprint
+FLEET_TRACKER_CACHE_FILE = os.path.join(CACHE_DIR, "fleet_tracker.json")
+FLEET_TRACKER_CACHE_MAX_ENTRIES = 20
+# Bump when the naval or carrier-air scoring changes so stored results are recomputed
+FLEET_SCORING_VERSION = 1
+
+
+def _fleet_tracker_key(guid, content_html):
+    """Fingerprint an article by GUID + sha256 of its content + scoring version."""
+    digest = hashlib.sha256(content_html.encode("utf-8")).hexdigest()
+    return f"v{FLEET_SCORING_VERSION}:{guid or ''}:{digest}"
+
+
+def _load_fleet_tracker_store():
+    try:
+        with open(FLEET_TRACKER_CACHE_FILE, "r") as f:
+            store = json.load(f)
+        if isinstance(store.get("entries"), dict):
+            return store
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": 1, "latest": None, "entries": {}}
+
+
+def _save_fleet_tracker_store(store):
+    try:
+        _write_atomic(FLEET_TRACKER_CACHE_FILE, json.dumps(store).encode("utf-8"))
+    except OSError as e:
+        print(f"    Fleet tracker store write failed: {e}")
+
+
+def fleet_tracker_latest():
+    """Return the most recently scored article entry, or None if the store is empty."""
+    if not _disk_caches_enabled():
+        return None
+    store = _load_fleet_tracker_store()
+    return store["entries"].get(store.get("latest"))
+
+
+def score_fleet_tracker(item):
+    """
+    Return (entry, from_store) for a Fleet Tracker feed item. An article whose
+    GUID and content are unchanged is served from the store without parsing;
+    otherwise it is parsed once, scored, and persisted as the latest entry.
+    """
+    content_html = item["content"]
+    key = _fleet_tracker_key(item.get("guid"), content_html)
+    store = _load_fleet_tracker_store() if _disk_caches_enabled() else {"entries": {}}
+    entry = store["entries"].get(key)
+    if entry is not None:
+        if store.get("latest") != key:
+            store["latest"] = key
+            _save_fleet_tracker_store(store)
+        return entry, True
+
+    sections = _parse_fleet_sections(content_html)
+    entry = {
+        "guid": item.get("guid"),
+        "title": item.get("title"),
+        "pub_date": item.get("pub_date"),
+        "scored_at": _cycle_now().isoformat(),
+        "naval": score_naval_force(content_html, sections),
+        "carrier_air": _score_carrier_air(sections),
+    }
+    store["entries"][key] = entry
+    store["latest"] = key
+    if len(store["entries"]) > FLEET_TRACKER_CACHE_MAX_ENTRIES:
+        by_age = sorted(store["entries"], key=lambda k: store["entries"][k]["scored_at"])
+        for old in by_age[: len(store["entries"]) - FLEET_TRACKER_CACHE_MAX_ENTRIES]:
+            del store["entries"][old]
+    if _disk_caches_enabled():
+        _save_fleet_tracker_store(store)
+    return entry, False
+
+
 def fetch_military_buildup(previous_data=None):
     """
     Fetch military buildup data from USNI Fleet Tracker RSS and Google News RSS.
@@ -945,88 +3119,57 @@ def fetch_military_buildup(previous_data=None):
         carrier_air_squadrons = 0
         article_title = None
         article_date = None
-        content_html = None
 
         # --- Source 1: USNI Fleet Tracker RSS ---
         print("  Fetching USNI Fleet Tracker RSS...")
         try:
-            usni_resp = make_request(
-                "https://news.usni.org/feed", timeout=25
-            )
-            if usni_resp and usni_resp.ok:
-                root = ET.fromstring(usni_resp.text)
-                ns_content = "{http://purl.org/rss/1.0/modules/content/}encoded"
-                for item in root.findall(".//item"):
-                    title_elem = item.find("title")
-                    if title_elem is None or title_elem.text is None:
+            usni_items, _ = fetch_feed_items("https://news.usni.org/feed", timeout=25)
+            if usni_items is not None:
+                fleet_item = None
+                for item in usni_items:
+                    t = item["title"]
+                    if t is None:
                         continue
-                    t = title_elem.text
                     if "fleet" in t.lower() and "tracker" in t.lower():
-                        content_elem = item.find(ns_content)
-                        if content_elem is not None and content_elem.text:
-                            content_html = content_elem.text
-                            article_title = t
-                            pub_elem = item.find("pubDate")
-                            article_date = pub_elem.text if pub_elem is not None else None
+                        if item["content"]:
+                            fleet_item = item
                         break
 
-                if content_html:
-                    naval_result = score_naval_force(content_html)
-                    print(f"    Article: {article_title}")
+                if fleet_item:
+                    entry, from_store = score_fleet_tracker(fleet_item)
+                    naval_result = entry["naval"]
+                    carrier_air_result = entry["carrier_air"]
+                    article_title = entry["title"]
+                    article_date = entry["pub_date"]
+                    print(f"    Article: {article_title}" + (" (unchanged, using stored scores)" if from_store else ""))
                     print(f"    Ships: {naval_result['total_ships_parsed']} parsed, {naval_result['counted_ships']} in CENTCOM")
                     print(f"    Points: {naval_result['total_weighted_points']}, Force Risk: {naval_result['force_risk']}%")
 
-                    # Build region multiplier map for carrier air scoring
-                    region_mults = {}
-                    soup_tmp = BeautifulSoup(content_html, "html.parser")
-                    for h2 in soup_tmp.find_all("h2"):
-                        rn = h2.get_text(strip=True).lower()
-                        if any(s in rn for s in ["ships underway", "search", "related"]):
-                            continue
-                        sec = ""
-                        for sib in h2.find_next_siblings():
-                            if sib.name == "h2":
-                                break
-                            sec += sib.get_text(" ", strip=True) + " "
-                        sl = sec.lower()
-                        m = 0.0
-                        for hr in HIGH_RELEVANCE_REGIONS:
-                            if hr in rn:
-                                m = 1.0
-                                break
-                        if m == 0.0:
-                            for cmr in CONDITIONAL_MEDIUM_REGIONS:
-                                if cmr in rn:
-                                    for tkw in TRANSIT_KEYWORDS_RE:
-                                        if re.search(tkw, sl):
-                                            m = 0.5
-                                            break
-                                    if m == 0.0:
-                                        for skw in STATION_KEYWORDS:
-                                            if skw in sl:
-                                                m = 0.4
-                                                break
-                                    break
-                        if m > 0:
-                            region_mults[rn] = m
-
-                    carrier_air_result = _score_carrier_air(content_html, region_mults)
                     carrier_air_risk = carrier_air_result["risk"]
                     carrier_air_squadrons = carrier_air_result["total_squadrons"]
                     print(f"    Carrier Air Risk: {carrier_air_risk}% ({carrier_air_result['fighter_squadrons']} fighter, {carrier_air_result['ea_squadrons']} EA, {carrier_air_result['ew_squadrons']} EW squadrons)")
                 else:
                     print("    No fleet tracker article found in RSS")
             else:
-                print(f"    USNI RSS fetch failed: {usni_resp.status_code if usni_resp else 'no response'}")
+                print("    USNI RSS fetch failed")
         except Exception as e:
             print(f"    USNI RSS error: {e}")
 
-        # Use previous data as fallback for naval scoring
-        if naval_result is None and previous_data:
-            naval_result = previous_data.get("force_posture")
-            carrier_air_risk = previous_data.get("carrier_air_risk", 0)
-            carrier_air_squadrons = previous_data.get("carrier_air_squadrons", 0)
-            print("    Using cached naval data from previous run")
+        # Fall back to the last scored article, then to the previous run's output
+        if naval_result is None:
+            latest = fleet_tracker_latest()
+            if latest is not None:
+                naval_result = latest["naval"]
+                carrier_air_risk = latest["carrier_air"]["risk"]
+                carrier_air_squadrons = latest["carrier_air"]["total_squadrons"]
+                article_title = latest["title"]
+                article_date = latest["pub_date"]
+                print(f"    Using stored scores for {article_title}")
+            elif previous_data:
+                naval_result = previous_data.get("force_posture")
+                carrier_air_risk = previous_data.get("carrier_air_risk", 0)
+                carrier_air_squadrons = previous_data.get("carrier_air_squadrons", 0)
+                print("    Using cached naval data from previous run")
 
         naval_force_risk = naval_result["force_risk"] if naval_result else 5
 
@@ -1043,23 +3186,21 @@ def fetch_military_buildup(previous_data=None):
                 "+deploy+OR+arrive+OR+send"
             )
             air_url = f"https://news.google.com/rss/search?q={air_query}&hl=en-US&gl=US&ceid=US:en"
-            air_resp = make_request(air_url, timeout=15)
-            if air_resp and air_resp.ok:
-                air_root = ET.fromstring(air_resp.text)
+            air_items, _ = fetch_feed_items(air_url, timeout=15)
+            if air_items is not None:
                 detected_platforms = {}
                 detected_bases = {}
 
-                for ni in air_root.findall(".//item")[:50]:
-                    te = ni.find("title")
-                    if te is None or te.text is None:
+                for ni in air_items[:50]:
+                    if ni["title"] is None:
                         continue
-                    tl = te.text.lower()
-                    for pkey, (pname, ppts) in AIR_PLATFORM_POINTS.items():
-                        if pkey in tl and pkey not in detected_platforms:
+                    terms = BUILDUP_NEWS_MATCHER.scan(ni["title"].lower())
+                    for pkey in terms["platform"]:
+                        if pkey not in detected_platforms:
+                            pname, ppts = AIR_PLATFORM_POINTS[pkey]
                             detected_platforms[pkey] = {"name": pname, "points": ppts}
-                    for bkey, bpts in AIR_BASE_POINTS.items():
-                        if bkey in tl:
-                            detected_bases[bkey] = detected_bases.get(bkey, 0) + 1
+                    for bkey in terms["base"]:
+                        detected_bases[bkey] = detected_bases.get(bkey, 0) + 1
 
                 categories_present = 0
                 categories_active = []
@@ -1116,33 +3257,25 @@ def fetch_military_buildup(previous_data=None):
                 "+OR+%22carrier%22+Iran+OR+%22Middle+East%22+OR+CENTCOM"
             )
             news_url = f"https://news.google.com/rss/search?q={news_query}&hl=en-US&gl=US&ceid=US:en"
-            news_resp = make_request(news_url, timeout=15)
-            if news_resp and news_resp.ok:
-                news_root = ET.fromstring(news_resp.text)
-                escalation_kw = ["buildup", "build-up", "strike option", "deadline", "warns", "critical level", "armada", "tensions"]
-                deployment_kw = ["deploy", "carrier", "arrives", "heading", "sailing", "ordered to", "strike group"]
+            news_items, _ = fetch_feed_items(news_url, timeout=15)
+            if news_items is not None:
                 article_count = 0
                 esc_count = 0
                 dep_count = 0
                 headlines = []
 
-                for ni in news_root.findall(".//item")[:50]:
-                    te = ni.find("title")
-                    if te is None or te.text is None:
+                for ni in news_items[:50]:
+                    if ni["title"] is None:
                         continue
-                    title_text = te.text
-                    tl = title_text.lower()
+                    title_text = ni["title"]
+                    terms = BUILDUP_NEWS_MATCHER.scan(title_text.lower())
                     article_count += 1
                     if len(headlines) < 5:
                         headlines.append(title_text)
-                    for kw in escalation_kw:
-                        if kw in tl:
-                            esc_count += 1
-                            break
-                    for kw in deployment_kw:
-                        if kw in tl:
-                            dep_count += 1
-                            break
+                    if terms["escalation"]:
+                        esc_count += 1
+                    if terms["deployment"]:
+                        dep_count += 1
 
                 deployment_news_risk = min(40, article_count * 3)
                 deployment_news_risk += min(36, esc_count * 6)
@@ -1213,7 +3346,7 @@ def fetch_military_buildup(previous_data=None):
             "deployment_news": news_data,
             "source_article": article_title,
             "source_date": article_date,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _cycle_now().isoformat(),
         }
 
         print(f"✓ Result: Risk {buildup_risk}%")
@@ -1263,7 +3396,7 @@ def fetch_weather_data():
                     "clouds": clouds,
                     "description": description,
                     "condition": condition,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _cycle_now().isoformat(),
                 }
         print("Weather: API error")
         return None
@@ -1356,7 +3489,7 @@ def fetch_oil_prices():
             "current_price": round(current_price, 2),
             "change_24h": round(change_24h, 2),
             "risk": risk,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _cycle_now().isoformat(),
         }
 
     except Exception as e:
@@ -1366,6 +3499,33 @@ def fetch_oil_prices():
         return None
 
 
+def _trends_interest_over_time(keywords):
+    """Last 7 days of US search interest for keywords, as a pytrends DataFrame."""
+    from pytrends.request import TrendReq
+
+    # Initialize pytrends with SSL verification disabled for corporate proxies
+    pytrends = TrendReq(
+        hl='en-US',
+        tz=360,
+        timeout=(10, 25),
+        requests_args={'verify': False}
+    )
+
+    # Build payload - get data from last 7 days
+    pytrends.build_payload(keywords, cat=0, timeframe='now 7-d', geo='US')
+    return pytrends.interest_over_time()
+
+
+def _frame_to_json(frame):
+    return json.loads(frame.to_json(orient="split", date_format="iso"))
+
+
+def _frame_from_json(value):
+    import pandas
+
+    return pandas.DataFrame(value["data"], index=pandas.to_datetime(value["index"]), columns=value["columns"])
+
+
 def fetch_google_trends():
     """Fetch Google Trends search interest for Iran-related terms"""
     try:
@@ -1373,24 +3533,15 @@ def fetch_google_trends():
         print("GOOGLE TRENDS")
         print("=" * 50)
 
-        from pytrends.request import TrendReq
-
-        # Initialize pytrends with SSL verification disabled for corporate proxies
-        pytrends = TrendReq(
-            hl='en-US', 
-            tz=360, 
-            timeout=(10, 25),
-            requests_args={'verify': False}
-        )
-
         # Keywords to track
         keywords = ["Iran war", "Iran strike", "Iran attack", "Iran nuclear", "Iran conflict"]
 
-        # Build payload - get data from last 7 days
-        pytrends.build_payload(keywords, cat=0, timeframe='now 7-d', geo='US')
-
         # Get interest over time
-        interest_df = pytrends.interest_over_time()
+        with Span("pytrends", "http"):
+            interest_df = _cassette_call(
+                "trends", _trends_interest_over_time, keywords,
+                encode=_frame_to_json, decode=_frame_from_json,
+            )
 
         if interest_df.empty:
             print("No Google Trends data available")
@@ -1452,7 +3603,7 @@ def fetch_google_trends():
             "peak_keyword": peak_keyword,
             "peak_value": int(peak_value),
             "risk": risk,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _cycle_now().isoformat(),
         }
 
     except Exception as e:
@@ -1507,12 +3658,332 @@ def calculate_tanker_risk(tanker):
         return 15
 
 
-def update_data_file():
-    """Save ALL data from all APIs to frontend/data.json file with history tracking"""
+# =============================================
+# FLEET TRACKER BACKFILL
+# =============================================
+
+BACKFILL_OUTPUT = os.path.join(CACHE_DIR, "fleet_tracker_backfill.json")
+BACKFILL_CHECKPOINT_EVERY = 50
+BACKFILL_COLUMNS = (
+    "date", "force_risk", "total_weighted_points", "total_ships_parsed", "counted_ships",
+    "carriers_in_centcom", "destroyers_in_centcom", "carrier_air_risk", "carrier_air_squadrons",
+)
+
+
+def _load_backfill_snapshots(source):
+    """
+    Read tracker snapshots as {date: html} from a JSON archive (same shape as
+    tests/fixtures/fleet_tracker_snapshots.json) or a directory of <date>.html files.
+    """
+    if os.path.isdir(source):
+        snapshots = {}
+        for name in sorted(os.listdir(source)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in (".html", ".htm"):
+                with open(os.path.join(source, name), "r", encoding="utf-8") as f:
+                    snapshots[stem] = f.read()
+        return snapshots
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _backfill_score(snapshot):
+    """Score one (date, html) snapshot in a pool worker. Returns a row dict, or (date, error)."""
+    date, content_html = snapshot
+    try:
+        sections = _parse_fleet_sections(content_html)
+        naval = score_naval_force(content_html, sections)
+        carrier_air = _score_carrier_air(sections)
+    except Exception as e:
+        return date, f"{type(e).__name__}: {e}"
+    row = {column: naval.get(column) for column in BACKFILL_COLUMNS}
+    row["date"] = date
+    row["carrier_air_risk"] = carrier_air["risk"]
+    row["carrier_air_squadrons"] = carrier_air["total_squadrons"]
+    return row
+
+
+def _read_backfill_rows(path):
+    """Rows already written to a backfill file, keyed by date; empty if none."""
+    try:
+        with open(path, "r") as f:
+            columns = json.load(f)["columns"]
+        return {
+            row["date"]: row
+            for row in (dict(zip(BACKFILL_COLUMNS, values)) for values in zip(*(columns[c] for c in BACKFILL_COLUMNS)))
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _write_backfill_rows(path, rows):
+    """Write rows sorted by date as one list per column."""
+    ordered = [rows[date] for date in sorted(rows)]
+    columns = {column: [row[column] for row in ordered] for column in BACKFILL_COLUMNS}
+    _write_atomic(path, json.dumps({"version": 1, "rows": len(ordered), "columns": columns},
+                                   separators=(",", ":")).encode("utf-8"))
+
+
+def backfill_fleet_tracker(source, output=None, workers=None):
+    """
+    Score archived Fleet Tracker snapshots across a process pool and write the
+    dated force-posture series to a columnar JSON file. Dates already present in
+    the output are skipped, and progress is checkpointed every
+    BACKFILL_CHECKPOINT_EVERY articles, so an interrupted run resumes where it stopped.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    output = output or BACKFILL_OUTPUT
+    snapshots = _load_backfill_snapshots(source)
+    rows = _read_backfill_rows(output)
+    pending = [(date, html) for date, html in sorted(snapshots.items()) if date not in rows and html]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    print(f"Backfill: {len(snapshots)} snapshots, {len(rows)} already scored, {len(pending)} to score on {workers} workers")
+
+    failed = {}
+    started = time.perf_counter()
+    if pending:
+        chunksize = max(1, min(16, len(pending) // (workers * 4)))
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            since_checkpoint = 0
+            for result in pool.map(_backfill_score, pending, chunksize=chunksize):
+                if isinstance(result, tuple):
+                    failed[result[0]] = result[1]
+                    continue
+                rows[result["date"]] = result
+                since_checkpoint += 1
+                if since_checkpoint >= BACKFILL_CHECKPOINT_EVERY:
+                    _write_backfill_rows(output, rows)
+                    since_checkpoint = 0
+    _write_backfill_rows(output, rows)
+    elapsed = time.perf_counter() - started
+
+    scored = len(pending) - len(failed)
+    rate = scored / elapsed if elapsed > 0 else 0.0
+    print(f"  Scored {scored} articles in {elapsed:.1f}s ({rate:.1f} articles/sec), {len(rows)} rows in {output}")
+    for date, error in sorted(failed.items()):
+        print(f"  Failed {date}: {error}")
+    return {"scored": scored, "skipped": len(snapshots) - len(pending), "failed": len(failed),
+            "seconds": round(elapsed, 3), "articles_per_sec": round(rate, 1)}
+
+
+# =============================================
+# CONCURRENT FETCH ORCHESTRATION
+# =============================================
+
+FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", "8"))
+
+# Wall-clock budget per source in seconds, counted from when the source starts.
+# A source that misses its deadline is abandoned for this run and its last
+# known value (from the previous data.json) is used instead.
+FETCH_DEADLINES = {
+    "pentagon": 150,
+    "polymarket": 30,
+    "news": 240,
+    "oil": 25,
+    "trends": 60,
+    "opensky": 30,
+    "weather": 15,
+    "buildup": 90,
+}
+FETCH_DEFAULT_DEADLINE = 60
+
+
+def _last_known_values(current_data):
+    """Map each fetch source to the raw value it produced on the previous run."""
+
+    def raw(key):
+        section = current_data.get(key)
+        return section.get("raw_data") if isinstance(section, dict) else None
+
+    return {
+        "pentagon": raw("pentagon"),
+        "polymarket": raw("polymarket"),
+        "news": raw("news"),
+        "oil": raw("oil"),
+        "trends": raw("trends"),
+        "opensky": (raw("flight"), raw("tanker")),
+        "weather": raw("weather"),
+        "buildup": raw("buildup"),
+    }
+
+
+def run_fetchers(jobs, fallbacks=None, max_workers=FETCH_MAX_WORKERS, deadlines=None, span=None):
+    """
+    Run independent fetchers concurrently on a bounded pool of daemon threads.
+    jobs maps source name -> zero-argument callable. Each source gets its own
+    wall-clock deadline; one that misses it (or raises) yields its fallback.
+    A worker stuck on an abandoned source is replaced so queued sources still run.
+    Each fetcher runs in a "fetch" Span whose parent is span, if given.
+
+    Returns (results, stats) where stats maps name -> {"seconds", "status"}.
+    """
+    fallbacks = fallbacks or {}
+    deadlines = deadlines or FETCH_DEADLINES
+    pending = list(jobs.items())
+    started = {}
+    finished = {}
+    cond = threading.Condition()
+
+    def worker():
+        while True:
+            with cond:
+                if not pending:
+                    return
+                name, fn = pending.pop(0)
+                started[name] = time.monotonic()
+                cond.notify_all()
+            try:
+                with Span(name, "fetch", parent=span):
+                    value, status = fn(), "ok"
+            except Exception as e:
+                print(f"  {name} fetch crashed: {e}")
+                value, status = fallbacks.get(name), "error"
+            with cond:
+                if name in finished:
+                    # Abandoned after its deadline; a replacement worker took over.
+                    return
+                finished[name] = (value, status, time.monotonic() - started[name])
+                cond.notify_all()
+
+    def spawn():
+        threading.Thread(target=worker, name="fetch-worker", daemon=True).start()
+
+    with cond:
+        for _ in range(min(max_workers, len(pending))):
+            spawn()
+        while len(finished) < len(jobs):
+            now = time.monotonic()
+            next_deadline = None
+            for name, t0 in started.items():
+                if name in finished:
+                    continue
+                deadline = t0 + deadlines.get(name, FETCH_DEFAULT_DEADLINE)
+                if now >= deadline:
+                    print(f"  {name} missed its {deadline - t0:.0f}s deadline — using last known value")
+                    finished[name] = (fallbacks.get(name), "timeout", now - t0)
+                    if pending:
+                        spawn()
+                elif next_deadline is None or deadline < next_deadline:
+                    next_deadline = deadline
+            if len(finished) < len(jobs):
+                cond.wait(timeout=None if next_deadline is None else next_deadline - now)
+
+    results = {name: finished[name][0] for name in jobs}
+    stats = {
+        name: {"seconds": round(finished[name][2], 2), "status": finished[name][1]}
+        for name in jobs
+    }
+    return results, stats
+
+
+# =============================================
+# PER-SOURCE REFRESH SCHEDULE
+# =============================================
+
+# (refresh interval, jitter) in seconds per source. Markets move in minutes;
+# expensive or rate-limited sources (Selenium, pytrends, DeBERTa, OpenSky's
+# anonymous credit budget) and slow-changing ones refresh less often.
+SOURCE_SCHEDULE = {
+    "polymarket": (300, 30),
+    "opensky": (900, 60),
+    "oil": (900, 60),
+    "news": (1800, 120),
+    "pentagon": (1800, 120),
+    "buildup": (3600, 300),
+    "trends": (3600, 300),
+    "weather": (10800, 600),
+}
+
+# OpenSky window counts cover the current and the previous poll (at most
+# interval + jitter ago) but not the one before (at least 2 * (interval - jitter)
+# ago): the window ends halfway between the two.
+TRACK_WINDOW_SECONDS = (3 * SOURCE_SCHEDULE["opensky"][0] - SOURCE_SCHEDULE["opensky"][1]) // 2
+
+# Signal sparklines keep one point per this many seconds; refreshes in between
+# overwrite the latest point instead of appending a new one.
+HISTORY_INTERVAL_SECONDS = 1800
+
+
+def _source_fetched_at(name, raw):
+    """Epoch seconds at which a source's raw value was fetched, or None if unknown."""
+    if name == "opensky":
+        raw = raw[0] if raw else None
+    timestamp = raw.get("timestamp") if isinstance(raw, dict) else None
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def next_refresh_at(name, fetched_at):
+    """When a source fetched at fetched_at is next due, with random jitter applied."""
+    interval, jitter = SOURCE_SCHEDULE.get(name, (0, 0))
+    return fetched_at + interval + random.uniform(-jitter, jitter)
+
+
+def due_sources(last_known, now=None):
+    """
+    Sources whose last value is older than their refresh interval. The jitter
+    doubles as slack so a source is not skipped by a cron tick that fires early.
+    """
+    now = now or time.time()
+    due = []
+    for name, (interval, jitter) in SOURCE_SCHEDULE.items():
+        fetched_at = _source_fetched_at(name, last_known.get(name))
+        if fetched_at is None or now - fetched_at >= interval - jitter:
+            due.append(name)
+    return due
+
+
+def _stamp_fetch_start(value, stamp):
+    """
+    Copy of a fetched value with its "timestamp" set to when the fetch started.
+    Fetchers stamp when they finish, and a slow fetch (news runs DeBERTa) would
+    otherwise not be due again at the next tick of a cron matching its interval.
+    """
+    if isinstance(value, tuple):
+        return tuple(_stamp_fetch_start(v, stamp) for v in value)
+    if isinstance(value, dict) and "timestamp" in value:
+        return {**value, "timestamp": stamp}
+    return value
+
+
+def _has_value(value):
+    if isinstance(value, tuple):
+        return any(value)
+    return bool(value)
+
+
+# Keys that change on every fetch without the input itself changing: when it was
+# fetched, and per-run classifier telemetry (latencies, cache hits)
+VOLATILE_KEYS = ("timestamp", "escalation_stages")
+
+
+def _without_timestamps(value):
+    """Strip VOLATILE_KEYS so refreshed-but-identical values compare equal."""
+    if isinstance(value, dict):
+        return {k: _without_timestamps(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_without_timestamps(v) for v in value]
+    return value
+
+
+def update_data_file(sources=None, skip_unchanged=False):
+    """
+    Save ALL data from all APIs to frontend/data.json file with history tracking.
+    Only sources in `sources` (default: those due per SOURCE_SCHEDULE) are fetched;
+    the rest keep their last known value. With skip_unchanged, nothing is written
+    unless a fetched value actually changed.
+    """
+    scoring = None
     try:
-        # Get existing data (to preserve history)
+        # Get existing data (to preserve history). Record/replay cycles start from
+        # an empty history so their output depends on the cassette alone.
         output_file = OUTPUT_FILE
-        if os.path.exists(output_file):
+        if _cassette is None and os.path.exists(output_file):
             try:
                 with open(output_file, "r") as f:
                     current_data = json.load(f)
@@ -1554,52 +4025,116 @@ def update_data_file():
                 },
             )
 
-        # Fetch Pentagon data
-        pentagon_data = fetch_pentagon_data()
+        # Fetch the due sources concurrently; each has its own deadline and falls
+        # back to the previous run's value if it does not finish in time.
+        # Sources that are not due keep their last known value.
+        last_known = _last_known_values(current_data)
+        seed_signal_freshness(last_known)
+        previous_buildup = last_known["buildup"]
+        jobs = {
+            "pentagon": fetch_pentagon_data,
+            "polymarket": fetch_polymarket_odds,
+            "news": fetch_news_intel,
+            "oil": fetch_oil_prices,
+            "trends": fetch_google_trends,
+            "opensky": fetch_opensky_data,
+            "weather": fetch_weather_data,
+            "buildup": lambda: fetch_military_buildup(previous_data=previous_buildup),
+        }
+        if sources is None:
+            sources = due_sources(last_known)
+        skipped = [name for name in jobs if name not in sources]
+        if skipped:
+            print(f"Not due this cycle (keeping last known value): {', '.join(skipped)}")
+        cycle_started = time.perf_counter()
+        fetch_started_at = _cycle_now().isoformat()
+        begin_run()
+        with Span("fetch", "cycle") as fetch_span:
+            fetched, fetch_stats = run_fetchers(
+                {name: fn for name, fn in jobs.items() if name in sources},
+                fallbacks=last_known,
+                span=fetch_span,
+            )
+        for name, stat in fetch_stats.items():
+            if stat["status"] == "ok":
+                fetched[name] = _stamp_fetch_start(fetched[name], fetch_started_at)
+        for name, stat in fetch_stats.items():
+            if stat["status"] != "ok":
+                result = "timeout" if stat["status"] == "timeout" else "failure"
+            else:
+                result = "success" if _has_value(fetched[name]) else "failure"
+            observe_fetch(name, stat["seconds"], result)
+        scoring = Span("score", "cycle").start()
+        changed = [
+            name
+            for name, value in fetched.items()
+            if _has_value(value)
+            and _without_timestamps(value) != _without_timestamps(last_known[name])
+        ]
+        for name in skipped:
+            fetched[name] = last_known[name]
+
+        print("\n" + "=" * 50)
+        print("FETCH TIMINGS")
+        print("=" * 50)
+        for name, stat in fetch_stats.items():
+            print(f"  {name:<11} {stat['seconds']:7.2f}s  {stat['status']}")
+
+        if skip_unchanged and not changed:
+            print("No inputs changed, keeping existing data file")
+            scoring.finish("skipped")
+            write_run_report(fetch_stats, os.path.dirname(output_file))
+            observe_cycle(time.perf_counter() - cycle_started)
+            if METRICS_TEXTFILE:
+                write_metrics_textfile(METRICS_TEXTFILE)
+            return True
+        print(f"Changed inputs: {', '.join(changed) if changed else 'none'}")
+
+        # Pentagon data
+        pentagon_data = fetched["pentagon"] or {}
         current_data["pentagon"] = pentagon_data
-        current_data["pentagon_updated"] = datetime.now().isoformat()
+        if "pentagon" in sources:
+            current_data["pentagon_updated"] = _cycle_now().isoformat()
 
-        # Fetch and update Polymarket odds
-        polymarket_data = fetch_polymarket_odds()
+        # Polymarket odds
+        polymarket_data = fetched["polymarket"]
         if polymarket_data:
             current_data["polymarket"] = polymarket_data
 
-        # Fetch and update News Intel (server-side, no CORS issues!)
-        news_data = fetch_news_intel()
+        # News Intel (server-side, no CORS issues!)
+        news_data = fetched["news"]
         if news_data:
             current_data["news_intel"] = news_data
 
-
         # Oil prices
-        oil_data = fetch_oil_prices()
+        oil_data = fetched["oil"]
         if oil_data:
             current_data["oil"] = oil_data
 
         # Google Trends search interest
-        trends_data = fetch_google_trends()
+        trends_data = fetched["trends"]
         if trends_data:
             current_data["trends"] = trends_data
 
         # Aviation + Tanker data (single OpenSky call)
-        aviation_data, tanker_data = fetch_opensky_data()
+        aviation_data, tanker_data = fetched["opensky"] or (None, None)
         if aviation_data:
             current_data["aviation"] = aviation_data
         if tanker_data:
             current_data["tanker"] = tanker_data
 
         # Weather data
-        weather_data = fetch_weather_data()
+        weather_data = fetched["weather"]
         if weather_data:
             current_data["weather"] = weather_data
 
         # Military Buildup (USNI Fleet Tracker + Google News)
-        previous_buildup = current_data.get("buildup", {}).get("raw_data")
-        buildup_data = fetch_military_buildup(previous_data=previous_buildup)
+        buildup_data = fetched["buildup"]
         if buildup_data:
             current_data["buildup_raw"] = buildup_data
 
         # Add main timestamp
-        current_data["last_updated"] = datetime.now().isoformat()
+        current_data["last_updated"] = _cycle_now().isoformat()
 
         # Calculate ALL risk scores and display values (NO CALCULATIONS IN FRONTEND!)
         # All calculations moved here to ensure history matches current display
@@ -1724,16 +4259,31 @@ def update_data_file():
 
         total_risk = min(100, max(0, round(total_risk)))
 
-        # Update signal histories (keep last 20 points per signal)
-        signal_history["news"].append(news_display_risk)
-        signal_history["flight"].append(flight_risk)
-        signal_history["tanker"].append(tanker_risk)
-        signal_history["pentagon"].append(pentagon_display_risk)
-        signal_history["polymarket"].append(polymarket_display_risk)
-        signal_history["weather"].append(weather_risk)
-        signal_history["oil"].append(oil_risk)
-        signal_history["trends"].append(trends_risk)
-        signal_history["buildup"].append(buildup_risk)
+        # Update signal histories (keep last 20 points per signal). A new point is
+        # appended once per HISTORY_INTERVAL_SECONDS; refreshes of fast sources in
+        # between overwrite the latest point.
+        now_ms = int(_cycle_now().timestamp() * 1000)
+        signal_history_updated = current_data.get("total_risk", {}).get("signal_history_updated", 0)
+        append_point = now_ms - signal_history_updated >= (HISTORY_INTERVAL_SECONDS - 60) * 1000
+        if append_point:
+            signal_history_updated = now_ms
+        latest_points = {
+            "news": news_display_risk,
+            "flight": flight_risk,
+            "tanker": tanker_risk,
+            "pentagon": pentagon_display_risk,
+            "polymarket": polymarket_display_risk,
+            "weather": weather_risk,
+            "oil": oil_risk,
+            "trends": trends_risk,
+            "buildup": buildup_risk,
+        }
+        for sig, value in latest_points.items():
+            points = signal_history.setdefault(sig, [])
+            if append_point or not points:
+                points.append(value)
+            else:
+                points[-1] = value
 
         # Keep only last 20 points
         for sig in signal_history:
@@ -1744,7 +4294,7 @@ def update_data_file():
         # - Runs every 30 minutes
         # - If 12am/12pm boundary NOT crossed: update the last point
         # - If 12am/12pm boundary crossed: remove first, pin last at boundary, add new now point
-        now = datetime.now()
+        now = _cycle_now()
         current_timestamp = int(now.timestamp() * 1000)
 
         # Get the most recent 12am or 12pm boundary
@@ -1844,6 +4394,7 @@ def update_data_file():
                 "risk": total_risk,
                 "history": history,
                 "elevated_count": elevated_count,
+                "signal_history_updated": signal_history_updated,
             },
             "last_updated": current_data["last_updated"],
         }
@@ -1857,12 +4408,28 @@ def update_data_file():
         print(f"Total Risk: {total_risk}%")
 
         # Save to file
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
         with open(output_file, "w") as f:
             json.dump(current_data, f, indent=2)
         print(f"\u2713 Data saved to {output_file}")
         print(f"  File size: {os.path.getsize(output_file)} bytes")
         print(f"  History points: {len(history)}")
+        scoring.finish()
+        print_run_spans()
+        write_run_report(fetch_stats, os.path.dirname(output_file))
+        observe_cycle(time.perf_counter() - cycle_started, total_risk, latest_points)
+        if METRICS_TEXTFILE:
+            write_metrics_textfile(METRICS_TEXTFILE)
+
+        print("\n" + "=" * 50)
+        print("HTTP HOSTS")
+        print("=" * 50)
+        for host, stats in sorted(http_stats(reset=True).items()):
+            avg_ms = stats["seconds"] / stats["requests"] * 1000
+            print(
+                f"  {host:<32} {stats['requests']:3d} req  {stats['bytes'] / 1024:8.1f} KB  "
+                f"{avg_ms:7.0f} ms avg  {stats['errors']} err"
+            )
         return True
 
     except Exception as e:
@@ -1870,7 +4437,14 @@ def update_data_file():
         import traceback
 
         traceback.print_exc()
+        if scoring is not None:
+            scoring.finish("error")
+        write_run_report()
         return False
+    finally:
+        # An open span stays in _open_spans and keeps collecting traced peaks
+        if scoring is not None:
+            scoring.finish("error")
 
 
 def fetch_pentagon_data():
@@ -1885,7 +4459,8 @@ def fetch_pentagon_data():
     is_weekend = et.weekday() >= 5
 
     print(f"  Scraping {len(PIZZA_PLACES)} pizza places via Google Maps...")
-    scraped = _scrape_live_busyness_batch(PIZZA_PLACES)
+    with Span("selenium scrape", "browser"):
+        scraped = _cassette_call("busyness", _scrape_live_busyness_batch, PIZZA_PLACES)
 
     live_scores = {}
     for name, data in scraped.items():
@@ -1931,7 +4506,7 @@ def fetch_pentagon_data():
         "source": source,
         "live_scores": live_scores if is_live else None,
         "hour_et": hour,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _cycle_now().isoformat(),
         "is_late_night": is_late_night,
         "is_weekend": is_weekend,
     }
@@ -1942,9 +4517,572 @@ def fetch_pentagon_data():
     return pentagon_data
 
 
+# =============================================
+# METRICS (OpenMetrics / Prometheus text)
+# =============================================
+
+# Served from memory at /metrics by the daemon's health server, and optionally
+# written after every cycle for node_exporter's textfile collector.
+METRICS_PREFIX = "aegis"
+METRICS_TEXTFILE = os.environ.get("METRICS_TEXTFILE") or None
+FETCH_DURATION_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Signals fed by each fetch source (opensky produces two)
+SOURCE_SIGNALS = {"opensky": ("flight", "tanker")}
+
+def _empty_metrics():
+    return {
+        "fetch_buckets": {},       # source -> cumulative counts per FETCH_DURATION_BUCKETS + [+Inf]
+        "fetch_sum": {},           # source -> total seconds
+        "fetch_results": {},       # (source, result) -> count
+        "signal_last_success": {}, # signal -> epoch seconds of the last good value
+        "signal_risk": {},         # signal -> displayed risk
+        "total_risk": None,
+        "cycles": 0,
+        "cycle_seconds": None,
+        "classifier_headlines": 0,
+        "classifier_seconds": 0.0,
+        "classifier_cache_hits": 0,
+    }
+
+
+_metrics_lock = threading.Lock()
+_metrics = _empty_metrics()
+
+
+def observe_fetch(source, seconds, result, fetched_at=None):
+    """Record one fetch: duration, result ("success", "failure" or "timeout") and freshness."""
+    with _metrics_lock:
+        buckets = _metrics["fetch_buckets"].setdefault(source, [0] * (len(FETCH_DURATION_BUCKETS) + 1))
+        for i, bound in enumerate(FETCH_DURATION_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        buckets[-1] += 1
+        _metrics["fetch_sum"][source] = _metrics["fetch_sum"].get(source, 0.0) + seconds
+        key = (source, result)
+        _metrics["fetch_results"][key] = _metrics["fetch_results"].get(key, 0) + 1
+        if result == "success":
+            fetched_at = fetched_at or time.time()
+            for signal in SOURCE_SIGNALS.get(source, (source,)):
+                _metrics["signal_last_success"][signal] = fetched_at
+
+
+def seed_signal_freshness(last_known):
+    """Take last-good times from the data file for signals not fetched yet in this process."""
+    with _metrics_lock:
+        for source, raw in last_known.items():
+            fetched_at = _source_fetched_at(source, raw)
+            if fetched_at is None:
+                continue
+            for signal in SOURCE_SIGNALS.get(source, (source,)):
+                _metrics["signal_last_success"].setdefault(signal, fetched_at)
+
+
+def observe_classifier(headlines, seconds, cache_hits):
+    with _metrics_lock:
+        _metrics["classifier_headlines"] += headlines
+        _metrics["classifier_seconds"] += seconds
+        _metrics["classifier_cache_hits"] += cache_hits
+
+
+def observe_cycle(seconds, total_risk=None, signal_risk=None):
+    with _metrics_lock:
+        _metrics["cycles"] += 1
+        _metrics["cycle_seconds"] = seconds
+        if total_risk is not None:
+            _metrics["total_risk"] = total_risk
+        if signal_risk:
+            _metrics["signal_risk"].update(signal_risk)
+
+
+def _metric_labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+
+
+def render_metrics(openmetrics=True):
+    """
+    Current metrics as OpenMetrics text (openmetrics=True) or Prometheus text
+    format 0.0.4. The two differ only in counter TYPE names and the # EOF marker.
+    """
+    now = time.time()
+    with _metrics_lock:
+        m = {k: (dict(v) if isinstance(v, dict) else v) for k, v in _metrics.items()}
+    p = METRICS_PREFIX
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        type_name = name if openmetrics or kind != "counter" else f"{name}_total"
+        lines.append(f"# HELP {type_name} {help_text}")
+        lines.append(f"# TYPE {type_name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_metric_labels(**labels)} {value}")
+
+    samples = []
+    for source, buckets in sorted(m["fetch_buckets"].items()):
+        for bound, count in zip(FETCH_DURATION_BUCKETS, buckets):
+            samples.append(("_bucket", {"source": source, "le": str(bound)}, count))
+        samples.append(("_bucket", {"source": source, "le": "+Inf"}, buckets[-1]))
+        samples.append(("_count", {"source": source}, buckets[-1]))
+        samples.append(("_sum", {"source": source}, round(m["fetch_sum"][source], 4)))
+    family(f"{p}_fetch_duration_seconds", "histogram", "Wall time of each source fetch.", samples)
+
+    family(f"{p}_fetch", "counter", "Source fetches by result (success, failure, timeout).", [
+        ("_total", {"source": source, "result": result}, count)
+        for (source, result), count in sorted(m["fetch_results"].items())
+    ])
+    family(f"{p}_signal_last_success_timestamp_seconds", "gauge", "When each signal last got a good value.", [
+        ("", {"signal": signal}, round(at, 3)) for signal, at in sorted(m["signal_last_success"].items())
+    ])
+    family(f"{p}_signal_age_seconds", "gauge", "Age of the last good value of each signal.", [
+        ("", {"signal": signal}, round(now - at, 3)) for signal, at in sorted(m["signal_last_success"].items())
+    ])
+    family(f"{p}_signal_risk", "gauge", "Displayed risk of each signal (0-100).", [
+        ("", {"signal": signal}, risk) for signal, risk in sorted(m["signal_risk"].items())
+    ])
+    family(f"{p}_total_risk", "gauge", "Combined strike risk (0-100).",
+           [("", {}, m["total_risk"])] if m["total_risk"] is not None else [])
+    family(f"{p}_cycles", "counter", "Completed update cycles.", [("_total", {}, m["cycles"])])
+    family(f"{p}_cycle_duration_seconds", "gauge", "Wall time of the last update cycle.",
+           [("", {}, round(m["cycle_seconds"], 4))] if m["cycle_seconds"] is not None else [])
+    family(f"{p}_classifier_headlines", "counter", "Headlines scored by the escalation model.",
+           [("_total", {}, m["classifier_headlines"])])
+    family(f"{p}_classifier_seconds", "counter", "Time spent in the escalation model; headlines/seconds is throughput.",
+           [("_total", {}, round(m["classifier_seconds"], 4))])
+    family(f"{p}_classifier_cache_hits", "counter", "Headlines served from the escalation score cache.",
+           [("_total", {}, m["classifier_cache_hits"])])
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_textfile(path):
+    """Write Prometheus text format for node_exporter's textfile collector (atomic rename)."""
+    try:
+        _write_atomic(path, render_metrics(openmetrics=False).encode("utf-8"))
+    except OSError as e:
+        print(f"Metrics textfile write failed: {e}")
+
+
+# =============================================
+# DAEMON MODE
+# =============================================
+
+DAEMON_HEALTH_PORT = 8765
+# Unhealthy once no update cycle has succeeded for this long
+DAEMON_STALE_AFTER = 3600
+# Upper bound on how long the scheduler sleeps between checks
+DAEMON_MAX_SLEEP = 60
+
+# Cycle bookkeeping exposed by the /healthz endpoint
+_daemon_state = {
+    "started_at": None,
+    "cycles": 0,
+    "in_cycle": False,
+    "last_cycle_ok": None,
+    "last_cycle_seconds": None,
+    "last_cycle_sources": [],
+    "last_cycle_finished": None,
+    "last_success": None,
+    "next_due": {},
+}
+
+
+def _daemon_health():
+    """Return (healthy, status dict). Unhealthy once no cycle succeeded for DAEMON_STALE_AFTER."""
+    now = time.time()
+    state = dict(_daemon_state)
+    last_good = state["last_success"] or state["started_at"] or now
+    healthy = now - last_good <= DAEMON_STALE_AFTER
+    state["status"] = "ok" if healthy else "stale"
+    state["seconds_since_success"] = round(now - last_good, 1)
+    return healthy, state
+
+
+def _start_health_server(port):
+    """Serve GET /healthz, /metrics and /tracks on localhost from a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path == "/metrics":
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = render_metrics(openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    "application/openmetrics-text; version=1.0.0; charset=utf-8" if openmetrics
+                    else "text/plain; version=0.0.4; charset=utf-8",
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if path == "/tracks":
+                # ?minutes=22 (default TRACK_WINDOW_SECONDS), ?kind=civil|tanker, ?icao24=ae1234
+                from urllib.parse import parse_qs
+
+                query = parse_qs(urlsplit(self.path).query)
+                try:
+                    minutes = float(query.get("minutes", [TRACK_WINDOW_SECONDS / 60])[0])
+                except ValueError:
+                    self.send_error(400)
+                    return
+                kind = {"civil": TRACK_CIVIL, "tanker": TRACK_TANKER}.get(query.get("kind", [""])[0])
+                tracks = recent_opensky_tracks(time.time() - minutes * 60, kind, query.get("icao24", [None])[0])
+                body = json.dumps({"tracks": tracks}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if path != "/healthz":
+                self.send_error(404)
+                return
+            healthy, state = _daemon_health()
+            body = json.dumps(state).encode("utf-8")
+            self.send_response(200 if healthy else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), HealthHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    print(f"Health check: http://127.0.0.1:{port}/healthz, metrics: http://127.0.0.1:{port}/metrics, "
+          f"tracks: http://127.0.0.1:{port}/tracks")
+    return server
+
+
+def _warm_up():
+    """Load the heavy per-process resources up front so cycles only pay fetch + inference."""
+    started = time.monotonic()
+    if INFERENCE_WORKER == "process":
+        start_inference_worker()
+        print("  Inference worker started (loading the classifier in the background)")
+    else:
+        try:
+            _get_escalation_scorer()
+            if ESCALATION_MODE == "cascade":
+                _get_cascade_scorer()
+            print(f"  Escalation classifier loaded ({time.monotonic() - started:.1f}s)")
+        except Exception as e:
+            print(f"  Escalation classifier unavailable: {e}")
+    started = time.monotonic()
+    with _chrome_lock:
+        if _acquire_chrome_driver() is not None:
+            print(f"  Chrome driver started ({time.monotonic() - started:.1f}s)")
+
+
+def _load_last_known():
+    """Last known raw value per source from the current data file."""
+    try:
+        with open(OUTPUT_FILE, "r") as f:
+            return _last_known_values(json.load(f))
+    except (OSError, ValueError):
+        return _last_known_values({})
+
+
+def run_daemon(health_port=DAEMON_HEALTH_PORT):
+    """
+    Stay resident and refresh each source on its own SOURCE_SCHEDULE cadence,
+    keeping the classifier, Chrome and HTTP connections warm between cycles.
+    The combined score is recomputed whenever a refreshed input changes.
+    SIGINT/SIGTERM finish the current cycle and exit; a second signal exits immediately.
+    """
+    import signal
+
+    global KEEP_BROWSER_WARM
+    KEEP_BROWSER_WARM = True
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            raise SystemExit(1)
+        print(f"\nReceived signal {signum}, shutting down after the current cycle...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    _daemon_state["started_at"] = time.time()
+    server = _start_health_server(health_port) if health_port else None
+
+    print("Warming up resident resources...")
+    _warm_up()
+
+    # Seed the schedule from the data file so a restart does not refetch everything
+    last_known = _load_last_known()
+    now = time.time()
+    next_due = {}
+    for name in SOURCE_SCHEDULE:
+        fetched_at = _source_fetched_at(name, last_known.get(name))
+        next_due[name] = now if fetched_at is None else next_refresh_at(name, fetched_at)
+
+    try:
+        while not stop.is_set():
+            now = time.time()
+            due = [name for name, at in next_due.items() if at <= now]
+            if due:
+                print(f"\nUpdating {', '.join(due)} - {datetime.now().isoformat()}")
+                started = time.monotonic()
+                _daemon_state["in_cycle"] = True
+                ok = update_data_file(sources=due, skip_unchanged=True)
+                elapsed = time.monotonic() - started
+                finished = time.time()
+                for name in due:
+                    next_due[name] = next_refresh_at(name, finished)
+                _daemon_state.update(
+                    in_cycle=False,
+                    cycles=_daemon_state["cycles"] + 1,
+                    last_cycle_ok=ok,
+                    last_cycle_seconds=round(elapsed, 1),
+                    last_cycle_sources=due,
+                    last_cycle_finished=finished,
+                    next_due={name: round(at) for name, at in next_due.items()},
+                )
+                if ok:
+                    _daemon_state["last_success"] = finished
+                print(f"Cycle finished in {elapsed:.1f}s.")
+            sleep_for = min(next_due.values()) - time.time()
+            stop.wait(min(DAEMON_MAX_SLEEP, max(1, sleep_for)))
+    finally:
+        print("Stopping daemon...")
+        if server is not None:
+            server.shutdown()
+        with _chrome_lock:
+            _close_chrome_driver()
+        stop_inference_worker()
+
+
+# =============================================
+# IMPORT PROFILE
+# =============================================
+
+# Dependencies that load on demand, and the sources that need them
+LAZY_DEPENDENCIES = {
+    "requests": "all HTTP sources",
+    "bs4": "buildup (Fleet Tracker HTML)",
+    "selenium": "pentagon (live busyness)",
+    "pytrends.request": "trends",
+    "numpy": "news (escalation scoring)",
+    "transformers": "news (escalation scoring)",
+    "torch": "news (escalation scoring)",
+    "onnxruntime": "news (ESCALATION_BACKEND=onnx)",
+}
+
+
+def _import_times(statement):
+    """
+    Run statement in a fresh interpreter under -X importtime. Returns the wall
+    time in ms and {top-level module: (cumulative ms, [(cumulative ms, direct import)])}.
+    """
+    import subprocess
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else statement)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((len(name) - len(name.lstrip()), int(cumulative) / 1000, name.strip()))
+
+    # A module's line follows the lines of everything it imported
+    top_depth = min((depth for depth, _, _ in entries), default=0)
+    modules, children = {}, []
+    for depth, ms, name in entries:
+        if depth == top_depth:
+            modules[name] = (ms, children)
+            children = []
+        elif depth == top_depth + 2:
+            children.append((ms, name))
+    return wall_ms, modules
+
+
+def import_profile(top=10):
+    """Print the import cost of update_data itself and of each lazily loaded dependency."""
+    wall_ms, modules = _import_times("import update_data")
+    own_ms, children = modules.get("update_data", (0.0, []))
+    print(f"import update_data: {own_ms:.1f} ms (interpreter start + import {wall_ms:.0f} ms wall)")
+    print("  Slowest modules it imports:")
+    for ms, name in sorted(children, reverse=True)[:top]:
+        print(f"    {name:<28} {ms:8.1f} ms")
+
+    print("Lazily loaded dependencies (cost in a fresh interpreter, paid on first use):")
+    for name, used_by in LAZY_DEPENDENCIES.items():
+        try:
+            _, modules = _import_times(f"import {name}")
+            ms = modules[name][0]
+            print(f"    {name:<28} {ms:8.1f} ms  {used_by}")
+        except (ImportError, KeyError):
+            print(f"    {name:<28} {'-':>8}     not installed")
+
+
 def main():
+    global OUTPUT_FILE, RUN_TRACE, SPAN_TRACEMALLOC, METRICS_TEXTFILE, _cassette
+    import argparse
+
+    parser = argparse.ArgumentParser(description="StrikeRadar data updater")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="stay resident and refresh each source on its own schedule",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="refresh every source now, ignoring SOURCE_SCHEDULE",
+    )
+    parser.add_argument(
+        "--build-onnx",
+        action="store_true",
+        help="export and int8-quantize the escalation model for ESCALATION_BACKEND=onnx, then exit",
+    )
+    parser.add_argument(
+        "--build-bundle",
+        action="store_true",
+        help="materialize the classifier model(s) as a local read-only safetensors bundle, then exit",
+    )
+    parser.add_argument(
+        "--measure-cold-start",
+        action="store_true",
+        help="report time-to-first-prediction and memory of the classifier loaded from the hub cache "
+        "and from its bundle, then exit",
+    )
+    parser.add_argument(
+        "--benchmark-classifier",
+        action="store_true",
+        help="report pairs/sec of the stock zero-shot pipeline vs the batched scorers, then exit",
+    )
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="report the import cost of update_data and each lazily loaded dependency, then exit",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        help="run one full cycle (all sources, no disk caches) and save every response to CASSETTE",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="run one full cycle offline from a cassette written by --record",
+    )
+    parser.add_argument(
+        "--output",
+        help=f"data file to write (default {OUTPUT_FILE}; required with --record/--replay)",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help=f"also write a Chrome trace-event file ({RUN_TRACE_NAME}) next to the run report",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace Python allocations so the run report has peak memory per stage (slower)",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        metavar="PATH",
+        default=METRICS_TEXTFILE,
+        help="write Prometheus text metrics to PATH after every cycle (node_exporter textfile collector)",
+    )
+    parser.add_argument(
+        "--backfill",
+        metavar="SOURCE",
+        help="score a JSON archive or directory of Fleet Tracker HTML snapshots into a "
+        "columnar time series (resumable), then exit",
+    )
+    parser.add_argument(
+        "--backfill-output",
+        default=BACKFILL_OUTPUT,
+        help=f"output file for --backfill (default {BACKFILL_OUTPUT})",
+    )
+    parser.add_argument(
+        "--backfill-workers",
+        type=int,
+        default=None,
+        help="worker processes for --backfill (default: all cores)",
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=DAEMON_HEALTH_PORT,
+        help=f"localhost port for GET /healthz in daemon mode, 0 disables (default {DAEMON_HEALTH_PORT})",
+    )
+    args = parser.parse_args()
+
+    OUTPUT_FILE = args.output or OUTPUT_FILE
+    RUN_TRACE = RUN_TRACE or args.trace
+    SPAN_TRACEMALLOC = SPAN_TRACEMALLOC or args.trace_memory
+    METRICS_TEXTFILE = args.metrics_textfile
+
+    if args.record or args.replay:
+        if args.record and args.replay:
+            parser.error("--record and --replay are mutually exclusive")
+        if not args.output:
+            # The cycle starts from an empty history; never let it replace the live file
+            parser.error(f"--{'record' if args.record else 'replay'} needs --output (it would overwrite {OUTPUT_FILE})")
+        _cassette = Cassette(args.record or args.replay, "record" if args.record else "replay")
+        print(f"{'Recording' if args.record else 'Replaying'} cassette {_cassette.path} - {datetime.now().isoformat()}")
+        started = time.perf_counter()
+        ok = update_data_file(sources=list(SOURCE_SCHEDULE))
+        stop_inference_worker()
+        if args.record:
+            _cassette.save()
+        print(f"Cycle wall time: {time.perf_counter() - started:.2f}s")
+        raise SystemExit(0 if ok else 1)
+
+    if args.build_onnx:
+        manifest = build_onnx_model()
+        raise SystemExit(0 if manifest["within_tolerance"] else 1)
+
+    if args.build_bundle:
+        models = [ESCALATION_MODEL] + ([CASCADE_MODEL] if ESCALATION_MODE == "cascade" else [])
+        for model_name in models:
+            build_model_bundle(model_name)
+        return
+
+    if args.measure_cold_start:
+        measure_cold_start()
+        return
+
+    if args.import_profile:
+        import_profile()
+        return
+
+    if args.backfill:
+        result = backfill_fleet_tracker(args.backfill, args.backfill_output, args.backfill_workers)
+        raise SystemExit(1 if result["failed"] else 0)
+
+    if args.benchmark_classifier:
+        benchmark_escalation_scorers()
+        return
+
+    if args.daemon:
+        run_daemon(health_port=args.health_port)
+        return
+
     print(f"Updating data - {datetime.now().isoformat()}")
-    update_data_file()
+    update_data_file(sources=list(SOURCE_SCHEDULE) if args.force else None)
+    stop_inference_worker()
 
 
 if __name__ == "__main__":